@@ -0,0 +1,85 @@
+"""Convert string primary and foreign keys to BIGINT
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+Every id was VARCHAR filled from a sequence, so listings had to ORDER BY
+CAST(id AS INTEGER), which cannot use the primary key index. The values are
+already numeric; this casts them in place. Foreign keys are dropped first and
+recreated afterwards so referenced and referencing columns change together.
+Existing sequences keep generating the ids.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIMARY_KEYS = [
+    ("users", "user_id"),
+    ("department", "department_id"),
+    ("application", "application_id"),
+    ("days_holiday", "holiday_id"),
+    ("days_working", "working_id"),
+    ("dept_announcement", "announcement_id"),
+    ("expense", "expense_id"),
+    ("job", "job_id"),
+    ("payment", "payment_id"),
+    ("users_financial_info", "financial_info_id"),
+    ("user_message", "message_id"),
+    ("user_personal_event", "event_id"),
+    ("users_personal_info", "personal_info_id"),
+]
+
+# (table, column, referenced table, referenced column, ondelete, onupdate)
+FOREIGN_KEYS = [
+    ("application", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("days_working", "user_id", "users", "user_id", "CASCADE", None),
+    ("department", "manager_id", "users", "user_id", "CASCADE", None),
+    ("dept_announcement", "department_id", "department", "department_id", "CASCADE", "CASCADE"),
+    ("expense", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("job", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("payment", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("users_financial_info", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("user_message", "sender_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("user_message", "receiver_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("user_personal_event", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("users_personal_info", "user_id", "users", "user_id", "CASCADE", "CASCADE"),
+    ("users_personal_info", "department_id", "department", "department_id", "CASCADE", None),
+]
+
+
+def _fk_name(table: str, column: str) -> str:
+    # PostgreSQL's default name for the unnamed constraints created by create_all
+    return f"{table}_{column}_fkey"
+
+
+def _convert(type_, using: str) -> None:
+    for table, column, *_ in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {_fk_name(table, column)}")
+
+    for table, column in PRIMARY_KEYS:
+        op.alter_column(table, column, type_=type_, postgresql_using=f"{column}::{using}")
+    for table, column, *_ in FOREIGN_KEYS:
+        op.alter_column(table, column, type_=type_, postgresql_using=f"{column}::{using}")
+
+    for table, column, ref_table, ref_column, ondelete, onupdate in FOREIGN_KEYS:
+        op.create_foreign_key(
+            _fk_name(table, column), table, ref_table, [column], [ref_column],
+            ondelete=ondelete, onupdate=onupdate,
+        )
+
+
+def upgrade() -> None:
+    _convert(sa.BigInteger(), "bigint")
+
+
+def downgrade() -> None:
+    _convert(sa.String(), "varchar")
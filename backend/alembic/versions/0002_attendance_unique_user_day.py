@@ -0,0 +1,54 @@
+"""One attendance row per user and day
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+Clock-ins become an INSERT ... ON CONFLICT (user_id, day) upsert, which needs
+a unique constraint. Earlier logins could create several rows for the same
+day; they are merged into the first one, which keeps the earliest login, the
+latest logout and the summed hours.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        WITH grouped AS (
+            SELECT user_id, day,
+                   MIN(working_id) AS keep_id,
+                   MIN(login_time) AS login_time,
+                   MAX(logout_time) AS logout_time,
+                   SUM(total_hours) AS total_hours
+            FROM days_working
+            GROUP BY user_id, day
+            HAVING COUNT(*) > 1
+        )
+        UPDATE days_working AS w
+        SET login_time = g.login_time,
+            logout_time = g.logout_time,
+            total_hours = g.total_hours
+        FROM grouped AS g
+        WHERE w.working_id = g.keep_id
+    """)
+    op.execute("""
+        DELETE FROM days_working AS w
+        USING days_working AS k
+        WHERE w.user_id = k.user_id
+          AND w.day = k.day
+          AND w.working_id > k.working_id
+    """)
+    op.create_unique_constraint("uq_days_working_user_day", "days_working", ["user_id", "day"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_days_working_user_day", "days_working", type_="unique")
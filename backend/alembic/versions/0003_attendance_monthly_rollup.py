@@ -0,0 +1,57 @@
+"""Monthly attendance rollup
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+Creates attendance_monthly and backfills it from the closed days in
+days_working, using the same ATTENDANCE_* settings as the application.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attendance_monthly",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("month", sa.Date(), primary_key=True),
+        sa.Column("total_hours", sa.Float(), nullable=False),
+        sa.Column("days_present", sa.Integer(), nullable=False),
+        sa.Column("late_arrivals", sa.Integer(), nullable=False),
+        sa.Column("overtime_hours", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_attendance_monthly_month", "attendance_monthly", ["month"])
+
+    shift_start = os.getenv("ATTENDANCE_SHIFT_START", "09:00")
+    grace_minutes = int(os.getenv("ATTENDANCE_LATE_GRACE_MINUTES", 0))
+    standard_hours = float(os.getenv("ATTENDANCE_STANDARD_HOURS", 8))
+    op.execute(f"""
+        INSERT INTO attendance_monthly
+            (user_id, month, total_hours, days_present, late_arrivals, overtime_hours)
+        SELECT user_id,
+               date_trunc('month', day)::date,
+               COALESCE(SUM(total_hours), 0),
+               COUNT(*),
+               SUM(CASE WHEN login_time > ('{shift_start}+00'::timetz + interval '{grace_minutes} minutes')
+                        THEN 1 ELSE 0 END),
+               COALESCE(SUM(GREATEST(total_hours - {standard_hours}, 0)), 0)
+        FROM days_working
+        WHERE logout_time IS NOT NULL
+        GROUP BY user_id, date_trunc('month', day)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_monthly_month", table_name="attendance_monthly")
+    op.drop_table("attendance_monthly")
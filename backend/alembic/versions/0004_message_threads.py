@@ -0,0 +1,92 @@
+"""Conversation threads and per-user conversation summary
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Adds created_at/is_read to user_message with the thread index on the
+unordered participant pair, creates conversation_summary and backfills it
+from the existing messages. Existing messages get the migration time as
+created_at, so their order inside a thread falls back to message_id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_message",
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.add_column(
+        "user_message",
+        sa.Column("is_read", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.create_index(
+        "ix_user_message_thread",
+        "user_message",
+        [
+            sa.text("least(sender_id, receiver_id)"),
+            sa.text("greatest(sender_id, receiver_id)"),
+            "created_at",
+            "message_id",
+        ],
+    )
+
+    op.create_table(
+        "conversation_summary",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("peer_id", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("last_message_id", sa.BigInteger(), nullable=False),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_sender_id", sa.BigInteger(), nullable=False),
+        sa.Column("last_text", sa.String(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        "ix_conversation_summary_inbox",
+        "conversation_summary",
+        ["user_id", "last_message_at", "peer_id"],
+    )
+
+    # Every message belongs to both participants' rows; a message to oneself only once
+    op.execute("""
+        WITH sides AS (
+            SELECT sender_id AS user_id, receiver_id AS peer_id, message_id, created_at,
+                   sender_id, text, false AS unread
+            FROM user_message
+            UNION ALL
+            SELECT receiver_id, sender_id, message_id, created_at, sender_id, text, NOT is_read
+            FROM user_message
+            WHERE receiver_id <> sender_id
+        ),
+        ranked AS (
+            SELECT *,
+                   ROW_NUMBER() OVER (PARTITION BY user_id, peer_id
+                                      ORDER BY created_at DESC, message_id DESC) AS position,
+                   COUNT(*) FILTER (WHERE unread) OVER (PARTITION BY user_id, peer_id) AS unread_count
+            FROM sides
+        )
+        INSERT INTO conversation_summary
+            (user_id, peer_id, last_message_id, last_message_at, last_sender_id, last_text, unread_count)
+        SELECT user_id, peer_id, message_id, created_at, sender_id, left(text, 200), unread_count
+        FROM ranked
+        WHERE position = 1
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversation_summary_inbox", table_name="conversation_summary")
+    op.drop_table("conversation_summary")
+    op.drop_index("ix_user_message_thread", table_name="user_message")
+    op.drop_column("user_message", "is_read")
+    op.drop_column("user_message", "created_at")
@@ -0,0 +1,68 @@
+"""Unique constraints and version columns
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+Replaces the Redis-locked "select, then insert" uniqueness checks with
+constraints: one personal info and one financial info row per user, unique
+personal email and phone, one department per manager. The plain indexes on
+those columns are dropped because each constraint brings its own. Adds the
+optimistic concurrency version column to the four mutable tables.
+
+Existing duplicates are not merged automatically; the upgrade stops and
+names the table so they can be resolved by hand first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, constraint, index it replaces)
+UNIQUE_COLUMNS = [
+    ("users_personal_info", "user_id", "uq_users_personal_info_user_id", "ix_users_personal_info_user_id"),
+    ("users_personal_info", "email", "uq_users_personal_info_email", "ix_users_personal_info_email"),
+    ("users_personal_info", "phone", "uq_users_personal_info_phone", "ix_users_personal_info_phone"),
+    ("users_financial_info", "user_id", "uq_users_financial_info_user_id", "ix_users_financial_info_user_id"),
+    ("department", "manager_id", "uq_department_manager_id", "ix_department_manager_id"),
+]
+VERSIONED_TABLES = ["users_personal_info", "users_financial_info", "payment", "department"]
+
+
+def upgrade() -> None:
+    for table, column, constraint, index in UNIQUE_COLUMNS:
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM {table}
+                    WHERE {column} IS NOT NULL
+                    GROUP BY {column}
+                    HAVING COUNT(*) > 1
+                ) THEN
+                    RAISE EXCEPTION 'Duplicate {table}.{column} values block {constraint}; resolve them first';
+                END IF;
+            END
+            $$
+        """)
+        op.drop_index(index, table_name=table, if_exists=True)
+        op.create_unique_constraint(constraint, table, [column])
+
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.drop_column(table, "version")
+
+    for table, column, constraint, index in reversed(UNIQUE_COLUMNS):
+        op.drop_constraint(constraint, table, type_="unique")
+        op.create_index(index, table, [column])
@@ -0,0 +1,55 @@
+"""Payroll runs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+Adds payroll_run, one row per paid month, and links the payments a run
+writes back to it. The (payroll_run_id, user_id) constraint is what a rerun
+upserts on; manually created payments keep a NULL run id and are unaffected.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("payroll_run_id_seq")))
+    op.create_table(
+        "payroll_run",
+        sa.Column("run_id", sa.BigInteger(), primary_key=True,
+                  server_default=sa.text("nextval('payroll_run_id_seq')")),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("employees", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_amount", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("total_fine", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("runs", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_ms", sa.Float(), nullable=True),
+        sa.Column("started_by", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("month", name="uq_payroll_run_month"),
+    )
+    op.create_index("ix_payroll_run_run_id", "payroll_run", ["run_id"])
+
+    op.add_column(
+        "payment",
+        sa.Column("payroll_run_id", sa.BigInteger(),
+                  sa.ForeignKey("payroll_run.run_id", ondelete="CASCADE"), nullable=True),
+    )
+    op.create_unique_constraint("uq_payment_payroll_run_user", "payment", ["payroll_run_id", "user_id"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_payment_payroll_run_user", "payment", type_="unique")
+    op.drop_column("payment", "payroll_run_id")
+    op.drop_index("ix_payroll_run_run_id", table_name="payroll_run")
+    op.drop_table("payroll_run")
+    op.execute(sa.schema.DropSequence(sa.Sequence("payroll_run_id_seq")))
@@ -0,0 +1,56 @@
+"""Employee directory search indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00
+
+Adds a stored, generated tsvector over the searchable personal info columns
+with a GIN index, and trigram GIN indexes on fullname and department_name
+for typo-tolerant and substring matching. Adding the generated column
+rewrites users_personal_info once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(fullname, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.', '  ')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(phone, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(country, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "users_personal_info",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR_SQL, persisted=True)),
+    )
+    op.create_index(
+        "ix_users_personal_info_search", "users_personal_info", ["search_vector"], postgresql_using="gin"
+    )
+    op.create_index(
+        "ix_users_personal_info_fullname_trgm", "users_personal_info", ["fullname"],
+        postgresql_using="gin", postgresql_ops={"fullname": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_department_name_trgm", "department", ["department_name"],
+        postgresql_using="gin", postgresql_ops={"department_name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_department_name_trgm", table_name="department")
+    op.drop_index("ix_users_personal_info_fullname_trgm", table_name="users_personal_info")
+    op.drop_index("ix_users_personal_info_search", table_name="users_personal_info")
+    op.drop_column("users_personal_info", "search_vector")
@@ -0,0 +1,92 @@
+"""Leave ledger, balances and overlap constraint
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00
+
+Adds leave_ledger, the history of every leave balance change, and
+leave_balance, its per-user and per-leave-type totals. Applications that are
+already approved are backfilled as taken leave, so rejecting one later
+refunds what it used.
+
+Also adds a GiST exclusion constraint so a user's pending and approved
+applications cannot overlap. The upgrade fails if such overlaps already
+exist; reject or shorten them first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEAVE_TYPE = postgresql.ENUM(name="leavetypeenum", create_type=False)
+LEAVE_ENTRY = postgresql.ENUM("Adjustment", "Taken", "Refund", name="leaveentryenum")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute("""
+        ALTER TABLE application ADD CONSTRAINT ex_application_user_dates
+        EXCLUDE USING gist (user_id WITH =, daterange(start_date, end_date, '[]') WITH &&)
+        WHERE (status <> 'Rejected' AND start_date IS NOT NULL AND end_date IS NOT NULL)
+    """)
+
+    LEAVE_ENTRY.create(op.get_bind())
+    op.execute(sa.schema.CreateSequence(sa.Sequence("leave_ledger_id_seq")))
+    op.create_table(
+        "leave_ledger",
+        sa.Column("entry_id", sa.BigInteger(), primary_key=True,
+                  server_default=sa.text("nextval('leave_ledger_id_seq')")),
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("leave_type", LEAVE_TYPE, nullable=False),
+        sa.Column("kind", postgresql.ENUM(name="leaveentryenum", create_type=False), nullable=False),
+        sa.Column("days", sa.Float(), nullable=False),
+        sa.Column("application_id", sa.BigInteger(),
+                  sa.ForeignKey("application.application_id", ondelete="SET NULL"), nullable=True),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("created_by", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_leave_ledger_entry_id", "leave_ledger", ["entry_id"])
+    op.create_index("ix_leave_ledger_user_id_entry_id", "leave_ledger", ["user_id", "entry_id"])
+
+    op.create_table(
+        "leave_balance",
+        sa.Column("user_id", sa.BigInteger(), sa.ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("leave_type", LEAVE_TYPE, primary_key=True),
+        sa.Column("granted", sa.Float(), nullable=False),
+        sa.Column("used", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+    op.execute("""
+        INSERT INTO leave_ledger (user_id, leave_type, kind, days, application_id, reason)
+        SELECT user_id, leave_type, 'Taken', -(end_date - start_date + 1), application_id, 'Approved before the ledger'
+        FROM application
+        WHERE status = 'Approved' AND leave_type IS NOT NULL
+          AND start_date IS NOT NULL AND end_date IS NOT NULL
+        ORDER BY application_id
+    """)
+    op.execute("""
+        INSERT INTO leave_balance (user_id, leave_type, granted, used)
+        SELECT user_id, leave_type, 0, -SUM(days)
+        FROM leave_ledger
+        GROUP BY user_id, leave_type
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("leave_balance")
+    op.drop_index("ix_leave_ledger_user_id_entry_id", table_name="leave_ledger")
+    op.drop_index("ix_leave_ledger_entry_id", table_name="leave_ledger")
+    op.drop_table("leave_ledger")
+    op.execute(sa.schema.DropSequence(sa.Sequence("leave_ledger_id_seq")))
+    LEAVE_ENTRY.drop(op.get_bind())
+    op.drop_constraint("ex_application_user_dates", "application")
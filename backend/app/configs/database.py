@@ -1,14 +1,158 @@
 import os
+import time
+import threading
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from dotenv import load_dotenv
 
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DB_URL")
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+# Engine profiles. Every value can be overridden with its DB_* variable.
+ENGINE_PROFILES = {
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": -1,
+        "pool_pre_ping": False,
+        "echo": True,
+    },
+    "production": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "echo": False,
+    },
+}
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+def get_engine_settings() -> dict:
+    profile = os.getenv("DB_PROFILE", "development").strip().lower()
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}'. Expected one of: {', '.join(ENGINE_PROFILES)}")
+
+    defaults = ENGINE_PROFILES[profile]
+    return {
+        "profile": profile,
+        "pool_size": _env_int("DB_POOL_SIZE", defaults["pool_size"]),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", defaults["max_overflow"]),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", defaults["pool_timeout"]),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", defaults["pool_recycle"]),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", defaults["pool_pre_ping"]),
+        "echo": _env_bool("DB_ECHO", defaults["echo"]),
+    }
+
+class PoolStats:
+    """Counters collected from the connection pool, read by the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": round(self.total_wait_seconds, 6),
+                "avg_wait_seconds": round(self.total_wait_seconds / self.checkouts, 6) if self.checkouts else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+engine_settings = get_engine_settings()
+
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=engine_settings["echo"],
+    poolclass=InstrumentedQueuePool,
+    pool_size=engine_settings["pool_size"],
+    max_overflow=engine_settings["max_overflow"],
+    pool_timeout=engine_settings["pool_timeout"],
+    pool_recycle=engine_settings["pool_recycle"],
+    pool_pre_ping=engine_settings["pool_pre_ping"],
+)
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.increment("checkouts")
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_stats.increment("checkins")
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.increment("connects")
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.increment("invalidations")
+
+def get_pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "profile": engine_settings["profile"],
+        "pool_size": pool.size(),
+        "max_overflow": engine_settings["max_overflow"],
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        **pool_stats.snapshot(),
+    }
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -1,16 +1,24 @@
 import os
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from fastapi_mail import ConnectionConfig
 from dotenv import load_dotenv
-from typing import List
 
 load_dotenv()
 
+def _flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# A local stand-in (python -m aiosmtpd -n -l localhost:1025) needs
+# MAIL_STARTTLS=false and MAIL_USE_CREDENTIALS=false
 config = ConnectionConfig(
     MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
     MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
     MAIL_FROM=os.getenv("MAIL_FROM"),
     MAIL_PORT=int(os.getenv("MAIL_PORT")),
     MAIL_SERVER=os.getenv("MAIL_SERVER"),
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-)
\ No newline at end of file
+    MAIL_STARTTLS=_flag("MAIL_STARTTLS", True),
+    MAIL_SSL_TLS=_flag("MAIL_SSL_TLS", False),
+    USE_CREDENTIALS=_flag("MAIL_USE_CREDENTIALS", True),
+)
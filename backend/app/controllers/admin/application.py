@@ -1,15 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import application as schemas
 from ...models import users as models
 from ...services import application as services
+from ...services import leave as leave_services
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -27,6 +26,21 @@ async def create_application(
 ):
     return await services.create_application(db, application)
 
+@router.post(
+    "/admin/application/decisions",
+    response_model=schemas.ApplicationDecisionResult
+)
+@limiter.limit("20/minute")
+async def decide_applications(
+    request: Request,
+    decision: schemas.ApplicationDecision = Body(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await leave_services.decide_applications(
+        db, decision.application_ids, decision.status, decided_by=current_user.user_id, reason=decision.reason
+    )
+
 @router.get(
     "/admin/application/{application_id}",
     response_model=schemas.ApplicationResponse
@@ -52,7 +66,7 @@ async def update_application(
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.update_application(db, application_id, application)
+    return await services.update_application(db, application_id, application, decided_by=current_user.user_id)
 
 @router.delete("/admin/application/{application_id}")
 @limiter.limit("20/minute")
@@ -66,17 +80,18 @@ async def delete_application(
 
 @router.get(
     "/admin/application",
-    response_model=List[schemas.ApplicationResponse]
+    response_model=Union[List[schemas.ApplicationResponse], CursorPage[schemas.ApplicationResponse]]
 )
 @limiter.limit("20/minute")
 async def get_all_applications(
     request: Request,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(200, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.get_all_applications(db, skip=skip, limit=limit)
+    return await services.get_all_applications(db, skip=skip, limit=limit, cursor=cursor)
 
 @router.get(
     "/admin/application/user/{user_id}",
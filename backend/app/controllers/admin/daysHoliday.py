@@ -1,14 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...configs.database import get_db
 from ...schemas import daysHoliday as schemas
 from ...services import daysHoliday as services
 from ...utils import jwt
-from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -54,17 +52,18 @@ async def delete_holiday(
 
 @router.get(
     "/admin/holidays",
-    response_model=List[schemas.DaysHolidayResponse]
+    response_model=Union[List[schemas.DaysHolidayResponse], CursorPage[schemas.DaysHolidayResponse]]
 )
 @limiter.limit("20/minute")
 async def get_all_holidays(
     request: Request,
     skip: int = 0,
     limit: int = 200,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(jwt.get_current_admin)
 ):
-    return await services.get_all_holidays(db, skip, limit)
+    return await services.get_all_holidays(db, skip, limit, cursor=cursor)
 
 @router.get(
     "/admin/holiday/{holiday_id}",
@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...configs.database import get_db
 from ...schemas import daysWorking as schemas
 from ...services import daysWorking as services
+from ...services import attendanceSummary as summary_services
+from ...schemas import attendanceSummary as summary_schemas
 from ...utils import jwt
-from typing import List
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
 from datetime import date
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -42,17 +42,18 @@ async def delete_working_day(
 
 @router.get(
     "/admin/working",
-    response_model=List[schemas.DaysWorkingResponse]
+    response_model=Union[List[schemas.DaysWorkingResponse], CursorPage[schemas.DaysWorkingResponse]]
 )
 @limiter.limit("20/minute")
 async def get_all_working_days(
     request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(jwt.get_current_admin)
 ):
-    return await services.get_all_working_days(db, skip, limit)
+    return await services.get_all_working_days(db, skip, limit, cursor=cursor)
 
 @router.get(
     "/admin/working/{working_id}",
@@ -69,7 +70,7 @@ async def get_working_day(
 
 @router.get(
     "/admin/working/user/{user_id}",
-    response_model=List[schemas.DaysWorkingResponse]
+    response_model=Union[List[schemas.DaysWorkingResponse], CursorPage[schemas.DaysWorkingResponse]]
 )
 @limiter.limit("20/minute")
 async def get_user_working_days(
@@ -77,7 +78,59 @@ async def get_user_working_days(
     user_id: str = Path(..., description="User ID to retrieve working days"),
     skip: int = 0,
     limit: int = 200,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(jwt.get_current_admin)
+):
+    return await services.get_working_day_by_user_id(db, user_id, skip, limit, cursor=cursor)
+
+@router.get(
+    "/admin/attendance/summary/users/{user_id}",
+    response_model=List[summary_schemas.UserAttendanceSummary]
+)
+@limiter.limit("20/minute")
+async def get_user_attendance_summary(
+    request: Request,
+    user_id: str = Path(..., description="User ID to summarize"),
+    year: Optional[int] = Query(None, description="Restrict to one year"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(jwt.get_current_admin)
+):
+    return await summary_services.get_user_summary(db, user_id, year)
+
+@router.get(
+    "/admin/attendance/summary/departments",
+    response_model=List[summary_schemas.DepartmentAttendanceSummary]
+)
+@limiter.limit("20/minute")
+async def get_departments_attendance_summary(
+    request: Request,
+    month: date = Query(..., description="Any day of the month to summarize"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(jwt.get_current_admin)
+):
+    return await summary_services.get_departments_overview(db, month)
+
+@router.get(
+    "/admin/attendance/summary/departments/{department_id}",
+    response_model=summary_schemas.DepartmentAttendanceDetail
+)
+@limiter.limit("20/minute")
+async def get_department_attendance_summary(
+    request: Request,
+    department_id: str = Path(..., description="Department ID to summarize"),
+    month: date = Query(..., description="Any day of the month to summarize"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(jwt.get_current_admin)
+):
+    return await summary_services.get_department_summary(db, department_id, month)
+
+@router.post("/admin/attendance/summary/rebuild")
+@limiter.limit("5/minute")
+async def rebuild_attendance_summary(
+    request: Request,
+    month: date = Query(..., description="Any day of the month to recompute"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(jwt.get_current_admin)
 ):
-    return await services.get_working_day_by_user_id(db, user_id, skip, limit)
+    return await summary_services.rebuild_month(db, month)
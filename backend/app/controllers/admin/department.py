@@ -1,15 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...configs.database import get_db
 from ...schemas import department as schemas
 from ...models import users as models
 from ...services import department as services
 from ...utils import jwt
-from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -42,17 +40,18 @@ async def get_department(
 
 @router.get(
     "/admin/department",
-    response_model=List[schemas.DepartmentResponse]
+    response_model=Union[List[schemas.DepartmentResponse], CursorPage[schemas.DepartmentResponse]]
 )
 @limiter.limit("20/minute")
 async def get_all_departments(
     request: Request,
     skip: int = 0,
     limit: int = 200,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(jwt.get_current_admin)
 ):
-    return await services.get_all_departments(db, skip, limit)
+    return await services.get_all_departments(db, skip, limit, cursor=cursor)
 
 @router.put(
     "/admin/department/{department_id}",
@@ -5,11 +5,9 @@ from ...models import users as models
 from ...services import expense as services
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -58,16 +56,17 @@ async def delete_expense(
 ):
     return await services.delete_expense(db, expense_id)
 
-@router.get("/admin/expense", response_model=List[schemas.ExpenseResponse])
+@router.get("/admin/expense", response_model=Union[List[schemas.ExpenseResponse], CursorPage[schemas.ExpenseResponse]])
 @limiter.limit("20/minute")
 async def get_all_expenses(
     request: Request,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(200, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.get_all_expenses(db, skip=skip, limit=limit)
+    return await services.get_all_expenses(db, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/admin/expense/user/{user_id}", response_model=List[schemas.ExpenseResponse])
 @limiter.limit("20/minute")
@@ -6,11 +6,9 @@ from ...services import job as services
 from ...models import users as models
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -65,13 +63,14 @@ async def delete_job(
 ):
     return await services.delete_job(db, job_id)
 
-@router.get("/admin/job", response_model=List[schemas.Job])
+@router.get("/admin/job", response_model=Union[List[schemas.Job], CursorPage[schemas.Job]])
 @limiter.limit("20/minute")
 async def get_all_jobs(
     request: Request,
     skip: int = Query(0),
     limit: int = Query(200),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.get_all_jobs(db, skip=skip, limit=limit)
+    return await services.get_all_jobs(db, skip=skip, limit=limit, cursor=cursor)
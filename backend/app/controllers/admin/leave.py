@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, status, Query, Path, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...schemas import leave as schemas
+from ...models import users as models
+from ...services import leave as services
+from ...utils import jwt
+from ...configs.database import get_db
+from typing import List, Optional
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
+
+router = APIRouter()
+
+@router.post(
+    "/admin/leave/adjustments",
+    response_model=schemas.LeaveBalanceResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+@limiter.limit("20/minute")
+async def adjust_leave_balance(
+    request: Request,
+    adjustment: schemas.LeaveAdjustmentCreate = Query(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.adjust_balance(db, adjustment, created_by=current_user.user_id)
+
+@router.get(
+    "/admin/leave/balances/{user_id}",
+    response_model=List[schemas.LeaveBalanceResponse]
+)
+@limiter.limit("20/minute")
+async def get_leave_balances(
+    request: Request,
+    user_id: str = Path(..., description="User ID whose balances to retrieve"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.get_balances(db, user_id)
+
+@router.get(
+    "/admin/leave/ledger/{user_id}",
+    response_model=CursorPage[schemas.LeaveLedgerResponse]
+)
+@limiter.limit("20/minute")
+async def get_leave_ledger(
+    request: Request,
+    user_id: str = Path(..., description="User ID whose ledger to list"),
+    limit: int = Query(50, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.get_ledger(db, user_id, limit=limit, cursor=cursor)
+
+@router.post("/admin/leave/balances/rebuild")
+@limiter.limit("5/minute")
+async def rebuild_leave_balances(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.rebuild_balances(db)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Request
+from ...configs.database import get_pool_status
+from ...utils.crypto import get_hash_pool_status
+from ...utils.logger import logger
+from ...services.daysWorking import attendance_buffer
+from ...utils.websocket_manager import manager as websocket_manager
+from ...utils.email import email_outbox
+from ...utils.cloudinary_helper import get_photo_pipeline_status
+from ...models import users as models
+from ...utils import jwt
+from ...utils.rate_limit import limiter
+from ...utils.redis_lock import get_lock_stats
+
+router = APIRouter()
+
+@router.get("/admin/metrics/db-pool")
+@limiter.limit("20/minute")
+async def get_db_pool_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return get_pool_status()
+
+@router.get("/admin/metrics/hash-pool")
+@limiter.limit("20/minute")
+async def get_hash_pool_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return get_hash_pool_status()
+
+@router.get("/admin/metrics/logger")
+@limiter.limit("20/minute")
+async def get_logger_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return logger.get_stats()
+
+@router.get("/admin/metrics/attendance")
+@limiter.limit("20/minute")
+async def get_attendance_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return attendance_buffer.get_stats()
+
+@router.get("/admin/metrics/websocket")
+@limiter.limit("20/minute")
+async def get_websocket_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return websocket_manager.get_stats()
+
+@router.get("/admin/metrics/email")
+@limiter.limit("20/minute")
+async def get_email_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await email_outbox.get_stats()
+
+@router.get("/admin/metrics/photo-uploads")
+@limiter.limit("20/minute")
+async def get_photo_upload_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return get_photo_pipeline_status()
+
+@router.get("/admin/metrics/rate-limit")
+@limiter.limit("20/minute")
+async def get_rate_limit_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return limiter.get_stats()
+
+@router.get("/admin/metrics/locks")
+@limiter.limit("20/minute")
+async def get_lock_metrics(
+    request: Request,
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return get_lock_stats()
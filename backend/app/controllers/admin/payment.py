@@ -5,11 +5,9 @@ from ...models import users as models
 from ...services import payment as services
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -66,17 +64,18 @@ async def delete_payment(
 
 @router.get(
     "/admin/payment",
-    response_model=List[schemas.PaymentResponse]
+    response_model=Union[List[schemas.PaymentResponse], CursorPage[schemas.PaymentResponse]]
 )
 @limiter.limit("10/minute")
 async def get_all_payments(
     request: Request,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(100, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.get_all_payments(db, skip=skip, limit=limit)
+    return await services.get_all_payments(db, skip=skip, limit=limit, cursor=cursor)
 
 @router.get(
     "/admin/payment/user/{user_id}",
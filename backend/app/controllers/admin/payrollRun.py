@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, status, Query, Path, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from ...schemas import payrollRun as schemas
+from ...schemas.payment import PaymentResponse
+from ...models import users as models
+from ...services import payrollRun as services
+from ...utils import jwt
+from ...configs.database import get_db
+from typing import List, Optional
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
+
+router = APIRouter()
+
+@router.post(
+    "/admin/payroll/runs",
+    response_model=schemas.PayrollRunResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+@limiter.limit("5/minute")
+async def run_payroll(
+    request: Request,
+    month: date = Query(..., description="Any day of the month to pay; rerunning a month updates its payments"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.run_payroll(db, month, started_by=current_user.user_id)
+
+@router.get(
+    "/admin/payroll/runs",
+    response_model=List[schemas.PayrollRunResponse]
+)
+@limiter.limit("10/minute")
+async def get_payroll_runs(
+    request: Request,
+    skip: int = Query(0, description="Number of records to skip"),
+    limit: int = Query(24, description="Maximum number of records to return"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.get_payroll_runs(db, skip=skip, limit=limit)
+
+@router.get(
+    "/admin/payroll/runs/{run_id}",
+    response_model=schemas.PayrollRunResponse
+)
+@limiter.limit("10/minute")
+async def get_payroll_run(
+    request: Request,
+    run_id: str = Path(..., description="Payroll run ID to retrieve"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.get_payroll_run(db, run_id)
+
+@router.get(
+    "/admin/payroll/runs/{run_id}/payments",
+    response_model=CursorPage[PaymentResponse]
+)
+@limiter.limit("10/minute")
+async def get_payroll_run_payments(
+    request: Request,
+    run_id: str = Path(..., description="Payroll run ID whose payments to list"),
+    limit: int = Query(200, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await services.get_payroll_run_payments(db, run_id, limit=limit, cursor=cursor)
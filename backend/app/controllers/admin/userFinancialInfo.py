@@ -6,11 +6,9 @@ from ...schemas import userFinancialInfo as schemas
 from ...models import users as models
 from ...services import userFinancialInfo as services
 from ...utils import jwt
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -43,17 +41,18 @@ async def get_financial_info(
 
 @router.get(
     "/admin/financial_info",
-    response_model=List[schemas.UserFinancialInfoResponse]
+    response_model=Union[List[schemas.UserFinancialInfoResponse], CursorPage[schemas.UserFinancialInfoResponse]]
 )
 @limiter.limit("20/minute")
 async def get_all_financial_info(
     request: Request,
     skip: int = 0,
     limit: int = 200,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(jwt.get_current_admin)
 ):
-    return await services.get_all_financial_info(db, skip, limit)
+    return await services.get_all_financial_info(db, skip, limit, cursor=cursor)
 
 @router.put(
     "/admin/financial_info/{financial_info_id}",
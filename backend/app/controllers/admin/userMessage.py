@@ -1,30 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...configs.database import get_db
 from ...services import userMessage as message_service
 from ...schemas.userMessage import MessageResponse, MessageUpdate
 from ...models import users as models
 from ...utils import jwt
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
-@router.get("/admin/messages", response_model=List[MessageResponse])
+@router.get("/admin/messages", response_model=Union[List[MessageResponse], CursorPage[MessageResponse]])
 @limiter.limit("10/minute")
 async def get_all_messages(
     request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
     """Get all messages - Admin only endpoint"""
     try:
-        messages = await message_service.get_all_messages(db, skip, limit)
+        messages = await message_service.get_all_messages(db, skip, limit, cursor=cursor)
         return messages
     except Exception as e:
         raise HTTPException(
@@ -59,9 +58,10 @@ async def delete_message(
 async def get_user_messages(
     request: Request,
     user_id: str = Path(..., description="User ID to retrieve messages for"),
+    limit: int = Query(100, description="Newest sent and newest received messages to return, each"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    sent = await message_service.get_sent_messages(db, user_id)
-    received = await message_service.get_received_messages(db, user_id)
+    sent = await message_service.get_sent_messages(db, user_id, limit=limit)
+    received = await message_service.get_received_messages(db, user_id, limit=limit)
     return [*sent, *received]
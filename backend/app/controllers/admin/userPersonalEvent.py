@@ -6,11 +6,9 @@ from ...services import userPersonalEvent as services
 from ...services import users
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -59,16 +57,17 @@ async def delete_event(
 ):
     return await services.delete_user_event(db, event_id)
 
-@router.get("/admin/personal_event", response_model=List[schemas.UserPersonalEventResponse])
+@router.get("/admin/personal_event", response_model=Union[List[schemas.UserPersonalEventResponse], CursorPage[schemas.UserPersonalEventResponse]])
 @limiter.limit("20/minute")
 async def get_all_events(
     request: Request,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(200, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
-    return await services.get_all_events(db, skip=skip, limit=limit)
+    return await services.get_all_events(db, skip=skip, limit=limit, cursor=cursor)
 
 @router.get("/admin/personal_event/user/{user_id}", response_model=List[schemas.UserPersonalEventResponse])
 @limiter.limit("20/minute")
@@ -3,17 +3,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...schemas import userPersonalInfo as schemas
 from ...services import userPersonalInfo as services
 from ...services import department as dept_services
+from ...services import employeeSearch as search_services
+from ...schemas.employeeSearch import EmployeeSearchHit, SearchModeEnum
 from ...models import users as models
 from ...services import users
 from ...configs.database import get_db
 from ...utils import jwt
-from typing import List
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
 from ...utils.cloudinary_helper import upload_photo
 import json
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ...utils.rate_limit import limiter
 
-limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
 
 
@@ -32,6 +33,21 @@ async def create_user_personal_info(
     return await services.create_user_info(user, db)
 
 
+# Declared before /admin/personal_info/{personal_info_id} so "search" is not taken for an id
+@router.get("/admin/personal_info/search", response_model=CursorPage[EmployeeSearchHit])
+@limiter.limit("120/minute")  # typeahead sends one request per keystroke
+async def search_personal_info(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100, description="Name, email, phone, city, country or department"),
+    mode: SearchModeEnum = Query(SearchModeEnum.search, description="search: full text and fuzzy names; prefix: typeahead"),
+    limit: int = Query(20, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await search_services.search_employees(db, q, mode=mode, limit=limit, cursor=cursor)
+
+
 @router.get("/admin/personal_info/{personal_info_id}", response_model=schemas.UserInfoResponse)
 @limiter.limit("20/minute")
 async def get_personal_info_by_id(
@@ -97,18 +113,19 @@ async def delete_personal_info(
     return await services.delete_user_personal_info(db, personal_info_id)
 
 
-@router.get("/admin/personal_info", response_model=List[schemas.UserInfoResponse])
+@router.get("/admin/personal_info", response_model=Union[List[schemas.UserInfoResponse], CursorPage[schemas.UserInfoResponse]])
 @limiter.limit("20/minute")
 async def get_all_personal_info(
     request: Request,
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(200, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_current_admin),
 ):
 
     return await services.get_all_user_personal_info(
-        db, skip=skip, limit=limit
+        db, skip=skip, limit=limit, cursor=cursor
     )
 
 
@@ -3,18 +3,32 @@ from ...models import userPersonalInfo as models_user_info
 from ...models import users as models
 from ...schemas import users as schemas
 from ...services import users as users_service
+from ...services import employeeProfile as profile_service
+from ...schemas import employeeProfile as profile_schemas
+from ...services import employeeImport as import_service
+from ...schemas import employeeImport as import_schemas
 from ...utils import jwt
-from fastapi import HTTPException, status, Depends, APIRouter, Query, Path, Request
+from fastapi import HTTPException, status, Depends, APIRouter, Query, Path, Request, File, UploadFile
 from ...configs.database import get_db
-from typing import Optional, List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import Optional, List, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
 
+@router.post("/admin/users/import", response_model=import_schemas.EmployeeImportResult)
+@limiter.limit("5/minute")
+async def import_employees(
+    request: Request,
+    file: UploadFile = File(..., description="CSV (UTF-8) or XLSX with a header row of field names"),
+    dry_run: bool = Query(False, description="Validate and check uniqueness without creating anyone"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await import_service.import_employees(db, file, dry_run)
+
+
 @router.put("/admin/users/{user_id}", response_model=schemas.User)
 @limiter.limit("20/minute")
 async def update_user(
@@ -38,13 +52,14 @@ async def delete_user(
     return await users_service.delete_user(db, user_id)
 
 
-@router.get("/admin/users", response_model=List[schemas.User])
+@router.get("/admin/users", response_model=Union[List[schemas.User], CursorPage[schemas.User]])
 @limiter.limit("20/minute")
 async def get_all_users(
     request: Request,
     db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(200, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
     role: Optional[models.RoleEnum] = Query(None, description="Filter by user role"),
     status: Optional[models.StatusEnum] = Query(
         None, description="Filter by user status"
@@ -53,7 +68,7 @@ async def get_all_users(
 ):
 
     return await users_service.get_all_users(
-        db, skip=skip, limit=limit, role=role, status=status
+        db, skip=skip, limit=limit, role=role, status=status, cursor=cursor
     )
 
 
@@ -68,3 +83,18 @@ async def get_user(
     return await users_service.get_user_by_id(db, user_id)
 
 
+@router.get("/admin/users/{user_id}/profile", response_model=profile_schemas.EmployeeProfile)
+@limiter.limit("20/minute")
+async def get_user_profile(
+    request: Request,
+    user_id: str = Path(...),
+    sections: Optional[List[profile_schemas.ProfileSectionEnum]] = Query(
+        None, description="Sections to load; all of them when omitted"
+    ),
+    attendance_days: int = Query(30, ge=1, le=366, description="Days of attendance history to include"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_current_admin),
+):
+    return await profile_service.get_employee_profile(
+        db, user_id, sections=sections, attendance_days=attendance_days
+    )
@@ -2,44 +2,24 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...schemas import deptAnnouncement as schemas
 from ...services import deptAnnouncement as services
-from ...services import department as dept_services
-from ...models import users as models
 from ...configs.database import get_db
-from ...utils import jwt
 from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi import Request
 from ...utils.logger import logger
+from ...utils.rate_limit import limiter
+from ...utils.manager_scope import ManagerScope, get_manager_scope
 
-limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
 
-async def validate_manager_department(db: AsyncSession, manager_id: str, department_id: str = None):
-    dept = await dept_services.get_department_by_manager_id(db, manager_id)
-    if not dept:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Manager has no associated department"
-        )
-    
-    if department_id and dept.department_id != department_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: Not authorized for this department"
-        )
-    return dept
-
 @router.post("/manager/announcement", response_model=schemas.DeptAnnouncementResponse)
 @limiter.limit("5/minute")
 async def create_announcement(
     request: Request,
     announcement: schemas.DeptAnnouncementCreate = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
-    dept = await validate_manager_department(db, current_user.user_id)
-    announcement.department_id = dept.department_id
+    announcement.department_id = scope.department_id
     return await services.create_dept_announcement(announcement, db)
 
 @router.get("/manager/announcement/{announcement_id}", response_model=schemas.DeptAnnouncementResponse)
@@ -48,10 +28,10 @@ async def get_announcement(
     request: Request,
     announcement_id: str = Path(..., description="Announcement ID to retrieve"),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     announcement = await services.get_dept_announcement_by_id(db, announcement_id)
-    await validate_manager_department(db, current_user.user_id, announcement.department_id)
+    scope.require_department(announcement.department_id)
     return announcement
 
 @router.get("/manager/announcements", response_model=List[schemas.DeptAnnouncementResponse])
@@ -59,14 +39,11 @@ async def get_announcement(
 async def get_department_announcements(
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     try:
-        # Get manager's department
-        dept = await validate_manager_department(db, current_user.user_id)
-        
         # Get announcements (will return empty list if none found)
-        announcements = await services.get_announcements_by_department_id(db, dept.department_id)
+        announcements = await services.get_announcements_by_department_id(db, scope.department_id)
         
         return announcements
         
@@ -86,10 +63,10 @@ async def update_announcement(
     announcement_id: str = Path(..., description="Announcement ID to update"),
     announcement: schemas.DeptAnnouncementUpdate = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     existing = await services.get_dept_announcement_by_id(db, announcement_id)
-    await validate_manager_department(db, current_user.user_id, existing.department_id)
+    scope.require_department(existing.department_id)
     
     # Ensure department can't be changed
     if announcement.department_id and announcement.department_id != existing.department_id:
@@ -106,8 +83,8 @@ async def delete_announcement(
     request: Request,
     announcement_id: str = Path(..., description="Announcement ID to delete"),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     announcement = await services.get_dept_announcement_by_id(db, announcement_id)
-    await validate_manager_department(db, current_user.user_id, announcement.department_id)
+    scope.require_department(announcement.department_id)
     return await services.delete_dept_announcement(db, announcement_id)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...schemas import leave as schemas
+from ...services import leave as services
+from ...configs.database import get_db
+from typing import List
+from fastapi import Request
+from ...utils.rate_limit import limiter
+from ...utils.manager_scope import ManagerScope, get_manager_scope
+
+router = APIRouter()
+
+@router.get("/manager/leave/balances/{user_id}", response_model=List[schemas.LeaveBalanceResponse])
+@limiter.limit("10/minute")
+async def get_leave_balances(
+    request: Request,
+    user_id: str = Path(..., description="User ID whose balances to retrieve"),
+    db: AsyncSession = Depends(get_db),
+    scope: ManagerScope = Depends(get_manager_scope)
+):
+    scope.require_member(user_id)
+    return await services.get_balances(db, user_id)
@@ -1,47 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...schemas import userPersonalEvent as schemas
 from ...services import userPersonalEvent as services
-from ...services import userPersonalInfo as user_info_services
-from ...services import department as dept_services
-from ...models import users as models
 from ...configs.database import get_db
-from ...utils import jwt
 from typing import List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi import Request
+from ...utils.rate_limit import limiter
+from ...utils.manager_scope import ManagerScope, get_manager_scope
 
-limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
 
-async def validate_user_department(db: AsyncSession, user_id: str, manager_id: str):
-    # Get manager's department
-    dept = await dept_services.get_department_by_manager_id(db, manager_id)
-    if not dept:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Manager has no associated department"
-        )
-    
-    # Get user's department
-    user_info = await user_info_services.get_user_personal_info_by_user_id(db, user_id)
-    if user_info.department_id != dept.department_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied: User not in manager's department"
-        )
-    return dept
-
 @router.post("/manager/events", response_model=schemas.UserPersonalEventResponse)
 @limiter.limit("5/minute")
 async def create_event(
     request: Request,
     event: schemas.UserPersonalEventCreate = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
-    await validate_user_department(db, event.user_id, current_user.user_id)
+    scope.require_member(event.user_id)
     return await services.create_user_event(db, event)
 
 @router.get("/manager/events/{event_id}", response_model=schemas.UserPersonalEventResponse)
@@ -50,10 +27,10 @@ async def get_event(
     request: Request,
     event_id: str = Path(..., description="Event ID to retrieve"),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     event = await services.get_user_event_by_id(db, event_id)
-    await validate_user_department(db, event.user_id, current_user.user_id)
+    scope.require_member(event.user_id)
     return event
 
 @router.get("/manager/users/{user_id}/events", response_model=List[schemas.UserPersonalEventResponse])
@@ -62,9 +39,9 @@ async def get_user_events(
     request: Request,
     user_id: str = Path(..., description="User ID to retrieve events"),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
-    await validate_user_department(db, user_id, current_user.user_id)
+    scope.require_member(user_id)
     return await services.get_user_event_by_user_id(db, user_id)
 
 @router.put("/manager/events/{event_id}", response_model=schemas.UserPersonalEventResponse)
@@ -74,10 +51,10 @@ async def update_event(
     event_id: str = Path(..., description="Event ID to update"),
     event_update: schemas.UserPersonalEventUpdate = Query(...),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     event = await services.get_user_event_by_id(db, event_id)
-    await validate_user_department(db, event.user_id, current_user.user_id)
+    scope.require_member(event.user_id)
     return await services.update_user_event(db, event_id, event_update)
 
 @router.delete("/manager/events/{event_id}")
@@ -86,8 +63,8 @@ async def delete_event(
     request: Request,
     event_id: str = Path(..., description="Event ID to delete"),
     db: AsyncSession = Depends(get_db),
-    current_user: models.Users = Depends(jwt.get_current_manager)
+    scope: ManagerScope = Depends(get_manager_scope)
 ):
     event = await services.get_user_event_by_id(db, event_id)
-    await validate_user_department(db, event.user_id, current_user.user_id)
+    scope.require_member(event.user_id)
     return await services.delete_user_event(db, event_id)
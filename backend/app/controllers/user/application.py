@@ -1,15 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import application as schemas
 from ...models import users as models
 from ...services import application as services
 from ...utils import jwt
 from ...configs.database import get_db
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
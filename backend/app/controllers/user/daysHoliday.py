@@ -1,6 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...configs.database import get_db
 from ...schemas import daysHoliday as schemas
@@ -8,8 +6,7 @@ from ...models import users as models
 from ...services import daysHoliday as services
 from ...utils import jwt
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...configs.database import get_db
 from ...schemas import daysWorking as schemas
 from ...models import users as models
 from ...services import daysWorking as services
+from ...services import attendanceSummary as summary_services
+from ...schemas import attendanceSummary as summary_schemas
 from ...utils import jwt
-from typing import List
+from typing import List, Optional
 from datetime import date
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -63,3 +62,16 @@ async def get_working_day(
             detail="You are not allowed to access this working day"
         )
     return await services.get_working_day_by_id(db, working_id)
+
+@router.get(
+    "/me/attendance/summary",
+    response_model=List[summary_schemas.UserAttendanceSummary]
+)
+@limiter.limit("20/minute")
+async def get_my_attendance_summary(
+    request: Request,
+    year: Optional[int] = Query(None, description="Restrict to one year"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user)
+):
+    return await summary_services.get_user_summary(db, current_user.user_id, year)
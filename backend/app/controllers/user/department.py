@@ -1,14 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...configs.database import get_db
 from ...schemas import department as schemas
 from ...models import users as models
 from ...services import department as services
 from ...utils import jwt
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -1,7 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status ,Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...configs.database import get_db
 from ...schemas import deptAnnouncement as schemas
 from ...models import users as models
@@ -9,8 +7,7 @@ from ...services import deptAnnouncement as services
 from ...services import department as dept_services
 from ...utils import jwt
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
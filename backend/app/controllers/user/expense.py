@@ -1,6 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...schemas import expense as schemas
 from ...models import users as models
@@ -8,8 +6,7 @@ from ...services import expense as services
 from ...utils import jwt
 from ...configs.database import get_db
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
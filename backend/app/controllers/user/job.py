@@ -1,16 +1,13 @@
 # routes/job.py
 from fastapi import APIRouter, Depends, Path, Query, Body, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import job as schemas
 from ...services import job as services
 from ...models import users as models
 from ...utils import jwt
 from ...configs.database import get_db
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...schemas import leave as schemas
+from ...models import users as models
+from ...services import leave as services
+from ...utils import jwt
+from ...configs.database import get_db
+from typing import List, Optional
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
+
+router = APIRouter()
+
+@router.get(
+    "/me/leave/balances",
+    response_model=List[schemas.LeaveBalanceResponse]
+)
+@limiter.limit("20/minute")
+async def get_my_leave_balances(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await services.get_balances(db, current_user.user_id)
+
+@router.get(
+    "/me/leave/ledger",
+    response_model=CursorPage[schemas.LeaveLedgerResponse]
+)
+@limiter.limit("20/minute")
+async def get_my_leave_ledger(
+    request: Request,
+    limit: int = Query(50, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await services.get_ledger(db, current_user.user_id, limit=limit, cursor=cursor)
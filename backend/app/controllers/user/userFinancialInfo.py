@@ -1,7 +1,5 @@
 # routers/userFinancialInfo.py
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...configs.database import get_db
 from ...schemas import userFinancialInfo as schemas
@@ -9,8 +7,7 @@ from ...models import users as models
 from ...services import userFinancialInfo as services
 from ...utils import jwt
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
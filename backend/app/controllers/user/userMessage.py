@@ -1,15 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import userMessage as schemas
 from ...models import users as models
 from ...services import userMessage as services
 from ...utils import jwt
 from ...configs.database import get_db
-from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from typing import List, Optional, Union
+from ...schemas.pagination import CursorPage
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -36,27 +34,92 @@ async def create_message_me(
 
 @router.get(
     "/me/messages/sent",
-    response_model=List[schemas.MessageResponse]
+    response_model=Union[List[schemas.MessageResponse], CursorPage[schemas.MessageResponse]]
 )
 @limiter.limit("20/minute")
 async def get_sent_messages_me(
     request: Request,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    limit: int = Query(100, description="Messages per page, newest first"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_active_user),
 ):
-    return await services.get_sent_messages(db, current_user.user_id)
+    return await services.get_sent_messages(db, current_user.user_id, cursor=cursor, limit=limit)
 
 @router.get(
     "/me/messages/received",
-    response_model=List[schemas.MessageResponse]
+    response_model=Union[List[schemas.MessageResponse], CursorPage[schemas.MessageResponse]]
 )
 @limiter.limit("10/minute")
 async def get_received_messages_me(
     request: Request,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    limit: int = Query(100, description="Messages per page, newest first"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await services.get_received_messages(db, current_user.user_id, cursor=cursor, limit=limit)
+
+@router.get(
+    "/me/messages/sync",
+    response_model=List[schemas.MessageResponse]
+)
+@limiter.limit("60/minute")
+async def sync_messages_me(
+    request: Request,
+    after_id: str = Query("0", description="Highest message_id the client already has"),
+    limit: int = Query(100, description="Maximum messages to return"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    """Messages after ``after_id``, plus recent ones at or below it that may have committed late.
+
+    Clients dedupe on message_id and keep the highest id they have seen.
+    """
+    return await services.get_messages_since(db, current_user.user_id, after_id, limit)
+
+@router.get(
+    "/me/messages/conversations",
+    response_model=CursorPage[schemas.ConversationResponse]
+)
+@limiter.limit("30/minute")
+async def get_conversations_me(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    limit: int = Query(50, description="Conversations per page"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await services.get_conversations(db, current_user.user_id, cursor, limit)
+
+@router.get(
+    "/me/messages/threads/{peer_id}",
+    response_model=CursorPage[schemas.MessageResponse]
+)
+@limiter.limit("30/minute")
+async def get_thread_me(
+    request: Request,
+    peer_id: str = Path(..., description="The other participant's user ID"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor: empty for the first page, then the previous next_cursor"),
+    limit: int = Query(50, description="Messages per page"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await services.get_thread(db, current_user.user_id, peer_id, cursor, limit)
+
+@router.post(
+    "/me/messages/threads/{peer_id}/read",
+    response_model=schemas.MarkReadResponse
+)
+@limiter.limit("30/minute")
+async def mark_thread_read_me(
+    request: Request,
+    peer_id: str = Path(..., description="The other participant's user ID"),
+    up_to_id: str = Query(..., description="Mark messages up to and including this message_id"),
     db: AsyncSession = Depends(get_db),
     current_user: models.Users = Depends(jwt.get_active_user),
 ):
-    return await services.get_received_messages(db, current_user.user_id)
+    return await services.mark_thread_read(db, current_user.user_id, peer_id, up_to_id)
 
 @router.get(
     "/me/messages/{message_id}",
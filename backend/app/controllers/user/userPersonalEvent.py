@@ -1,7 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import userPersonalEvent as schemas
 from ...models import users as models
 from ...services import userPersonalEvent as services
@@ -9,8 +7,7 @@ from ...services import users
 from ...utils import jwt
 from ...configs.database import get_db
 from typing import List
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -1,7 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, File, UploadFile, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from ...schemas import userPersonalInfo as schemas
 from ...services import userPersonalInfo as services
 from ...services import department as dept_services
@@ -11,8 +9,7 @@ from ...configs.database import get_db
 from ...utils import jwt
 from typing import List
 from ...utils.cloudinary_helper import upload_photo
-
-limiter = Limiter(key_func=get_remote_address)
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
 
@@ -3,15 +3,15 @@ from ...models import userPersonalInfo as models_user_info
 from ...models import users as models
 from ...schemas import users as schemas
 from ...services import users as users_service
+from ...services import employeeProfile as profile_service
+from ...schemas import employeeProfile as profile_schemas
 from ...utils import jwt
 from fastapi import HTTPException, status, Depends, APIRouter, Query, Request
 from ...configs.database import get_db
 from typing import Optional, List
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from ...utils.rate_limit import limiter
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/me/user", response_model=schemas.User)
 @limiter.limit("20/minute")
@@ -36,4 +36,19 @@ async def change_password(
         current_user,
         password_change.current_password,
         password_change.new_password
-    )
\ No newline at end of file
+    )
+
+@router.get("/me/profile", response_model=profile_schemas.EmployeeProfile)
+@limiter.limit("20/minute")
+async def read_profile_me(
+    request: Request,
+    sections: Optional[List[profile_schemas.ProfileSectionEnum]] = Query(
+        None, description="Sections to load; all of them when omitted"
+    ),
+    attendance_days: int = Query(30, ge=1, le=366, description="Days of attendance history to include"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.Users = Depends(jwt.get_active_user),
+):
+    return await profile_service.get_employee_profile(
+        db, current_user.user_id, sections=sections, attendance_days=attendance_days
+    )
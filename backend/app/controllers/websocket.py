@@ -1,25 +1,39 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, APIRouter
-from typing import List
-
-connected_users: List[str] = []
+from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Query, HTTPException, status
+from ..configs.redis import redis_client
+from ..utils import jwt
+from ..utils.websocket_manager import manager
 
 router = APIRouter()
+
+async def authenticate_socket(user_id: str, token: str) -> bool:
+    if not token:
+        return False
+    try:
+        token_user_id = await jwt.decode_access_token(token)
+    except HTTPException:
+        return False
+    # Same rule as HTTP requests: the token must belong to the user and not be logged out
+    return str(token_user_id) == user_id and bool(await redis_client.get(user_id))
+
 @router.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str):
-    await websocket.accept()
-    connected_users.append(user_id)
-    print(f"User {user_id} connected.")
-    
+async def websocket_endpoint(websocket: WebSocket, user_id: str, token: str = Query(None)):
+    """Server push for one user. {"type": "ping"} frames need no reply; clients may just listen."""
+    if not await authenticate_socket(user_id, token):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    connection = await manager.connect(websocket, user_id)
     try:
         while True:
-            message = await websocket.receive_text()
-            print(f"Received message from {user_id}: {message}")
-    
+            # Any frame from the client counts as activity, as does every frame sent to it
+            await websocket.receive_text()
+            manager.touch(connection)
     except WebSocketDisconnect:
-        connected_users.remove(user_id)
-        print(f"User {user_id} disconnected.")
+        pass
+    finally:
+        await manager.disconnect(connection)
 
 
 @router.get("/ws/active-users")
 async def get_active_users():
-    return {"active_users": connected_users}
\ No newline at end of file
+    return {"active_users": await manager.active_users()}
@@ -1,25 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from .routers import authentication, userPersonalInfo, users, userFinancialInfo, userPersonalEvent, job,  department, daysHoliday, daysWorking, deptAnnouncement, application, payment, userMessage, expense, websocket
+from fastapi.staticfiles import StaticFiles
+from .routers import authentication, userPersonalInfo, users, userFinancialInfo, userPersonalEvent, job,  department, daysHoliday, daysWorking, deptAnnouncement, application, leave, payment, payrollRun, userMessage, expense, websocket, metrics
 from .configs.database import init_db
 from .configs.cloudinary import init_cloudinary
-import os, redis
+import os, redis, asyncio, uuid
 from fastapi.middleware.cors import CORSMiddleware
 from .providers.validation_exceptions import UserValidationError, EventValidationError, FinancialValidationError, AuthenticationValidationError, PermissionValidationError
 from .api.error_handlers import validation_exception_handler, event_validation_exception_handler, financial_validation_exception_handler, auth_validation_exception_handler, permission_validation_exception_handler
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from .controllers.admin.userPersonalInfo import limiter
+from .utils.principal_cache import listen_principal_invalidations
+from .utils.manager_scope import listen_manager_scope_invalidations
+from .utils.redis_lock import listen_lock_releases
+from .utils.logger import request_id_var
+from .services.daysWorking import attendance_buffer, ATTENDANCE_INGEST_MODE
+from .utils.websocket_manager import manager as websocket_manager
+from .utils.email import email_outbox, EMAIL_DELIVERY_MODE
+from .utils.storage import PHOTO_STORAGE_BACKEND, PHOTO_LOCAL_DIR, PHOTO_LOCAL_BASE_URL
 
 app = FastAPI()
 
 # Add GZip compression
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allows all origins
@@ -28,10 +31,46 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    # Correlates every log line written while handling this request
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 @app.on_event("startup")
 async def on_startup():
     await init_db()
-    init_cloudinary()
+    if PHOTO_STORAGE_BACKEND == "cloudinary":
+        init_cloudinary()
+    app.state.principal_listener = asyncio.create_task(listen_principal_invalidations())
+    app.state.manager_scope_listener = asyncio.create_task(listen_manager_scope_invalidations())
+    app.state.lock_listener = asyncio.create_task(listen_lock_releases())
+    app.state.websocket_listener = asyncio.create_task(websocket_manager.listen())
+    app.state.websocket_heartbeat = asyncio.create_task(websocket_manager.heartbeat())
+    if ATTENDANCE_INGEST_MODE == "buffered":
+        app.state.attendance_flusher = asyncio.create_task(attendance_buffer.run())
+    if EMAIL_DELIVERY_MODE == "outbox":
+        app.state.email_outbox = asyncio.create_task(email_outbox.run())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    app.state.principal_listener.cancel()
+    app.state.manager_scope_listener.cancel()
+    app.state.lock_listener.cancel()
+    app.state.websocket_listener.cancel()
+    app.state.websocket_heartbeat.cancel()
+    if ATTENDANCE_INGEST_MODE == "buffered":
+        app.state.attendance_flusher.cancel()
+        await attendance_buffer.flush()
+    if EMAIL_DELIVERY_MODE == "outbox":
+        app.state.email_outbox.cancel()
+        await asyncio.gather(app.state.email_outbox, return_exceptions=True)
 
 # Register exception handlers
 app.add_exception_handler(UserValidationError, validation_exception_handler)
@@ -51,7 +90,14 @@ app.include_router(daysHoliday.router)
 app.include_router(daysWorking.router)
 app.include_router(deptAnnouncement.router)
 app.include_router(application.router)
+app.include_router(leave.router)
 app.include_router(payment.router)
+app.include_router(payrollRun.router)
 app.include_router(userMessage.router)
 app.include_router(expense.router)
 app.include_router(websocket.router)
+app.include_router(metrics.router)
+
+if PHOTO_STORAGE_BACKEND == "local":
+    os.makedirs(PHOTO_LOCAL_DIR, exist_ok=True)
+    app.mount(PHOTO_LOCAL_BASE_URL, StaticFiles(directory=PHOTO_LOCAL_DIR), name="uploads")
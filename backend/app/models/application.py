@@ -1,6 +1,8 @@
-from sqlalchemy import Column, ForeignKey, String, Date, Boolean, Enum, Sequence
+from sqlalchemy import Column, ForeignKey, String, Date, Boolean, Enum, Sequence, DDL, event, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 import enum
 
 class LeaveTypeEnum(enum.Enum):
@@ -16,12 +18,28 @@ class StatusEnumApplication(enum.Enum):
 class Application(Base):
     __tablename__ = "application"
 
-    application_id = Column(String, Sequence("application_id_seq"),primary_key=True, index=True,nullable=False)
-    user_id = Column(String, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"),nullable=False, index=True)
+    application_id = Column(NumericId, Sequence("application_id_seq"),primary_key=True, index=True,nullable=False)
+    user_id = Column(NumericId, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"),nullable=False, index=True)
     leave_type = Column(Enum(LeaveTypeEnum), nullable=True)
     reason = Column(String, nullable=True)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date,nullable=True)
     status = Column(Enum(StatusEnumApplication), nullable=False, default=StatusEnumApplication.Pending)
-    
-    user = relationship("Users", back_populates="applications")
\ No newline at end of file
+
+    # A user's pending and approved leave may not overlap; rejected applications are ignored
+    __table_args__ = (
+        ExcludeConstraint(
+            (user_id, "="),
+            (func.daterange(start_date, end_date, "[]"), "&&"),
+            name="ex_application_user_dates",
+            using="gist",
+            where=text("status <> 'Rejected' AND start_date IS NOT NULL AND end_date IS NOT NULL"),
+        ),
+    )
+
+    user = relationship("Users", back_populates="applications")
+
+# The exclusion constraint compares user_id with "=" inside a GiST index
+event.listen(
+    Application.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist")
+)
\ No newline at end of file
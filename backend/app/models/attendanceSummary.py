@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Float, Integer, ForeignKey
+from ..configs.database import Base
+from .types import NumericId
+
+class AttendanceMonthly(Base):
+    """Per-user monthly attendance rollup, updated as each working day is closed."""
+    __tablename__ = "attendance_monthly"
+
+    user_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True, index=True)  # first day of the month
+    total_hours = Column(Float, nullable=False, default=0.0)
+    days_present = Column(Integer, nullable=False, default=0)
+    late_arrivals = Column(Integer, nullable=False, default=0)
+    overtime_hours = Column(Float, nullable=False, default=0.0)
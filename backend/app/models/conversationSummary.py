@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from ..configs.database import Base
+from .types import NumericId
+
+class ConversationSummary(Base):
+    """One row per user and conversation partner, kept current as messages are written."""
+    __tablename__ = "conversation_summary"
+
+    user_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    peer_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    last_message_id = Column(NumericId, nullable=False)
+    last_message_at = Column(DateTime(timezone=True), nullable=False)
+    last_sender_id = Column(NumericId, nullable=False)
+    last_text = Column(String, nullable=False)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_conversation_summary_inbox", user_id, last_message_at, peer_id),
+    )
@@ -1,9 +1,10 @@
 from sqlalchemy import Column, String, Date, Sequence
 from ..configs.database import Base
+from .types import NumericId
 
 class DaysHoliday(Base):
     __tablename__ = "days_holiday"
 
-    holiday_id = Column(String, Sequence("holiday_id_seq"),primary_key=True, index=True, nullable=False)
+    holiday_id = Column(NumericId, Sequence("holiday_id_seq"),primary_key=True, index=True, nullable=False)
     holiday_name = Column(String, nullable=True)
     holiday_date = Column(Date, nullable=True)
\ No newline at end of file
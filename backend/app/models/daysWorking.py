@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, Date, Sequence, Float, ForeignKey, Time
+from sqlalchemy import Column, DateTime, Date, Sequence, Float, ForeignKey, Time, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 from sqlalchemy.types import TypeDecorator, Time
 import datetime
 
@@ -20,9 +21,11 @@ class TimezoneAwareTime(TypeDecorator):
 
 class DaysWorking(Base):
     __tablename__ = "days_working"
+    # One attendance row per user per day; clock-ins upsert against it
+    __table_args__ = (UniqueConstraint("user_id", "day", name="uq_days_working_user_day"),)
 
-    working_id = Column(String, Sequence("working_id_seq"), primary_key=True, index=True, nullable=False)
-    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    working_id = Column(NumericId, Sequence("working_id_seq"), primary_key=True, index=True, nullable=False)
+    user_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
     day = Column(Date, nullable=False, index=True)
     login_time = Column(TimezoneAwareTime(timezone=True), nullable=True)
     logout_time = Column(TimezoneAwareTime(timezone=True), nullable=True)
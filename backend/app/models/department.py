@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, ForeignKey, Date, Enum,Sequence
+from sqlalchemy import Column, String, ForeignKey, Date, Enum,Sequence, Integer, UniqueConstraint, Index, DDL, event
 import enum
 from ..configs.database import Base
+from .types import NumericId
 from sqlalchemy.orm import relationship
 
 class StatusEnum(enum.Enum):
@@ -9,15 +10,31 @@ class StatusEnum(enum.Enum):
 
 class Department(Base):
     __tablename__ = "department"
-    department_id = Column(String, Sequence("department_id_seq"),primary_key=True, index=True, nullable=False)
+    department_id = Column(NumericId, Sequence("department_id_seq"),primary_key=True, index=True, nullable=False)
     department_name = Column(String, nullable=True)
-    manager_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    manager_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     location = Column(String, nullable=True)
     contact_email = Column(String, nullable=True)
     start_date = Column(Date, nullable=True)
     status = Column(Enum(StatusEnum), default=StatusEnum.Active, nullable=False)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    # A manager runs at most one department
+    __table_args__ = (
+        UniqueConstraint("manager_id", name="uq_department_manager_id"),
+        # Employee search matches department names fuzzily and by substring
+        Index(
+            "ix_department_name_trgm", "department_name",
+            postgresql_using="gin", postgresql_ops={"department_name": "gin_trgm_ops"},
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     manager = relationship("Users", back_populates="managed_departments")
     employees = relationship("UserPersonalInfo", back_populates="department")
     announcements = relationship("DeptAnnouncement", back_populates="department")
+
+event.listen(
+    Department.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
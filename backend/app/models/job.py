@@ -1,12 +1,13 @@
 from sqlalchemy import Column, ForeignKey, String, Date, Sequence
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 
 class Job(Base):
     __tablename__ = "job"
 
-    job_id = Column(String, Sequence("job_id_seq"),  primary_key=True, index=True, nullable=False)
-    user_id = Column(String, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
+    job_id = Column(NumericId, Sequence("job_id_seq"),  primary_key=True, index=True, nullable=False)
+    user_id = Column(NumericId, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
     job_tittle = Column(String, nullable=True)
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
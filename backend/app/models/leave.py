@@ -0,0 +1,41 @@
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Sequence, String, func
+from ..configs.database import Base
+from .application import LeaveTypeEnum
+from .types import NumericId
+import enum
+
+class LeaveEntryEnum(enum.Enum):
+    Adjustment = "Adjustment"  # granted or withdrawn by an admin
+    Taken = "Taken"  # an application was approved
+    Refund = "Refund"  # an approved application was rejected or deleted
+
+class LeaveLedger(Base):
+    """Append-only history of every change to a user's leave balance.
+
+    ``days`` is signed: adjustments and refunds add, taken leave subtracts.
+    """
+    __tablename__ = "leave_ledger"
+
+    entry_id = Column(NumericId, Sequence("leave_ledger_id_seq"), primary_key=True, index=True)
+    user_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    leave_type = Column(Enum(LeaveTypeEnum), nullable=False)
+    kind = Column(Enum(LeaveEntryEnum), nullable=False)
+    days = Column(Float, nullable=False)
+    application_id = Column(NumericId, ForeignKey("application.application_id", ondelete="SET NULL"), nullable=True)
+    reason = Column(String, nullable=True)
+    created_by = Column(NumericId, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_leave_ledger_user_id_entry_id", "user_id", "entry_id"),
+    )
+
+class LeaveBalance(Base):
+    """Per-user, per-leave-type running totals of the ledger, updated with every entry."""
+    __tablename__ = "leave_balance"
+
+    user_id = Column(NumericId, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    leave_type = Column(Enum(LeaveTypeEnum), primary_key=True)
+    granted = Column(Float, nullable=False, default=0.0)  # sum of adjustments
+    used = Column(Float, nullable=False, default=0.0)  # taken minus refunded
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, ForeignKey, String, Float, Integer, Enum, Sequence
+from sqlalchemy import Column, ForeignKey, String, Float, Integer, Enum, Sequence, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 import enum
 
 class PaymentEnum(enum.Enum):
@@ -10,14 +11,22 @@ class PaymentEnum(enum.Enum):
 class Payment(Base):
     __tablename__ = "payment"
 
-    payment_id = Column(String, Sequence("payment_id_seq"), primary_key=True, index=True, nullable=False)
-    user_id = Column(String, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
+    payment_id = Column(NumericId, Sequence("payment_id_seq"), primary_key=True, index=True, nullable=False)
+    user_id = Column(NumericId, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
     payment_method = Column(Enum(PaymentEnum), nullable=True, default=PaymentEnum.Check)
     payment_month = Column(Integer, nullable=True)
     payment_date = Column(Integer, nullable=True)
     payment_fine = Column(Float, nullable=True)
     payment_amount = Column(Float, nullable=True)
     comments = Column(String, nullable=True)
+    # Set on payments created by a payroll run, one per employee and run
+    payroll_run_id = Column(NumericId, ForeignKey("payroll_run.run_id", ondelete="CASCADE"), nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __table_args__ = (
+        UniqueConstraint("payroll_run_id", "user_id", name="uq_payment_payroll_run_user"),
+    )
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     user = relationship("Users", back_populates="payments")
\ No newline at end of file
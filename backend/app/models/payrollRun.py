@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, Sequence, UniqueConstraint, func
+from ..configs.database import Base
+from .types import NumericId
+
+class PayrollRun(Base):
+    """One month's payroll. Its payments point back at it, so a rerun updates them in place."""
+    __tablename__ = "payroll_run"
+
+    run_id = Column(NumericId, Sequence("payroll_run_id_seq"), primary_key=True, index=True)
+    month = Column(Date, nullable=False)  # first day of the month
+    employees = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    total_fine = Column(Float, nullable=False, default=0.0)
+    runs = Column(Integer, nullable=False, default=0)
+    duration_ms = Column(Float, nullable=True)  # of the last run
+    started_by = Column(NumericId, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("month", name="uq_payroll_run_month"),
+    )
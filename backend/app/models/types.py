@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+class NumericId(TypeDecorator):
+    """BIGINT key column that is exposed to the application as a string.
+
+    Ordering and joins run on the integer B-tree index, while schemas, path
+    parameters, JWT subjects and Redis keys keep using string ids.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            # A non-numeric id can never exist, so it binds as NULL and matches nothing
+            return None
+
+    def process_result_value(self, value, dialect):
+        if value is not None:
+            value = str(value)
+        return value
@@ -1,12 +1,13 @@
-from sqlalchemy import Column, ForeignKey, String, Float, Sequence
+from sqlalchemy import Column, ForeignKey, String, Float, Sequence, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 
 class UserFinancialInfo(Base):
     __tablename__ = "users_financial_info"
 
-    financial_info_id = Column(String, Sequence("financial_id_seq"), primary_key=True, index=True, nullable=False)
-    user_id = Column(String, ForeignKey("users.user_id",onupdate="CASCADE", ondelete="CASCADE"), nullable=False, index=True)
+    financial_info_id = Column(NumericId, Sequence("financial_id_seq"), primary_key=True, index=True, nullable=False)
+    user_id = Column(NumericId, ForeignKey("users.user_id",onupdate="CASCADE", ondelete="CASCADE"), nullable=False)
     salaryBasic = Column(Float, nullable=False)
     salaryGross = Column(Float, nullable=False)
     salaryNet = Column(Float, nullable=False)
@@ -25,6 +26,12 @@ class UserFinancialInfo(Base):
     accountName = Column(String, nullable=True)
     accountNumber = Column(String, nullable=True)
     iban = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_users_financial_info_user_id"),
+    )
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     user = relationship("Users", back_populates="financial_info")
\ No newline at end of file
@@ -1,17 +1,29 @@
-from sqlalchemy import Column, String, ForeignKey, Sequence, DateTime, Boolean
+from sqlalchemy import Column, String, ForeignKey, Sequence, DateTime, Boolean, Index, func, false
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
-from datetime import datetime
+from .types import NumericId
+from datetime import datetime, timezone
 
 class UserMessage(Base):
     __tablename__ = "user_message"
-    message_id = Column(String, Sequence("message_id_seq"), primary_key=True, index = True, nullable=False)
-    sender_id = Column(String, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False, index=True)
-    receiver_id = Column(String, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False, index=True)
+    message_id = Column(NumericId, Sequence("message_id_seq"), primary_key=True, index = True, nullable=False)
+    sender_id = Column(NumericId, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False, index=True)
+    receiver_id = Column(NumericId, ForeignKey("users.user_id", onupdate="CASCADE", ondelete="CASCADE"), nullable=False, index=True)
     text = Column(String, nullable=False)
-    # created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    # is_read = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now(), nullable=False)
+    is_read = Column(Boolean, default=False, server_default=false(), nullable=False)
     # status = Column(String, default="sent", nullable=False)  # sent, delivered, read
+
+    # A conversation is the unordered pair of participants; threads are read newest first
+    __table_args__ = (
+        Index(
+            "ix_user_message_thread",
+            func.least(sender_id, receiver_id),
+            func.greatest(sender_id, receiver_id),
+            created_at,
+            message_id,
+        ),
+    )
     
     # Relationships
     sender = relationship("Users", foreign_keys=[sender_id], back_populates="messages_sent")
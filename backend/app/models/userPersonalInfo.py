@@ -1,6 +1,8 @@
-from sqlalchemy import Column, ForeignKey, String, Date, Enum, Sequence
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, ForeignKey, String, Date, Enum, Sequence, Integer, UniqueConstraint, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from ..configs.database import Base
+from .types import NumericId
 import enum
 
 class MaritalStatusEnum(enum.Enum):
@@ -8,24 +10,56 @@ class MaritalStatusEnum(enum.Enum):
         Single = "Single"
         Widowed = "Widowed"
 
+# Directory search document: the name ranks above contact details, which rank
+# above location. Emails are indexed whole and split on '@' and '.', so a
+# typeahead on "doe" finds john.doe@example.com.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(fullname, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(email, '') || ' ' || translate(coalesce(email, ''), '@.', '  ')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(phone, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(country, '')), 'C')"
+)
+
 class UserPersonalInfo(Base):
     __tablename__ = "users_personal_info"
 
-    personal_info_id = Column(String, Sequence("personal_id_seq"), primary_key=True, index=True, nullable=False) 
-    user_id = Column(String, ForeignKey("users.user_id",onupdate="CASCADE", ondelete="CASCADE"), index=True, nullable= False)
+    personal_info_id = Column(NumericId, Sequence("personal_id_seq"), primary_key=True, index=True, nullable=False) 
+    user_id = Column(NumericId, ForeignKey("users.user_id",onupdate="CASCADE", ondelete="CASCADE"), nullable= False)
     fullname = Column(String, nullable= True)
     citizen_card = Column(String, nullable=True)
     date_of_birth = Column(Date, nullable=True)
     sex = Column(String, nullable=True)
-    phone = Column(String, nullable=True, index=True)
-    email = Column(String, nullable=True, index=True)
+    phone = Column(String, nullable=True)
+    email = Column(String, nullable=True)
     marital_status = Column(Enum(MaritalStatusEnum),nullable=True)
     address = Column(String, nullable=True)
     city = Column(String, nullable=True)
     country = Column(String, nullable=True)
-    department_id = Column(String, ForeignKey("department.department_id", ondelete="CASCADE"), nullable=True, index=True)
+    department_id = Column(NumericId, ForeignKey("department.department_id", ondelete="CASCADE"), nullable=True, index=True)
     photo_url = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")
+    # Maintained by PostgreSQL and only read by the search query
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+    # One profile per user and no shared email or phone; the database enforces it
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_users_personal_info_user_id"),
+        UniqueConstraint("email", name="uq_users_personal_info_email"),
+        UniqueConstraint("phone", name="uq_users_personal_info_phone"),
+        Index("ix_users_personal_info_search", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_users_personal_info_fullname_trgm", "fullname",
+            postgresql_using="gin", postgresql_ops={"fullname": "gin_trgm_ops"},
+        ),
+    )
+    # Every UPDATE checks and bumps the version; a concurrent change raises StaleDataError
+    __mapper_args__ = {"version_id_col": version}
     
     # Relationships
     user = relationship("Users", back_populates="personal_info")
-    department = relationship("Department", back_populates="employees")
\ No newline at end of file
+    department = relationship("Department", back_populates="employees")
+
+# The trigram indexes need pg_trgm before create_all builds them
+event.listen(
+    UserPersonalInfo.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
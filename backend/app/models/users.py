@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, Integer, Boolean, DateTime, Sequence, Enum, ForeignKey
 from sqlalchemy.orm import relationship
 from ..configs.database import Base
+from .types import NumericId
 from datetime import datetime, timedelta
 import enum
 
@@ -16,7 +17,7 @@ class StatusEnum(enum.Enum):
 class Users(Base):
     __tablename__ = "users"
 
-    user_id = Column(String, Sequence("user_id_seq"), primary_key=True, index=True)
+    user_id = Column(NumericId, Sequence("user_id_seq"), primary_key=True, index=True)
     username = Column(String, nullable=False, unique=True, index=True)
     password = Column(String, nullable=False, unique=True, index=True)
     role = Column(Enum(RoleEnum), default=RoleEnum.User, nullable=False)
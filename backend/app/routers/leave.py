@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from ..controllers.admin import leave as admin
+from ..controllers.user import leave as user
+from ..controllers.manager import leave as manager
+
+router = APIRouter()
+
+router.include_router(admin.router, prefix="/api", tags=["leave_admin"])
+router.include_router(user.router, prefix="/api", tags=["leave_user"])
+router.include_router(manager.router, prefix="/api", tags=["leave_manager"])
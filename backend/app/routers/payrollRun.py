@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+from ..controllers.admin import payrollRun as admin
+
+router = APIRouter()
+
+router.include_router(admin.router, prefix="/api", tags=["payroll_admin"])
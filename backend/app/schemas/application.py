@@ -1,6 +1,6 @@
 from pydantic import BaseModel, validator
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 from ..models.application import LeaveTypeEnum, StatusEnumApplication
 
@@ -13,8 +13,16 @@ class ApplicationBase(BaseModel):
     end_date: Optional[date] = None
     status: Optional[StatusEnumApplication] = None
 
+def _end_not_before_start(v, values):
+    start = values.get('start_date')
+    if v and start and v < start:
+        raise ValueError('end_date must not be before start_date')
+    return v
+
 class ApplicationCreate(ApplicationBase):
-    pass
+    @validator('end_date')
+    def validate_end_date(cls, v, values):
+        return _end_not_before_start(v, values)
 
 class ApplicationUpdate(BaseModel):
     leave_type: Optional[LeaveTypeEnum] = None
@@ -23,6 +31,39 @@ class ApplicationUpdate(BaseModel):
     end_date: Optional[date] = None
     status: Optional[StatusEnumApplication] = None
 
+    @validator('end_date')
+    def validate_end_date(cls, v, values):
+        return _end_not_before_start(v, values)
+
+class ApplicationDecision(BaseModel):
+    application_ids: List[str]
+    status: StatusEnumApplication
+    reason: Optional[str] = None
+
+    @validator('application_ids', each_item=True)
+    def normalize_application_id(cls, v):
+        # "007" and "7" name the same row; report it back the way it is stored
+        try:
+            return str(int(v))
+        except ValueError:
+            return v.strip()
+
+    @validator('application_ids')
+    def dedupe_application_ids(cls, v):
+        return list(dict.fromkeys(v))
+
+    @validator('status')
+    def validate_status(cls, v):
+        if v is StatusEnumApplication.Pending:
+            raise ValueError('status must be Approved or Rejected')
+        return v
+
+class ApplicationDecisionResult(BaseModel):
+    status: StatusEnumApplication
+    decided: List[str]
+    # Not found, already decided, incomplete (no leave type or dates) or outside the manager's department
+    skipped: List[str]
+
 class ApplicationResponse(ApplicationBase):
     application_id: str
     
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+class AttendanceTotals(BaseModel):
+    total_hours: float = 0.0
+    days_present: int = 0
+    late_arrivals: int = 0
+    overtime_hours: float = 0.0
+
+class UserAttendanceSummary(AttendanceTotals):
+    user_id: str
+    month: date
+
+    class Config:
+        orm_mode = True
+
+class DepartmentAttendanceSummary(AttendanceTotals):
+    department_id: Optional[str] = None
+    month: date
+    members: int = 0
+
+class DepartmentAttendanceDetail(DepartmentAttendanceSummary):
+    users: List[UserAttendanceSummary] = []
@@ -22,9 +22,11 @@ class DepartmentUpdate(BaseModel):
     contact_email: Optional[EmailStr] = None
     start_date: Optional[date] = None
     status: Optional[department.StatusEnum] = None
+    version: Optional[int] = None
 
 class DepartmentResponse(DepartmentBase):
     department_id: str
+    version: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportFieldError(BaseModel):
+    field: str
+    message: str
+
+class ImportRowError(BaseModel):
+    row: int  # line in the file, the header being row 1
+    errors: List[ImportFieldError]
+
+class EmployeeImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    dry_run: bool
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
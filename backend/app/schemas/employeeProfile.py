@@ -0,0 +1,29 @@
+from typing import List, Optional
+from enum import Enum
+from .users import User
+from .userPersonalInfo import UserInfoResponse
+from .userFinancialInfo import UserFinancialInfoResponse
+from .job import Job
+from .department import DepartmentResponse, DepartmentManagerInfo
+from .application import ApplicationResponse
+from .daysWorking import DaysWorkingResponse
+
+class ProfileSectionEnum(str, Enum):
+    personal_info = "personal_info"
+    financial_info = "financial_info"
+    jobs = "jobs"
+    department = "department"
+    applications = "applications"
+    attendance = "attendance"
+
+class ProfileDepartment(DepartmentResponse):
+    manager: Optional[DepartmentManagerInfo] = None
+
+class EmployeeProfile(User):
+    # Sections that were not requested stay null
+    personal_info: Optional[UserInfoResponse] = None
+    financial_info: Optional[UserFinancialInfoResponse] = None
+    jobs: Optional[List[Job]] = None
+    department: Optional[ProfileDepartment] = None
+    applications: Optional[List[ApplicationResponse]] = None
+    attendance: Optional[List[DaysWorkingResponse]] = None
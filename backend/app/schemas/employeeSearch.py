@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+class SearchModeEnum(str, Enum):
+    search = "search"  # full text plus typo-tolerant name matching
+    prefix = "prefix"  # typeahead: every word is a prefix
+
+class EmployeeSearchHit(BaseModel):
+    personal_info_id: str
+    user_id: str
+    fullname: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    department_id: Optional[str] = None
+    department_name: Optional[str] = None
+    photo_url: Optional[str] = None
+    rank: float
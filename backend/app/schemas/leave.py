@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from ..models.application import LeaveTypeEnum
+from ..models.leave import LeaveEntryEnum
+
+class LeaveBalanceResponse(BaseModel):
+    user_id: str
+    leave_type: LeaveTypeEnum
+    granted: float
+    used: float
+    remaining: float
+
+class LeaveAdjustmentCreate(BaseModel):
+    user_id: str
+    leave_type: LeaveTypeEnum
+    days: float  # negative to withdraw
+    reason: Optional[str] = None
+
+class LeaveLedgerResponse(BaseModel):
+    entry_id: str
+    user_id: str
+    leave_type: LeaveTypeEnum
+    kind: LeaveEntryEnum
+    days: float
+    application_id: Optional[str] = None
+    reason: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
@@ -27,9 +27,12 @@ class PaymentUpdate(BaseModel):
     payment_amount: Optional[float] = None
     comments: Optional[str] = None
     payment_fine: Optional[float] = None
+    version: Optional[int] = None
 
 class PaymentResponse(PaymentBase):
     payment_id: str
+    payroll_run_id: Optional[str] = None
+    version: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class PayrollRunResponse(BaseModel):
+    run_id: str
+    month: date
+    employees: int
+    total_amount: float
+    total_fine: float
+    runs: int
+    duration_ms: Optional[float] = None
+    started_by: Optional[str] = None
+    computed_at: datetime
+
+    class Config:
+        orm_mode = True
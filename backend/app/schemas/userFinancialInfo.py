@@ -127,6 +127,7 @@ class UserFinancialInfoUpdate(BaseModel):
     accountName: Optional[str] = None
     accountNumber: Optional[str] = None
     iban: Optional[str] = None
+    version: Optional[int] = None
 
     # Update validators to use field_validator
     @field_validator('salaryBasic', 'salaryGross', 'salaryNet')
@@ -181,6 +182,7 @@ class UserFinancialInfoUpdate(BaseModel):
 
 class UserFinancialInfoResponse(UserFinancialInfoBase):
     financial_info_id: str
+    version: Optional[int] = None
 
     class Config:
         orm_mode = True
\ No newline at end of file
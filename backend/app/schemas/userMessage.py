@@ -1,10 +1,11 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 class MessageBase(BaseModel):
     sender_id: Optional[str] = None
     receiver_id: str
-    ext: Optional[str] = None
+    text: Optional[str] = None
 
 class MessageCreate(MessageBase):
     pass
@@ -14,6 +15,23 @@ class MessageUpdate(BaseModel):
 
 class MessageResponse(MessageBase):
     message_id: str
+    created_at: Optional[datetime] = None
+    is_read: Optional[bool] = None
+
+    class Config:
+        orm_mode = True
+
+class ConversationResponse(BaseModel):
+    peer_id: str
+    last_message_id: str
+    last_message_at: datetime
+    last_sender_id: str
+    last_text: str
+    unread_count: int
 
     class Config:
         orm_mode = True
+
+class MarkReadResponse(BaseModel):
+    marked: int
+    unread_count: int
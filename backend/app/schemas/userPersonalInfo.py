@@ -48,6 +48,8 @@ class UserInfoUpdate(BaseModel):
     city: Optional[str] = None
     country: Optional[str] = None
     department_id: Optional[str] = None
+    # Optimistic concurrency: the version last read; a stale one gets 409
+    version: Optional[int] = None
 
     @validator('phone')
     def check_phone(cls, v):
@@ -72,6 +74,7 @@ class UserInfoUpdateNoDepartment(BaseModel):
     address: Optional[str] = None
     city: Optional[str] = None
     country: Optional[str] = None
+    version: Optional[int] = None
 
     @validator('phone')
     def check_phone(cls, v):
@@ -90,6 +93,7 @@ class UserInfoPhotoUpdate(BaseModel):
 
 class UserInfoResponse(UserInfoBase):
     personal_info_id: str
+    version: Optional[int] = None
 
     class Config:
         orm_mode = True
\ No newline at end of file
@@ -2,56 +2,55 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import application as models
 from ..schemas import application as schemas
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, IntegrityError
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
-from ..services import users as user_service  # Add this import
 from ..utils.logger import logger
+from .pagination import paginate
+from .repository import delete_returning, insert_returning, update_returning
+from .concurrency import missing_reference, unique_conflict
+from . import leave as leave_services
+from ..models.leave import LeaveEntryEnum
+
+_REFERENCE_MESSAGES = {
+    "application_user_id_fkey": "User not found",
+}
+
+_CONFLICT_MESSAGES = {
+    "ex_application_user_dates": "The dates overlap another pending or approved application",
+}
+
+# Columns the ledger derives an approved application's days from
+_LEDGER_FIELDS = {"leave_type", "start_date", "end_date"}
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    """Validate if a user exists in the database"""
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        # Re-raise HTTP exceptions directly
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error while validating user: {str(e)}"
-        )
-
 async def create_application(db: AsyncSession, application: schemas.ApplicationCreate):
-    # Validate user existence
-    await _validate_user_exists(db, application.user_id)
-    
     async with DistributedLock(f"application:user:{application.user_id}"):
         try:
-            db_application = models.Application(
-                user_id=application.user_id,
-                leave_type=application.leave_type,
-                reason=application.reason,
-                start_date=application.start_date,
-                end_date=application.end_date,
-                status="Pending"
-            )
-            db.add(db_application)
+            db_application = await insert_returning(db, models.Application, {
+                "user_id": application.user_id,
+                "leave_type": application.leave_type,
+                "reason": application.reason,
+                "start_date": application.start_date,
+                "end_date": application.end_date,
+                "status": "Pending"
+            })
             await db.commit()
-            await db.refresh(db_application)
             await logger.info("Created application", {
                 "application_id": db_application.application_id,
                 "user_id": application.user_id
             })
             return db_application
+        except IntegrityError as e:
+            await db.rollback()
+            error = unique_conflict(e, _CONFLICT_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Create application failed", error=e)
+                raise
+            raise error
         except Exception as e:
             await logger.error("Create application failed", error=e)
             await db.rollback()
@@ -99,16 +98,41 @@ async def get_applications_by_user_id(db: AsyncSession, user_id: str):
         await logger.error("Get applications by user failed", error=e)
         raise
 
+async def get_applications_by_user_ids(db: AsyncSession, user_ids) -> List[models.Application]:
+    """Applications of several users in one query, e.g. a department's members."""
+    try:
+        if not user_ids:
+            return []
+        result = await db.execute(
+            select(models.Application).filter(
+                models.Application.user_id.in_(list(user_ids))
+            ).order_by(models.Application.application_id)
+        )
+        applications = result.scalars().all()
+        await logger.info("Retrieved applications for users", {"users": len(user_ids), "count": len(applications)})
+        return applications
+    except Exception as e:
+        await logger.error("Get applications by users failed", error=e)
+        raise
+
 async def get_all_applications(
-    db: AsyncSession, skip: int = 0, limit: int = 200
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
 ) -> List[models.Application]:
     try:
+        query = select(models.Application)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.Application.application_id], cursor, limit)
+            await logger.info("Retrieved applications page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.Application).offset(skip).limit(limit)
+            query.order_by(models.Application.application_id).offset(skip).limit(limit)
         )
         applications = result.scalars().all()
         await logger.info("Retrieved all applications", {"count": len(applications), "skip": skip, "limit": limit})
         return applications if applications else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all applications failed", error=e)
         raise HTTPException(
@@ -117,32 +141,74 @@ async def get_all_applications(
         )
 
 async def update_application(
-    db: AsyncSession, application_id: str, application: schemas.ApplicationUpdate
+    db: AsyncSession,
+    application_id: str,
+    application: schemas.ApplicationUpdate,
+    decided_by: Optional[str] = None,
 ):
     async with DistributedLock(f"application:{application_id}"):
         try:
-            query = (
-                update(models.Application)
-                .where(models.Application.application_id == application_id)
-                .values(application.dict(exclude_unset=True))
-            )
-
-            result = await db.execute(query)
-            await db.commit()
-
-            if result.rowcount == 0:
-                await logger.warning("Application not found for update", {"application_id": application_id})
+            changes = application.dict(exclude_unset=True)
+            decision = changes.pop("status", None)
+            if decision is models.StatusEnumApplication.Pending:
                 raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Application not found"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="An application cannot be set back to Pending"
                 )
 
-            updated_app = await get_application_by_id(db, application_id)
+            where = models.Application.application_id == application_id
+            updated_app = None
+            if changes:
+                guarded = where
+                if changes.keys() & _LEDGER_FIELDS:
+                    # Approved leave is already in the ledger; it has to be rejected (refunded) first
+                    guarded = guarded & (models.Application.status != models.StatusEnumApplication.Approved)
+                updated_app = await update_returning(db, models.Application, guarded, changes)
+                if updated_app is None:
+                    await get_application_by_id(db, application_id)
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Reject an approved application before changing its leave type or dates"
+                    )
+
+            if decision is not None:
+                decided = await leave_services.apply_decision(db, [application_id], decision, decided_by)
+                if decided:
+                    updated_app = decided[0]
+                else:
+                    current = await get_application_by_id(db, application_id)
+                    if current.status is not decision:
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail="Only pending applications with a leave type and dates can be approved"
+                        )
+                    updated_app = current
+            if updated_app is None:
+                updated_app = await get_application_by_id(db, application_id)
+            await db.commit()
+
             await logger.info("Updated application", {
                 "application_id": application_id,
                 "new_status": updated_app.status
             })
             return updated_app
+        except HTTPException:
+            await db.rollback()
+            raise
+        except IntegrityError as e:
+            await db.rollback()
+            error = unique_conflict(e, _CONFLICT_MESSAGES)
+            if error is None:
+                await logger.error("Update application failed", {"application_id": application_id, "error": str(e)})
+                raise
+            raise error
+        except DataError:
+            # daterange() refuses an end before the start, e.g. when only one of them is updated
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end_date must not be before start_date"
+            )
         except Exception as e:
             await logger.error("Update application failed", {"application_id": application_id, "error": str(e)})
             await db.rollback()
@@ -151,20 +217,26 @@ async def update_application(
 async def delete_application(db: AsyncSession, application_id: str):
     async with DistributedLock(f"application:{application_id}"):
         try:
-            result = await db.execute(
-                delete(models.Application).where(
-                    models.Application.application_id == application_id
-                )
+            deleted = await delete_returning(
+                db, models.Application, models.Application.application_id == application_id
             )
-            await db.commit()
-
-            if result.rowcount == 0:
+            if deleted is None:
                 await logger.warning("Application not found for deletion", {"application_id": application_id})
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Application not found"
                 )
 
+            if deleted.status is models.StatusEnumApplication.Approved:
+                refund = leave_services.application_entry(
+                    deleted, LeaveEntryEnum.Refund, reason=f"Application {application_id} deleted"
+                )
+                if refund:
+                    # The entry outlives the application it refunds
+                    refund["application_id"] = None
+                    await leave_services.post_entries(db, [refund])
+            await db.commit()
+
             await logger.info("Deleted application", {"application_id": application_id})
             return {"message": "Application deleted successfully"}
         except Exception as e:
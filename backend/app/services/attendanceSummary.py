@@ -0,0 +1,171 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, case, literal, extract
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from fastapi import HTTPException, status
+from ..models import attendanceSummary as models
+from ..models import daysWorking as models_working
+from ..models import userPersonalInfo as models_user_info
+from ..utils.logger import logger
+from datetime import date, time, timedelta, datetime, timezone
+from typing import Optional
+import os
+
+# Shift start is compared with login_time, which is stored in UTC
+ATTENDANCE_SHIFT_START = time.fromisoformat(os.getenv("ATTENDANCE_SHIFT_START", "09:00"))
+ATTENDANCE_LATE_GRACE_MINUTES = int(os.getenv("ATTENDANCE_LATE_GRACE_MINUTES", 0))
+ATTENDANCE_STANDARD_HOURS = float(os.getenv("ATTENDANCE_STANDARD_HOURS", 8))
+
+def _late_after() -> time:
+    start = datetime.combine(date.today(), ATTENDANCE_SHIFT_START)
+    late = start + timedelta(minutes=ATTENDANCE_LATE_GRACE_MINUTES)
+    return late.time().replace(tzinfo=timezone.utc)
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _next_month(month: date) -> date:
+    return (month_start(month) + timedelta(days=32)).replace(day=1)
+
+def _is_late(login_time: Optional[time]) -> bool:
+    if login_time is None:
+        return False
+    if login_time.tzinfo is None:
+        login_time = login_time.replace(tzinfo=timezone.utc)
+    return login_time > _late_after()
+
+async def add_closed_day(
+    db: AsyncSession,
+    user_id: str,
+    day: date,
+    login_time: Optional[time],
+    total_hours: Optional[float],
+    sign: int = 1
+):
+    """Fold one closed working day into the monthly rollup (sign=-1 removes it).
+
+    Runs in the caller's transaction so the rollup commits together with the
+    attendance row it summarizes.
+    """
+    hours = total_hours or 0.0
+    values = {
+        "user_id": user_id,
+        "month": month_start(day),
+        "total_hours": sign * hours,
+        "days_present": sign,
+        "late_arrivals": sign * int(_is_late(login_time)),
+        "overtime_hours": sign * max(0.0, hours - ATTENDANCE_STANDARD_HOURS),
+    }
+    stmt = pg_insert(models.AttendanceMonthly).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.AttendanceMonthly.user_id, models.AttendanceMonthly.month],
+        set_={
+            column: getattr(models.AttendanceMonthly, column) + getattr(stmt.excluded, column)
+            for column in ("total_hours", "days_present", "late_arrivals", "overtime_hours")
+        }
+    )
+    await db.execute(stmt)
+
+async def rebuild_month(db: AsyncSession, month: date):
+    """Recompute one month of the rollup from days_working with a single GROUP BY."""
+    month = month_start(month)
+    working = models_working.DaysWorking
+    try:
+        aggregate = (
+            select(
+                working.user_id,
+                literal(month),
+                func.coalesce(func.sum(working.total_hours), 0.0),
+                func.count(),
+                func.sum(case((working.login_time > _late_after(), 1), else_=0)),
+                func.coalesce(func.sum(func.greatest(working.total_hours - ATTENDANCE_STANDARD_HOURS, 0.0)), 0.0),
+            )
+            .where(
+                working.day >= month,
+                working.day < _next_month(month),
+                working.logout_time.isnot(None)
+            )
+            .group_by(working.user_id)
+        )
+        await db.execute(
+            delete(models.AttendanceMonthly).where(models.AttendanceMonthly.month == month)
+        )
+        await db.execute(
+            insert(models.AttendanceMonthly).from_select(
+                ["user_id", "month", "total_hours", "days_present", "late_arrivals", "overtime_hours"],
+                aggregate
+            )
+        )
+        await db.commit()
+        await logger.info("Rebuilt attendance rollup", {"month": str(month)})
+        return {"detail": f"Attendance summary rebuilt for {month.strftime('%Y-%m')}"}
+    except Exception as e:
+        await logger.error("Rebuild attendance rollup failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to rebuild attendance summary"
+        )
+
+async def get_user_summary(db: AsyncSession, user_id: str, year: Optional[int] = None):
+    query = select(models.AttendanceMonthly).where(models.AttendanceMonthly.user_id == user_id)
+    if year is not None:
+        query = query.where(extract("year", models.AttendanceMonthly.month) == year)
+    result = await db.execute(query.order_by(models.AttendanceMonthly.month))
+    return result.scalars().all()
+
+async def get_department_summary(db: AsyncSession, department_id: str, month: date):
+    month = month_start(month)
+    result = await db.execute(
+        select(models.AttendanceMonthly)
+        .join(
+            models_user_info.UserPersonalInfo,
+            models_user_info.UserPersonalInfo.user_id == models.AttendanceMonthly.user_id
+        )
+        .where(
+            models_user_info.UserPersonalInfo.department_id == department_id,
+            models.AttendanceMonthly.month == month
+        )
+        .order_by(models.AttendanceMonthly.user_id)
+    )
+    rows = result.scalars().all()
+    await logger.info("Retrieved department attendance summary", {
+        "department_id": department_id,
+        "month": str(month)
+    })
+    return {
+        "department_id": department_id,
+        "month": month,
+        "members": len(rows),
+        "total_hours": sum(row.total_hours for row in rows),
+        "days_present": sum(row.days_present for row in rows),
+        "late_arrivals": sum(row.late_arrivals for row in rows),
+        "overtime_hours": sum(row.overtime_hours for row in rows),
+        "users": rows,
+    }
+
+async def get_departments_overview(db: AsyncSession, month: date):
+    month = month_start(month)
+    rollup = models.AttendanceMonthly
+    department_id = models_user_info.UserPersonalInfo.department_id
+    result = await db.execute(
+        select(
+            department_id,
+            func.count().label("members"),
+            func.sum(rollup.total_hours).label("total_hours"),
+            func.sum(rollup.days_present).label("days_present"),
+            func.sum(rollup.late_arrivals).label("late_arrivals"),
+            func.sum(rollup.overtime_hours).label("overtime_hours"),
+        )
+        .select_from(rollup)
+        .join(
+            models_user_info.UserPersonalInfo,
+            models_user_info.UserPersonalInfo.user_id == rollup.user_id
+        )
+        .where(rollup.month == month)
+        .group_by(department_id)
+        .order_by(department_id)
+    )
+    return [
+        {"month": month, **row._mapping}
+        for row in result.all()
+    ]
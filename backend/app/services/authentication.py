@@ -17,11 +17,13 @@ from sqlalchemy import select, and_, func, text, delete
 from ..utils import crypto, jwt, email, otp
 from ..configs.database import get_db
 from fastapi.security import OAuth2PasswordRequestForm
-from pathlib import Path
 from ..configs.redis import redis_client
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
+from ..utils.templates import email_templates
+from ..utils.principal_cache import invalidate_principal
 from ..services import daysWorking as services
+from .repository import update_returning
 
 
 async def register(
@@ -36,7 +38,7 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already register"
         )
 
-    user.password = crypto.hash_password(user.password)
+    user.password = await crypto.hash_password_async(user.password)
     return await users.create_user(db, user)
 
 
@@ -82,7 +84,7 @@ async def login(form_data: OAuth2PasswordRequestForm, db: AsyncSession):
         #         headers={"WWW-Authenticate": "Bearer"},
         #     )
 
-        if not crypto.verify_password(form_data.password, db_user.password):
+        if not await crypto.verify_password_async(form_data.password, db_user.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username/email or password",
@@ -147,6 +149,7 @@ async def logout_me(current_user: models_user.Users, db: AsyncSession):
         
         # Remove access token from Redis using user_id as key
         deleted = await redis_client.delete(user_id)
+        await invalidate_principal(user_id)
         if deleted == 0:
             await logger.warning("Logout failed: Token not found", {"user_id": user_id})
             raise HTTPException(
@@ -201,7 +204,7 @@ async def login_admin(form_data: OAuth2PasswordRequestForm = Depends(), db: Asyn
         
         db_user, email_user = user_info
 
-        if not crypto.verify_password(form_data.password, db_user.password):
+        if not await crypto.verify_password_async(form_data.password, db_user.password):
             await logger.warning("Login attempt failed: Incorrect Password", {"username": form_data.username})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -231,16 +234,14 @@ async def login_admin(form_data: OAuth2PasswordRequestForm = Depends(), db: Asyn
         subject = "OTP for Login"
         recipient = [email_user]
         
-        template_path = Path(__file__).parent.parent / 'templates' / 'otp_email_login.html'
-        with open(template_path, 'r') as file:
-            html_template = file.read()
-        
-        message = html_template.format(username=db_user.username, otp_code=otp_code)
+        message = email_templates.render("otp_email_login.html", username=db_user.username, otp_code=otp_code)
         
         await email.send_mail(subject, recipient, message)
         await logger.info("OTP sent successfully", {"username": db_user.username})
         
         return {"message": "OTP sent successfully"}
+    except crypto.HashPoolSaturatedError:
+        raise
     except Exception as e:
         await logger.error("Error during login process", {"error": str(e)})
         raise HTTPException(
@@ -341,6 +342,7 @@ async def logout_admin(current_user: models_user.Users, db: AsyncSession):
         user_id = str(current_user.user_id)
         # Remove access token from Redis using user_id as key
         deleted = await redis_client.delete(user_id)
+        await invalidate_principal(user_id)
         if deleted == 0:
             await logger.warning("Logout failed: Token not found", {"user_id": user_id})
             raise HTTPException(
@@ -382,13 +384,9 @@ async def forgot_password(
         subject = "Reset code"
         recipient = [email_user]
 
-        template_path = (
-            Path(__file__).parent.parent / "templates" / "otp_email_forgot_password.html"
+        message = email_templates.render(
+            "otp_email_forgot_password.html", username=username, reset_code=reset_code
         )
-        with open(template_path, "r") as file:
-            html_template = file.read()
-
-        message = html_template.format(username=username, reset_code=reset_code)
 
         await email.send_mail(subject, recipient, message)
 
@@ -444,25 +442,20 @@ async def forgot_password(
 #         )
 
 async def reset_password(db: AsyncSession, new_password: str, email: str):
-    stmt = (
-        select(
-            models_user.Users
-        )
-        .join(
-            models_user_info.UserPersonalInfo,
-            models_user.Users.user_id == models_user_info.UserPersonalInfo.user_id,
-        )
+    hashed_password = await crypto.hash_password_async(new_password)
+    owner = (
+        select(models_user_info.UserPersonalInfo.user_id)
         .where(models_user_info.UserPersonalInfo.email == email)
     )
-    result = await db.execute(stmt)
-    user = result.scalars().first()
+    user = await update_returning(
+        db, models_user.Users, models_user.Users.user_id.in_(owner), {"password": hashed_password}
+    )
 
     if not user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User Not Found")
 
-    user.password = crypto.hash_password(new_password)
-    db.add(user)
     await db.commit()
+    await invalidate_principal(user.user_id)
     return user.password
 
 async def reset_passwords(
@@ -0,0 +1,46 @@
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE_VIOLATION = "23505"
+EXCLUSION_VIOLATION = "23P01"
+FOREIGN_KEY_VIOLATION = "23503"
+STALE_DETAIL = "This record was changed by someone else. Reload it and try again."
+
+def conflict(detail: str = STALE_DETAIL) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+def _constraint_name(error: IntegrityError) -> Optional[str]:
+    # asyncpg keeps the constraint on the exception the DBAPI adapter wraps
+    name = getattr(error.orig.__cause__, "constraint_name", None)
+    if name:
+        return name
+    message = str(error.orig)
+    start = message.find('constraint "')
+    if start == -1:
+        return None
+    start += len('constraint "')
+    return message[start:message.find('"', start)]
+
+def _sqlstate(error: IntegrityError) -> Optional[str]:
+    return getattr(error.orig, "pgcode", None) or getattr(error.orig.__cause__, "sqlstate", None)
+
+def unique_conflict(error: IntegrityError, messages: Dict[str, str]) -> Optional[HTTPException]:
+    """409 for a violated unique or exclusion constraint, None for any other integrity error."""
+    if _sqlstate(error) not in (UNIQUE_VIOLATION, EXCLUSION_VIOLATION):
+        return None
+    return conflict(messages.get(_constraint_name(error), "A record with these values already exists"))
+
+def missing_reference(error: IntegrityError, messages: Dict[str, str]) -> Optional[HTTPException]:
+    """404 for a write whose foreign key points at no row, None for any other integrity error.
+
+    Inserts rely on the constraint instead of checking the referenced row
+    first, so they need no extra round trip. ``messages`` maps constraint
+    names (``<table>_<column>_fkey``) to the detail to report.
+    """
+    if _sqlstate(error) != FOREIGN_KEY_VIOLATION:
+        return None
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=messages.get(_constraint_name(error), "Referenced record not found")
+    )
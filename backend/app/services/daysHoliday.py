@@ -1,11 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from ..models import daysHoliday as models
 from ..schemas import daysHoliday as schemas
-from typing import List
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
+from .pagination import paginate
+from .repository import delete_returning, insert_returning, update_returning
 
 class DatabaseOperationError(Exception):
     pass
@@ -15,10 +17,8 @@ async def create_holiday(
 ):
     async with DistributedLock(f"holiday:{holiday.holiday_name}"):
         try:
-            db_holiday = models.DaysHoliday(**holiday.dict())
-            db.add(db_holiday)
+            db_holiday = await insert_returning(db, models.DaysHoliday, holiday.dict())
             await db.commit()
-            await db.refresh(db_holiday)
             await logger.info("Created holiday", {"holiday_id": db_holiday.holiday_id})
             return db_holiday
         except Exception as e:
@@ -31,9 +31,18 @@ async def update_holiday(
 ):
     async with DistributedLock(f"holiday:{holiday_id}"):
         try:
-            db_holiday = await get_holiday_by_id(db, holiday_id)
-            for key, value in holiday.dict(exclude_unset=True).items():
-                setattr(db_holiday, key, value)
+            db_holiday = await update_returning(
+                db,
+                models.DaysHoliday,
+                models.DaysHoliday.holiday_id == holiday_id,
+                holiday.dict(exclude_unset=True),
+            )
+            if db_holiday is None:
+                await logger.warning("Holiday not found", {"holiday_id": holiday_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Holiday not found"
+                )
             await db.commit()
             await logger.info("Updated holiday", {"holiday_id": holiday_id})
             return db_holiday
@@ -63,14 +72,22 @@ async def get_holiday_by_id(db: AsyncSession, holiday_id: str):
         await logger.error("Get holiday by id failed", error=e)
         raise
 
-async def get_all_holidays(db: AsyncSession, skip: int = 0, limit: int = 200) -> List[models.DaysHoliday]:
+async def get_all_holidays(db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None) -> List[models.DaysHoliday]:
     try:
+        query = select(models.DaysHoliday)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.DaysHoliday.holiday_id], cursor, limit)
+            await logger.info("Retrieved holidays page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.DaysHoliday).offset(skip).limit(limit)
+            query.order_by(models.DaysHoliday.holiday_id).offset(skip).limit(limit)
         )
         holidays = result.scalars().all()
         await logger.info("Retrieved all holidays", {"count": len(holidays), "skip": skip, "limit": limit})
         return holidays if holidays else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all holidays failed", error=e)
         raise
@@ -78,11 +95,18 @@ async def get_all_holidays(db: AsyncSession, skip: int = 0, limit: int = 200) ->
 async def delete_holiday(db: AsyncSession, holiday_id: str):
     async with DistributedLock(f"holiday:{holiday_id}"):
         try:
-            holiday = await get_holiday_by_id(db, holiday_id)
-            stmt = delete(models.DaysHoliday).where(
-                models.DaysHoliday.holiday_id == holiday_id
+            deleted = await delete_returning(
+                db,
+                models.DaysHoliday,
+                models.DaysHoliday.holiday_id == holiday_id,
+                models.DaysHoliday.holiday_id,
             )
-            await db.execute(stmt)
+            if deleted is None:
+                await logger.warning("Holiday not found", {"holiday_id": holiday_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Holiday not found"
+                )
             await db.commit()
             await logger.info("Deleted holiday", {"holiday_id": holiday_id})
             return {"detail": "Holiday deleted successfully"}
@@ -1,13 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException, status
 from ..models import daysWorking as models
 from ..schemas import daysWorking as schemas
-from typing import List
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
+from .pagination import paginate
+from .repository import delete_returning, update_returning
+from ..configs.database import AsyncSessionLocal
+from . import attendanceSummary
 from datetime import datetime, date, timezone, time, timedelta
 import pytz
+import asyncio
+import os
+
+# "direct" upserts each clock-in during login; "buffered" queues them and
+# writes one multi-row upsert every ATTENDANCE_FLUSH_INTERVAL_MS
+ATTENDANCE_INGEST_MODE = os.getenv("ATTENDANCE_INGEST_MODE", "direct")
+ATTENDANCE_BATCH_SIZE = int(os.getenv("ATTENDANCE_BATCH_SIZE", 500))
+ATTENDANCE_FLUSH_INTERVAL_MS = int(os.getenv("ATTENDANCE_FLUSH_INTERVAL_MS", 200))
 
 class DatabaseOperationError(Exception):
     pass
@@ -38,11 +51,17 @@ async def get_working_day_by_id(db: AsyncSession, working_id: str):
 
 
 async def get_all_working_days(
-    db: AsyncSession, skip: int = 0, limit: int = 200
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
 ) -> List[models.DaysWorking]:
     try:
+        query = select(models.DaysWorking)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.DaysWorking.working_id], cursor, limit)
+            await logger.info("Retrieved working days page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.DaysWorking).offset(skip).limit(limit)
+            query.order_by(models.DaysWorking.working_id).offset(skip).limit(limit)
         )
         working_days = result.scalars().all()
         await logger.info("Retrieved all working days", {
@@ -51,6 +70,8 @@ async def get_all_working_days(
             "limit": limit
         })
         return working_days if working_days else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all working days failed", error=e)
         raise HTTPException(
@@ -62,13 +83,19 @@ async def get_all_working_days(
 async def delete_working_day(db: AsyncSession, working_id: str):
     async with DistributedLock(f"working:{working_id}"):
         try:
-            await get_working_day_by_id(db, working_id)
-
-            stmt = delete(models.DaysWorking).where(
-                models.DaysWorking.working_id == working_id
+            working = await delete_returning(
+                db, models.DaysWorking, models.DaysWorking.working_id == working_id
             )
-
-            await db.execute(stmt)
+            if working is None:
+                await logger.warning("Working day not found", {"working_id": working_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Working day not found"
+                )
+            if working.logout_time is not None:
+                await attendanceSummary.add_closed_day(
+                    db, working.user_id, working.day, working.login_time, working.total_hours, sign=-1
+                )
             await db.commit()
             await logger.info("Deleted working day", {"working_id": working_id})
             return {"detail": "Working day deleted successfully"}
@@ -89,114 +116,207 @@ async def delete_working_day(db: AsyncSession, working_id: str):
                 detail="Internal server error"
             )
 
+def _clock_in_row(user_id: str) -> dict:
+    current_time = datetime.now(timezone.utc).time().replace(tzinfo=timezone.utc)
+    return {
+        "user_id": user_id,
+        "day": date.today(),
+        "login_time": current_time,
+        "total_hours": 0.0
+    }
+
+def _clock_in_statement(rows: List[dict]):
+    # The first clock-in of the day wins; repeated logins are no-ops
+    return pg_insert(models.DaysWorking).values(rows).on_conflict_do_nothing(
+        index_elements=[models.DaysWorking.user_id, models.DaysWorking.day]
+    )
+
+class AttendanceBuffer:
+    """Collects clock-in events and writes them with one upsert per batch."""
+
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+
+    def add(self, row: dict):
+        self._pending.setdefault((row["user_id"], row["day"]), row)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def is_pending(self, user_id: str) -> bool:
+        return (user_id, date.today()) in self._pending
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            rows = list(self._pending.values())
+            if not rows:
+                return 0
+            self._pending = {}
+            try:
+                async with AsyncSessionLocal() as session:
+                    for i in range(0, len(rows), self.batch_size):
+                        await session.execute(_clock_in_statement(rows[i:i + self.batch_size]))
+                    await session.commit()
+            except Exception as e:
+                # Keep the events so the next flush retries them
+                for row in rows:
+                    self._pending.setdefault((row["user_id"], row["day"]), row)
+                self.failures += 1
+                await logger.error("Attendance batch flush failed", error=e, data={"rows": len(rows)})
+                raise
+            self.flushed += len(rows)
+            self.batches += 1
+            return len(rows)
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(self.flush_interval)
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": ATTENDANCE_INGEST_MODE,
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+attendance_buffer = AttendanceBuffer(
+    ATTENDANCE_BATCH_SIZE, ATTENDANCE_FLUSH_INTERVAL_MS / 1000
+)
+
 async def create_attendance_record(
     user_id: str,
     db: AsyncSession
 ):
-    async with DistributedLock(f"working:{user_id}:{date.today()}"):
-        try:
-            # Check if attendance record already exists for today
-            existing = await db.execute(
-                select(models.DaysWorking).filter(
-                    models.DaysWorking.user_id == user_id,
-                    models.DaysWorking.day == date.today()
-                )
-            )
-            # if existing.scalar_one_or_none():
-            #     raise HTTPException(
-            #         status_code=status.HTTP_400_BAD_REQUEST,
-            #         detail="Attendance already recorded for today"
-            #     )
-
-            # Get current time with timezone
-            current_datetime = datetime.now(timezone.utc)
-            current_time = current_datetime.time().replace(tzinfo=timezone.utc)
-            
-            working_data = {
-                "user_id": user_id,
-                "day": date.today(),
-                "login_time": current_time,
-                "total_hours": 0.0  # Explicitly set as float
-            }
-            
-            db_working = models.DaysWorking(**working_data)
-            db.add(db_working)
-            await db.commit()
-            await logger.info("Created attendance record", {
-                "user_id": user_id,
-                "login_time": str(current_time)
-            })
-            await db.refresh(db_working)
-            return db_working
-        except Exception as e:
-            await logger.error("Create attendance record failed", error=e)
-            await db.rollback()
-            raise
+    row = _clock_in_row(user_id)
+    if ATTENDANCE_INGEST_MODE == "buffered":
+        attendance_buffer.add(row)
+        return None
+
+    try:
+        result = await db.execute(
+            _clock_in_statement([row]).returning(models.DaysWorking)
+        )
+        record = result.scalar_one_or_none()
+        await db.commit()
+        await logger.info("Created attendance record", {
+            "user_id": user_id,
+            "login_time": str(row["login_time"]),
+            "created": record is not None
+        })
+        return record
+    except Exception as e:
+        await logger.error("Create attendance record failed", error=e)
+        await db.rollback()
+        raise
 
 async def update_attendance_logout(
     user_id: str,
     db: AsyncSession
 ):
-    async with DistributedLock(f"working:{user_id}"):
-        try:
-            # Get the latest record for today by ordering by creation time or working_id
-            result = await db.execute(
-                select(models.DaysWorking)
-                .filter(
-                    models.DaysWorking.user_id == user_id,
-                    models.DaysWorking.day == date.today()
-                )
-                .order_by(models.DaysWorking.working_id.desc())
-                .limit(1)
+    try:
+        if ATTENDANCE_INGEST_MODE == "buffered" and attendance_buffer.is_pending(user_id):
+            await attendance_buffer.flush()
+
+        result = await db.execute(
+            select(models.DaysWorking).filter(
+                models.DaysWorking.user_id == user_id,
+                models.DaysWorking.day == date.today()
             )
-            record = result.scalar_one_or_none()
-            
-            if not record:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No attendance record found for today"
-                )
+        )
+        record = result.scalar_one_or_none()
 
-            if record.logout_time:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Already logged out for today"
-                )
+        if not record:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No attendance record found for today"
+            )
 
-            # Get current time with timezone
-            current_datetime = datetime.now(timezone.utc)
-            current_time = current_datetime.time().replace(tzinfo=timezone.utc)
-            
-            # Calculate total hours using timezone-aware times
-            login_datetime = datetime.combine(date.today(), record.login_time)
-            logout_datetime = datetime.combine(date.today(), current_time)
-            
-            # Ensure both times are timezone-aware
-            if login_datetime.tzinfo is None:
-                login_datetime = login_datetime.replace(tzinfo=timezone.utc)
-            if logout_datetime.tzinfo is None:
-                logout_datetime = logout_datetime.replace(tzinfo=timezone.utc)
-                
-            total_hours = (logout_datetime - login_datetime).total_seconds() / 3600
-
-            record.logout_time = current_time
-            record.total_hours = round(total_hours, 2)
+        if record.logout_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already logged out for today"
+            )
 
-            await db.commit()
-            await db.refresh(record)
-            await logger.info("Updated attendance logout", {
-                "user_id": user_id,
-                "logout_time": str(current_time),
-                "total_hours": total_hours
-            })
-            return record
-        except Exception as e:
-            await logger.error("Update attendance logout failed", error=e)
-            await db.rollback()
-            raise
+        # Get current time with timezone
+        current_datetime = datetime.now(timezone.utc)
+        current_time = current_datetime.time().replace(tzinfo=timezone.utc)
+
+        # Calculate total hours using timezone-aware times
+        login_datetime = datetime.combine(date.today(), record.login_time)
+        logout_datetime = datetime.combine(date.today(), current_time)
+
+        # Ensure both times are timezone-aware
+        if login_datetime.tzinfo is None:
+            login_datetime = login_datetime.replace(tzinfo=timezone.utc)
+        if logout_datetime.tzinfo is None:
+            logout_datetime = logout_datetime.replace(tzinfo=timezone.utc)
+
+        total_hours = (logout_datetime - login_datetime).total_seconds() / 3600
+
+        # Conditional update instead of a lock: a concurrent logout matches no row
+        updated = await update_returning(
+            db,
+            models.DaysWorking,
+            and_(
+                models.DaysWorking.working_id == record.working_id,
+                models.DaysWorking.logout_time.is_(None)
+            ),
+            {"logout_time": current_time, "total_hours": round(total_hours, 2)},
+        )
+        if updated is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already logged out for today"
+            )
+        await attendanceSummary.add_closed_day(
+            db, user_id, record.day, record.login_time, round(total_hours, 2)
+        )
 
-async def get_working_day_by_user_id(db: AsyncSession, user_id: str, skip: int = 0, limit: int = 100):
+        await db.commit()
+        await logger.info("Updated attendance logout", {
+            "user_id": user_id,
+            "logout_time": str(current_time),
+            "total_hours": total_hours
+        })
+        return updated
+    except Exception as e:
+        await logger.error("Update attendance logout failed", error=e)
+        await db.rollback()
+        raise
+
+async def get_working_day_by_user_id(
+    db: AsyncSession, user_id: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+):
     try:
+        if cursor is not None:
+            # Newest first; working_id breaks ties between records of the same day
+            items, next_cursor = await paginate(
+                db,
+                select(models.DaysWorking).filter(models.DaysWorking.user_id == user_id),
+                [models.DaysWorking.day, models.DaysWorking.working_id],
+                cursor,
+                limit,
+                descending=True,
+            )
+            await logger.info("Retrieved working days page for user", {"user_id": user_id, "count": len(items)})
+            return {"items": items, "next_cursor": next_cursor}
+
         # Add query to check if user has any working days
         count_query = select(models.DaysWorking).filter(
             models.DaysWorking.user_id == user_id
@@ -222,6 +342,8 @@ async def get_working_day_by_user_id(db: AsyncSession, user_id: str, skip: int =
             return list(working_days)  # Convert to list explicitly
         return []
         
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get working days by user failed", {"error": str(e)})
         raise HTTPException(
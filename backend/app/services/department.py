@@ -1,108 +1,99 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update, cast, Integer
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from ..models import department as models
 from ..models import userPersonalInfo as models_user_info
 from ..schemas import department as schemas
-from typing import List
-from ..utils.redis_lock import DistributedLock
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .concurrency import missing_reference, unique_conflict
+from .repository import delete_returning, insert_returning, missing_or_stale, update_returning
+from ..utils.manager_scope import invalidate_manager_scope
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
+_UNIQUE_MESSAGES = {
+    "uq_department_manager_id": "Department already exists for this manager",
+}
+
+_REFERENCE_MESSAGES = {
+    "department_manager_id_fkey": "User not found",
+}
 
 async def create_department(
     department: schemas.DepartmentCreate, db: AsyncSession
 ):
-    async with DistributedLock(f"department:manager:{department.manager_id}"):
-        try:
-            await _validate_user_exists(db, department.manager_id)
-            existing = await db.execute(
-                select(models.Department).filter(
-                    models.Department.manager_id == department.manager_id
-                )
-            )
-            if existing.scalar_one_or_none():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Department already exists for this manager",
-                )
-
-            db_department = models.Department(**department.dict())
-            db.add(db_department)
-            await db.commit()
-            await db.refresh(db_department)
-            await logger.info("Created department", {
-                "department_id": db_department.department_id,
-                "manager_id": department.manager_id
-            })
-            return db_department
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
+    try:
+        # One department per manager is enforced by uq_department_manager_id
+        db_department = await insert_returning(db, models.Department, department.dict())
+        await db.commit()
+        await logger.info("Created department", {
+            "department_id": db_department.department_id,
+            "manager_id": department.manager_id
+        })
+        return db_department
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
             await logger.error("Create department failed", error=e)
-            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                detail="Database operation failed"
             )
+        raise error
+    except Exception as e:
+        await logger.error("Create department failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def update_department(
     db: AsyncSession, department_id: str, department: schemas.DepartmentUpdate
 ):
-    async with DistributedLock(f"department:{department_id}"):
-        try:
-            db_department = await get_department_by_id(db, department_id)
-
-            for key, value in department.dict(exclude_unset=True).items():
-                setattr(db_department, key, value)
-
-            await db.commit()
-            await db.refresh(db_department)
-            await logger.info("Updated department", {"department_id": department_id})
-            return db_department
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
+    try:
+        changes = department.dict(exclude_unset=True)
+        expected_version = changes.pop("version", None)
+
+        where = models.Department.department_id == department_id
+        db_department = await update_returning(db, models.Department, where, changes, expected_version)
+        if db_department is None:
+            raise await missing_or_stale(db, models.Department, where, expected_version, "Department not found")
+
+        await db.commit()
+        # The manager may have changed
+        await invalidate_manager_scope(department_id=department_id)
+        await logger.info("Updated department", {"department_id": department_id})
+        return db_department
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
             await logger.error("Update department failed", error=e)
-            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                detail="Database operation failed"
             )
+        raise error
+    except Exception as e:
+        await logger.error("Update department failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def get_department_by_id(db: AsyncSession, department_id: str):
@@ -127,17 +118,28 @@ async def get_department_by_id(db: AsyncSession, department_id: str):
         raise
 
 
-async def get_all_departments(db: AsyncSession, skip: int = 0, limit: int = 200) -> List[models.Department]:
+async def get_all_departments(
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
+) -> List[models.Department]:
     try:
+        if cursor is not None:
+            items, next_cursor = await paginate(
+                db, select(models.Department), [models.Department.department_id], cursor, limit
+            )
+            await logger.info("Retrieved departments page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
             select(models.Department)
-            .order_by(models.Department.department_id.cast(Integer))
+            .order_by(models.Department.department_id)
             .offset(skip)
             .limit(limit)
         )
         departments = result.scalars().all()
         await logger.info("Retrieved all departments", {"count": len(departments), "skip": skip, "limit": limit})
         return departments if departments else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all departments failed", error=e)
         raise HTTPException(
@@ -147,34 +149,30 @@ async def get_all_departments(db: AsyncSession, skip: int = 0, limit: int = 200)
 
 
 async def delete_department(db: AsyncSession, department_id: str):
-    async with DistributedLock(f"department:{department_id}"):
-        try:
-            await get_department_by_id(db, department_id)
-
-            stmt = delete(models.Department).where(
-                models.Department.department_id == department_id
-            )
-
-            await db.execute(stmt)
-            await db.commit()
-            await logger.info("Deleted department", {"department_id": department_id})
-            return {"detail": "Department deleted successfully"}
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Delete department failed", error=e)
-            await db.rollback()
+    try:
+        deleted = await delete_returning(
+            db, models.Department, models.Department.department_id == department_id, models.Department.department_id
+        )
+        if deleted is None:
+            await logger.warning("Department not found", {"department_id": department_id})
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Department not found"
             )
+        await db.commit()
+        await invalidate_manager_scope(department_id=department_id)
+        await logger.info("Deleted department", {"department_id": department_id})
+        return {"detail": "Department deleted successfully"}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Delete department failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def get_department_by_manager_id(db: AsyncSession, manager_id: str):
@@ -192,7 +190,7 @@ async def get_department_by_manager_id(db: AsyncSession, manager_id: str):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Department not found for this manager",
             )
-        await logger.info("Retrieved department for manager", {"manager_id": manager_id})
+        await logger.info("Retrieved department for manager", {"manager_id": manager_id}, hot_path=True)
         return department
     except Exception as e:
         await logger.error("Get department by manager failed", error=e)
@@ -1,38 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from ..models import deptAnnouncement as models
-from ..models import department as models_department  # Add this import
 from ..schemas import deptAnnouncement as schemas
-from typing import List
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
+from .concurrency import missing_reference
+from .pagination import paginate
+from .repository import delete_returning, insert_returning, update_returning
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_department_exists(db: AsyncSession, department_id: str):
-    try:
-        if department_id:
-            result = await db.execute(
-                select(models_department.Department).filter(
-                    models_department.Department.department_id == department_id
-                )
-            )
-            department = result.scalar_one_or_none()
-            if not department:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Department not found"
-                )
-            return department
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating department"
-        )
+_REFERENCE_MESSAGES = {
+    "dept_announcement_department_id_fkey": "Department not found",
+}
 
 async def create_dept_announcement(
     announcement: schemas.DeptAnnouncementCreate, 
@@ -40,18 +24,20 @@ async def create_dept_announcement(
 ):
     async with DistributedLock(f"department:announcement:{announcement.department_id}"):
         try:
-            # Validate department exists
-            await _validate_department_exists(db, announcement.department_id)
-            
-            db_announcement = models.DeptAnnouncement(**announcement.dict())
-            db.add(db_announcement)
+            db_announcement = await insert_returning(db, models.DeptAnnouncement, announcement.dict())
             await db.commit()
-            await db.refresh(db_announcement)
             await logger.info("Created department announcement", {
                 "announcement_id": db_announcement.announcement_id,
                 "department_id": announcement.department_id
             })
             return db_announcement
+        except IntegrityError as e:
+            await db.rollback()
+            error = missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Create department announcement failed", error=e)
+                raise
+            raise error
         except Exception as e:
             await logger.error("Create department announcement failed", error=e)
             await db.rollback()
@@ -80,15 +66,24 @@ async def get_dept_announcement_by_id(db: AsyncSession, announcement_id: str):
 async def get_all_dept_announcements(
     db: AsyncSession, 
     skip: int = 0, 
-    limit: int = 200
+    limit: int = 200,
+    cursor: Optional[str] = None
 ) -> List[models.DeptAnnouncement]:
     try:
+        query = select(models.DeptAnnouncement)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.DeptAnnouncement.announcement_id], cursor, limit)
+            await logger.info("Retrieved announcements page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.DeptAnnouncement).offset(skip).limit(limit)
+            query.order_by(models.DeptAnnouncement.announcement_id).offset(skip).limit(limit)
         )
         announcements = result.scalars().all()
         await logger.info("Retrieved all announcements", {"count": len(announcements), "skip": skip, "limit": limit})
         return announcements if announcements else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all announcements failed", error=e)
         raise
@@ -126,19 +121,22 @@ async def update_dept_announcement(
 ):
     async with DistributedLock(f"announcement:{announcement_id}"):
         try:
-            db_announcement = await get_dept_announcement_by_id(db, announcement_id)
-            
-            # Validate department if it's being updated
-            if announcement.department_id:
-                await _validate_department_exists(db, announcement.department_id)
-                
             # Changed to use exclude_unset=True
             update_data = announcement.dict(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_announcement, key, value)
+            db_announcement = await update_returning(
+                db,
+                models.DeptAnnouncement,
+                models.DeptAnnouncement.announcement_id == announcement_id,
+                update_data,
+            )
+            if db_announcement is None:
+                await logger.warning("Announcement not found", {"announcement_id": announcement_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Announcement not found"
+                )
 
             await db.commit()
-            await db.refresh(db_announcement)
             await logger.info("Updated department announcement", {
                 "announcement_id": db_announcement.announcement_id,
                 "department_id": db_announcement.department_id
@@ -147,6 +145,16 @@ async def update_dept_announcement(
         except HTTPException:
             await db.rollback()
             raise
+        except IntegrityError as e:
+            await db.rollback()
+            error = missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Update department announcement failed", error=e)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Database operation failed"
+                )
+            raise error
         except Exception as e:
             await logger.error("Update department announcement failed", error=e)
             await db.rollback()
@@ -158,12 +166,18 @@ async def update_dept_announcement(
 async def delete_dept_announcement(db: AsyncSession, announcement_id: str):
     async with DistributedLock(f"announcement:{announcement_id}"):
         try:
-            await get_dept_announcement_by_id(db, announcement_id)
-
-            stmt = delete(models.DeptAnnouncement).where(
-                models.DeptAnnouncement.announcement_id == announcement_id
+            deleted = await delete_returning(
+                db,
+                models.DeptAnnouncement,
+                models.DeptAnnouncement.announcement_id == announcement_id,
+                models.DeptAnnouncement.announcement_id,
             )
-            await db.execute(stmt)
+            if deleted is None:
+                await logger.warning("Announcement not found", {"announcement_id": announcement_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Announcement not found"
+                )
             await db.commit()
             await logger.info("Deleted department announcement", {
                 "announcement_id": announcement_id
@@ -0,0 +1,382 @@
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Set
+from fastapi import HTTPException, UploadFile, status
+from openpyxl import load_workbook
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import department as models_department
+from ..models import userFinancialInfo as models_financial
+from ..models import userPersonalInfo as models_user_info
+from ..models import users as models_user
+from ..providers.validation_exceptions import BaseValidationError
+from ..schemas import userFinancialInfo as schemas_financial
+from ..schemas import userPersonalInfo as schemas_user_info
+from ..schemas import users as schemas_user
+from ..utils import crypto
+from ..utils.logger import logger
+from ..utils.manager_scope import invalidate_manager_scope
+from .concurrency import unique_conflict
+from .references import existing_ids
+
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", 50 * 1024 * 1024))
+# Rows validated, checked and written per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+# Rows listed in the error report; the failed count is always complete
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", 1000))
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+USER_COLUMNS = ("username", "password", "role")
+PERSONAL_COLUMNS = tuple(
+    name for name in schemas_user_info.UserInfoCreate.model_fields if name not in ("user_id", "photo_url")
+)
+FINANCIAL_COLUMNS = tuple(
+    name for name in schemas_financial.UserFinancialInfoCreate.model_fields if name != "user_id"
+)
+KNOWN_COLUMNS = frozenset(USER_COLUMNS + PERSONAL_COLUMNS + FINANCIAL_COLUMNS)
+
+_UNIQUE_MESSAGES = {
+    "ix_users_username": "Username already exists",
+    "uq_users_personal_info_email": "Email already exists",
+    "uq_users_personal_info_phone": "Phone number already exists",
+}
+
+@dataclass
+class _Employee:
+    row: int
+    user: schemas_user.UserCreate
+    info: schemas_user_info.UserInfoCreate
+    financial: Optional[schemas_financial.UserFinancialInfoCreate]
+    password_hash: Optional[str] = None
+
+class _Report:
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row: int, errors: List[dict]):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self, dry_run: bool) -> dict:
+        return {
+            "total_rows": self.total,
+            "imported": self.imported,
+            "failed": self.failed,
+            "dry_run": dry_run,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+async def _spool(file: UploadFile):
+    """Copy the upload in chunks, spilling to disk past SPOOL_MEMORY_BYTES."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    head = b""
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            if not head:
+                head = chunk[:len(XLSX_SIGNATURE)]
+            size += len(chunk)
+            if size > IMPORT_MAX_BYTES:
+                raise _bad_request(f"File too large. Maximum size is {IMPORT_MAX_BYTES // (1024 * 1024)}MB.")
+            # Past SPOOL_MEMORY_BYTES this write rolls the spool over or appends to disk
+            if size > SPOOL_MEMORY_BYTES:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                spool.write(chunk)
+        if not size:
+            raise _bad_request("Empty file")
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, "xlsx" if head == XLSX_SIGNATURE else "csv"
+
+def _cell(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store phone and account numbers as numbers
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+def _csv_rows(spool) -> Iterator[tuple]:
+    text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise _bad_request("CSV files must be UTF-8 encoded")
+    finally:
+        # Leave closing the spool to import_employees
+        text.detach()
+
+def _xlsx_rows(spool) -> Iterator[tuple]:
+    try:
+        workbook = load_workbook(spool, read_only=True, data_only=True)
+    except Exception:
+        raise _bad_request("The file is not a valid XLSX workbook")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _read_header(rows: Iterator) -> List[Optional[str]]:
+    first = next(rows, None)
+    if first is None:
+        raise _bad_request("The file has no header row")
+    columns = [_cell(name) for name in first[1]]
+    unknown = sorted({name for name in columns if name and name not in KNOWN_COLUMNS})
+    if unknown:
+        raise _bad_request(f"Unknown columns: {', '.join(unknown)}")
+    missing = [name for name in ("username", "password") if name not in columns]
+    if missing:
+        raise _bad_request(f"Missing required columns: {', '.join(missing)}")
+    return columns
+
+def _errors(error) -> List[dict]:
+    if isinstance(error, BaseValidationError):
+        return [error.to_dict()]
+    return [
+        {"field": ".".join(str(part) for part in item["loc"]) or "row", "message": item["msg"]}
+        for item in error.errors()
+    ]
+
+def _validate(row: int, values: Dict[str, object]):
+    """Build the row with the same schemas (and validators) as the single-record endpoints."""
+    errors = []
+    user = info = financial = None
+    try:
+        user = schemas_user.UserCreate(**{name: values.get(name) for name in USER_COLUMNS})
+    except (ValidationError, BaseValidationError) as e:
+        errors.extend(_errors(e))
+    try:
+        info = schemas_user_info.UserInfoCreate(**{name: values.get(name) for name in PERSONAL_COLUMNS})
+        if info.department_id is not None and not info.department_id.isdigit():
+            errors.append({"field": "department_id", "message": "Department id must be a number"})
+    except (ValidationError, BaseValidationError) as e:
+        errors.extend(_errors(e))
+    if any(values.get(name) is not None for name in FINANCIAL_COLUMNS):
+        try:
+            financial = schemas_financial.UserFinancialInfoCreate(
+                **{name: values.get(name) for name in FINANCIAL_COLUMNS}
+            )
+        except (ValidationError, BaseValidationError) as e:
+            errors.extend(_errors(e))
+    if errors:
+        return None, errors
+    return _Employee(row, user, info, financial), []
+
+def _next_chunk(rows: Iterator, columns: List[Optional[str]], size: int) -> list:
+    """Parse and validate up to ``size`` non-empty rows (runs in a worker thread)."""
+    chunk = []
+    for row, cells in rows:
+        values = {name: _cell(value) for name, value in zip(columns, cells) if name}
+        if all(value is None for value in values.values()):
+            continue
+        chunk.append((row, *_validate(row, values)))
+        if len(chunk) >= size:
+            break
+    return chunk
+
+def _drop_file_duplicates(employees: List[_Employee], seen: Dict[str, Set[str]], report: _Report):
+    kept = []
+    for employee in employees:
+        values = {
+            "username": employee.user.username,
+            "email": employee.info.email,
+            "phone": employee.info.phone,
+        }
+        errors = [
+            {"field": field, "message": f"Duplicate {field} in file"}
+            for field, value in values.items()
+            if value is not None and value in seen[field]
+        ]
+        for field, value in values.items():
+            if value is not None:
+                seen[field].add(value)
+        if errors:
+            report.fail(employee.row, errors)
+        else:
+            kept.append(employee)
+    return kept
+
+async def _drop_taken(db: AsyncSession, employees: List[_Employee], report: _Report):
+    """One query per unique column for the whole chunk instead of per-row lookups."""
+    if not employees:
+        return employees
+    users = models_user.Users
+    info = models_user_info.UserPersonalInfo
+    department = models_department.Department
+
+    usernames = [employee.user.username for employee in employees]
+    emails = [employee.info.email for employee in employees if employee.info.email]
+    phones = [employee.info.phone for employee in employees if employee.info.phone]
+    department_ids = {employee.info.department_id for employee in employees if employee.info.department_id}
+
+    taken_usernames = set(await db.scalars(select(users.username).where(users.username.in_(usernames))))
+    taken_emails = set(await db.scalars(select(info.email).where(info.email.in_(emails)))) if emails else set()
+    taken_phones = set(await db.scalars(select(info.phone).where(info.phone.in_(phones)))) if phones else set()
+    found_departments = await existing_ids(db, department.department_id, department_ids)
+
+    kept = []
+    for employee in employees:
+        errors = []
+        if employee.user.username in taken_usernames:
+            errors.append({"field": "username", "message": "Username already exists"})
+        if employee.info.email in taken_emails:
+            errors.append({"field": "email", "message": "Email already exists"})
+        if employee.info.phone in taken_phones:
+            errors.append({"field": "phone", "message": "Phone number already exists"})
+        if employee.info.department_id and str(int(employee.info.department_id)) not in found_departments:
+            errors.append({"field": "department_id", "message": "Department not found"})
+        if errors:
+            report.fail(employee.row, errors)
+        else:
+            kept.append(employee)
+    return kept
+
+async def _write(db: AsyncSession, employees: List[_Employee]):
+    users = models_user.Users
+    # insertmanyvalues turns each executemany into multi-row INSERTs;
+    # sort_by_parameter_order pairs every returned id with its row
+    result = await db.execute(
+        insert(users.__table__).returning(users.user_id, sort_by_parameter_order=True),
+        [
+            {
+                "username": employee.user.username,
+                "password": employee.password_hash,
+                "role": employee.user.role or models_user.RoleEnum.User,
+                "status": models_user.StatusEnum.Active,
+            }
+            for employee in employees
+        ],
+    )
+    user_ids = result.scalars().all()
+
+    await db.execute(
+        insert(models_user_info.UserPersonalInfo.__table__),
+        [
+            {**employee.info.dict(exclude={"user_id", "photo_url"}), "user_id": user_id}
+            for employee, user_id in zip(employees, user_ids)
+        ],
+    )
+    financial_rows = [
+        {**employee.financial.dict(exclude={"user_id"}), "user_id": user_id}
+        for employee, user_id in zip(employees, user_ids)
+        if employee.financial is not None
+    ]
+    if financial_rows:
+        await db.execute(insert(models_financial.UserFinancialInfo.__table__), financial_rows)
+
+async def _invalidate_scopes(employees: List[_Employee]):
+    """New members change their departments' cached manager scopes."""
+    for department_id in {int(employee.info.department_id) for employee in employees if employee.info.department_id}:
+        await invalidate_manager_scope(department_id=department_id)
+
+async def _insert_chunk(db: AsyncSession, employees: List[_Employee], report: _Report):
+    # End _drop_taken's read transaction first: its connection goes back to the
+    # pool instead of idling in transaction while the chunk is hashed
+    await db.rollback()
+    if not employees:
+        return
+    hashes = await crypto.hash_passwords_async([employee.user.password for employee in employees])
+    for employee, password_hash in zip(employees, hashes):
+        employee.password_hash = password_hash
+    try:
+        await _write(db, employees)
+        await db.commit()
+        report.imported += len(employees)
+        await _invalidate_scopes(employees)
+        return
+    except IntegrityError:
+        # Someone else took a value after _drop_taken; find the rows row by row
+        await db.rollback()
+
+    for employee in employees:
+        try:
+            async with db.begin_nested():
+                await _write(db, [employee])
+        except IntegrityError as e:
+            error = unique_conflict(e, _UNIQUE_MESSAGES)
+            message = error.detail if error is not None else "Row rejected by the database"
+            report.fail(employee.row, [{"field": "row", "message": message}])
+        else:
+            report.imported += 1
+    await db.commit()
+    await _invalidate_scopes(employees)
+
+async def import_employees(db: AsyncSession, file: UploadFile, dry_run: bool = False) -> dict:
+    """Create users with personal and (optional) financial info from a CSV or XLSX file.
+
+    The header row names the fields of the register, personal info and
+    financial info payloads. Each chunk of IMPORT_CHUNK_SIZE rows commits on
+    its own; invalid or conflicting rows are skipped and reported by line.
+    """
+    started = time.monotonic()
+    spool, kind = await _spool(file)
+    report = _Report()
+    reader = _xlsx_rows(spool) if kind == "xlsx" else _csv_rows(spool)
+    try:
+        rows = enumerate(reader, start=1)
+        columns = await asyncio.to_thread(_read_header, rows)
+        seen = {"username": set(), "email": set(), "phone": set()}
+        while chunk := await asyncio.to_thread(_next_chunk, rows, columns, IMPORT_CHUNK_SIZE):
+            report.total += len(chunk)
+            valid = []
+            for row, employee, errors in chunk:
+                if errors:
+                    report.fail(row, errors)
+                else:
+                    valid.append(employee)
+            valid = await _drop_taken(db, _drop_file_duplicates(valid, seen, report), report)
+            if dry_run:
+                await db.rollback()
+                report.imported += len(valid)
+            else:
+                await _insert_chunk(db, valid, report)
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Employee import failed", error=e, data={"imported": report.imported})
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Import failed after {report.imported} employees were imported"
+        )
+    finally:
+        reader.close()
+        spool.close()
+
+    await logger.info("Imported employees", {
+        "format": kind,
+        "total_rows": report.total,
+        "imported": report.imported,
+        "failed": report.failed,
+        "dry_run": dry_run,
+        "seconds": round(time.monotonic() - started, 2),
+    })
+    return report.as_dict(dry_run)
@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from ..models import daysWorking as models_working
+from ..models import department as models_department
+from ..models import userPersonalInfo as models_info
+from ..models import users as models
+from ..schemas.employeeProfile import ProfileSectionEnum
+from ..utils.logger import logger
+
+ALL_SECTIONS = frozenset(ProfileSectionEnum)
+
+def _profile_options(sections: frozenset, attendance_since: date) -> list:
+    """Loader options for the requested sections.
+
+    One-to-one sections (personal info, financial info, department and its
+    manager's name) are joined into the user query; each requested collection
+    adds one SELECT ... WHERE user_id IN (...). A full profile is four queries.
+    """
+    user = models.Users
+    info = models_info.UserPersonalInfo
+    options = []
+    if ProfileSectionEnum.department in sections:
+        options.append(
+            joinedload(user.personal_info)
+            .joinedload(info.department)
+            .joinedload(models_department.Department.manager)
+            .joinedload(user.personal_info)
+        )
+    elif ProfileSectionEnum.personal_info in sections:
+        options.append(joinedload(user.personal_info))
+    if ProfileSectionEnum.financial_info in sections:
+        options.append(joinedload(user.financial_info))
+    if ProfileSectionEnum.jobs in sections:
+        options.append(selectinload(user.jobs))
+    if ProfileSectionEnum.applications in sections:
+        options.append(selectinload(user.applications))
+    if ProfileSectionEnum.attendance in sections:
+        options.append(selectinload(
+            user.attendance_records.and_(models_working.DaysWorking.day >= attendance_since)
+        ))
+    return options
+
+def _department_section(personal_info) -> Optional[dict]:
+    department = personal_info.department if personal_info else None
+    if department is None:
+        return None
+    manager_info = department.manager.personal_info if department.manager else None
+    return {
+        "department_id": department.department_id,
+        "department_name": department.department_name,
+        "manager_id": department.manager_id,
+        "location": department.location,
+        "contact_email": department.contact_email,
+        "start_date": department.start_date,
+        "status": department.status,
+        "version": department.version,
+        "manager": {
+            "user_id": department.manager_id,
+            "fullname": manager_info.fullname,
+        } if manager_info else None,
+    }
+
+async def get_employee_profile(
+    db: AsyncSession,
+    user_id: str,
+    sections: Optional[Iterable[ProfileSectionEnum]] = None,
+    attendance_days: int = 30,
+):
+    """A user with the requested profile sections, loaded in a fixed number of queries."""
+    sections = frozenset(sections) if sections else ALL_SECTIONS
+    attendance_since = date.today() - timedelta(days=attendance_days - 1)
+    result = await db.execute(
+        select(models.Users)
+        .where(models.Users.user_id == user_id)
+        .options(*_profile_options(sections, attendance_since))
+        # The auth dependency may already hold this user; reload its sections
+        .execution_options(populate_existing=True)
+    )
+    user = result.unique().scalar_one_or_none()
+    if not user:
+        await logger.warning("User not found for profile", {"user_id": user_id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    profile = {
+        "user_id": user.user_id,
+        "username": user.username,
+        "role": user.role,
+        "status": user.status,
+    }
+    if ProfileSectionEnum.personal_info in sections:
+        profile["personal_info"] = user.personal_info
+    if ProfileSectionEnum.financial_info in sections:
+        profile["financial_info"] = user.financial_info
+    if ProfileSectionEnum.jobs in sections:
+        profile["jobs"] = user.jobs
+    if ProfileSectionEnum.department in sections:
+        profile["department"] = _department_section(user.personal_info)
+    if ProfileSectionEnum.applications in sections:
+        profile["applications"] = sorted(
+            user.applications, key=lambda a: a.start_date or date.min, reverse=True
+        )
+    if ProfileSectionEnum.attendance in sections:
+        profile["attendance"] = sorted(user.attendance_records, key=lambda d: d.day, reverse=True)
+
+    await logger.info("Retrieved employee profile", {
+        "user_id": user_id,
+        "sections": sorted(section.value for section in sections),
+    })
+    return profile
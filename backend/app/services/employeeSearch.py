@@ -0,0 +1,112 @@
+import os
+import re
+from typing import Optional
+from sqlalchemy import Float, case, cast, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import department as models_department
+from ..models import userPersonalInfo as models
+from ..schemas.employeeSearch import EmployeeSearchHit, SearchModeEnum
+from ..utils.logger import logger
+from .pagination import MAX_PAGE_SIZE, after_cursor, encode_cursor
+
+# Added to the rank of employees whose department name matches the query
+SEARCH_DEPARTMENT_WEIGHT = float(os.getenv("SEARCH_DEPARTMENT_WEIGHT", 0.1))
+
+_WORD = re.compile(r"\w+")
+
+def _prefix_tsquery(q: str):
+    """'jo sm' -> 'jo:* & sm:*'; only word characters reach to_tsquery, so no syntax errors."""
+    words = _WORD.findall(q.lower())
+    return func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words))
+
+def _search_query(q: str, mode: SearchModeEnum):
+    """Matching profiles with their department name and rank, unordered and unpaginated.
+
+    Every branch of the WHERE is served by a GIN index (the tsvector, the
+    trigram index on fullname, the department_id index for department hits),
+    so PostgreSQL combines bitmap scans instead of reading every profile.
+    """
+    info = models.UserPersonalInfo
+    department = models_department.Department
+
+    if mode == SearchModeEnum.prefix:
+        tsquery = _prefix_tsquery(q)
+        name_match = info.fullname.istartswith(q, autoescape=True)
+    else:
+        tsquery = func.websearch_to_tsquery("simple", q)
+        name_match = info.fullname.op("%")(q)
+
+    matching_departments = (
+        select(department.department_id)
+        .where(or_(
+            department.department_name.icontains(q, autoescape=True),
+            department.department_name.op("%")(q),
+        ))
+        .scalar_subquery()
+    )
+    in_department = info.department_id.in_(matching_departments)
+
+    rank = cast(
+        func.ts_rank(info.search_vector, tsquery)
+        + func.coalesce(func.similarity(info.fullname, q), 0)
+        + case((in_department, literal(SEARCH_DEPARTMENT_WEIGHT)), else_=literal(0.0)),
+        Float,
+    ).label("rank")
+
+    query = (
+        select(info, department.department_name, rank)
+        .outerjoin(department, department.department_id == info.department_id)
+        .where(or_(info.search_vector.op("@@")(tsquery), name_match, in_department))
+    )
+    return query, rank
+
+async def search_employees(
+    db: AsyncSession,
+    q: str,
+    mode: SearchModeEnum = SearchModeEnum.search,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+):
+    """Ranked employee directory search, keyset-paginated on (rank, personal_info_id)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if not _WORD.search(q):
+        return {"items": [], "next_cursor": None}
+
+    info = models.UserPersonalInfo
+    query, rank = _search_query(q.strip(), mode)
+    key_columns = [rank, info.personal_info_id]
+    if cursor:
+        # Rank descending with the id as tie-breaker. The rank is bound back as a
+        # double, the type it was read as, so rows tied on rank are neither
+        # skipped nor repeated across pages
+        query = query.where(after_cursor(key_columns, cursor, descending=True))
+
+    result = await db.execute(
+        query.order_by(rank.desc(), info.personal_info_id.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last.rank, last.UserPersonalInfo.personal_info_id])
+
+    items = [
+        EmployeeSearchHit(
+            personal_info_id=row.UserPersonalInfo.personal_info_id,
+            user_id=row.UserPersonalInfo.user_id,
+            fullname=row.UserPersonalInfo.fullname,
+            email=row.UserPersonalInfo.email,
+            phone=row.UserPersonalInfo.phone,
+            city=row.UserPersonalInfo.city,
+            country=row.UserPersonalInfo.country,
+            department_id=row.UserPersonalInfo.department_id,
+            department_name=row.department_name,
+            photo_url=row.UserPersonalInfo.photo_url,
+            rank=row.rank,
+        )
+        for row in rows
+    ]
+    await logger.info("Searched employees", {"mode": mode.value, "count": len(items)})
+    return {"items": items, "next_cursor": next_cursor}
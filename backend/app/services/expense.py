@@ -2,48 +2,42 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import expense as models
 from ..schemas import expense as schemas
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
-from typing import List
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .repository import insert_returning, update_returning
+from .concurrency import missing_reference
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
+_REFERENCE_MESSAGES = {
+    "expense_user_id_fkey": "User not found",
+}
 
 async def create_expense(db: AsyncSession, expense: schemas.ExpenseCreate):
     async with DistributedLock(f"expense:user:{expense.user_id}"):
         try:
-            await _validate_user_exists(db, expense.user_id)
-            db_expense = models.Expense(
-                user_id=expense.user_id,
-                expense_item_name=expense.expense_item_name,
-                expense_item_store=expense.expense_item_store,
-                expense_date=expense.expense_date,
-                amount=expense.amount
-            )
-            db.add(db_expense)
+            db_expense = await insert_returning(db, models.Expense, {
+                "user_id": expense.user_id,
+                "expense_item_name": expense.expense_item_name,
+                "expense_item_store": expense.expense_item_store,
+                "expense_date": expense.expense_date,
+                "amount": expense.amount
+            })
             await db.commit()
-            await db.refresh(db_expense)
             await logger.info("Created expense", {
                 "expense_id": db_expense.expense_id,
                 "user_id": expense.user_id
             })
             return db_expense
+        except IntegrityError as e:
+            await db.rollback()
+            error = missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Create expense failed", error=e)
+                raise
+            raise error
         except Exception as e:
             await logger.error("Create expense failed", error=e)
             await db.rollback()
@@ -85,15 +79,23 @@ async def get_expenses_by_user_id(db: AsyncSession, user_id: str):
         raise
 
 async def get_all_expenses(
-    db: AsyncSession, skip: int = 0, limit: int = 200
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
 ) -> List[models.Expense]:
     try:
+        query = select(models.Expense)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.Expense.expense_id], cursor, limit)
+            await logger.info("Retrieved expenses page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.Expense).offset(skip).limit(limit)
+            query.order_by(models.Expense.expense_id).offset(skip).limit(limit)
         )
         expenses = result.scalars().all()
         await logger.info("Retrieved all expenses", {"count": len(expenses), "skip": skip, "limit": limit})
         return expenses
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all expenses failed", error=e)
         raise
@@ -103,23 +105,18 @@ async def update_expense(
 ):
     async with DistributedLock(f"expense:{expense_id}"):
         try:
-            query = (
-                update(models.Expense)
-                .where(models.Expense.expense_id == expense_id)
-                .values(expense.dict(exclude_unset=True))
+            db_expense = await update_returning(
+                db, models.Expense, models.Expense.expense_id == expense_id, expense.dict(exclude_unset=True)
             )
-
-            result = await db.execute(query)
-            await db.commit()
-
-            if result.rowcount == 0:
+            if db_expense is None:
                 await logger.warning("Expense not found for update", {"expense_id": expense_id})
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found"
                 )
+            await db.commit()
 
             await logger.info("Updated expense", {"expense_id": expense_id})
-            return await get_expense_by_id(db, expense_id)
+            return db_expense
         except Exception as e:
             await logger.error("Update expense failed", error=e)
             await db.rollback()
@@ -1,49 +1,43 @@
 # services/job.py
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from ..models import job as models
 from ..schemas import job as schemas
 from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .repository import delete_returning, insert_returning, update_returning
+from .concurrency import missing_reference
+from .references import require_users
+
+_REFERENCE_MESSAGES = {
+    "job_user_id_fkey": "User not found",
+}
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
-
 async def create_job(db: AsyncSession, job: schemas.JobCreate):
     async with DistributedLock(f"job:user:{job.user_id}"):
         try:
-            await _validate_user_exists(db, job.user_id)
-            db_job = models.Job(**job.dict())
-            db.add(db_job)
+            db_job = await insert_returning(db, models.Job, job.dict())
             await db.commit()
-            await db.refresh(db_job)
             await logger.info("Created job", {
                 "job_id": db_job.job_id,
                 "user_id": job.user_id,
                 "job_title": job.job_tittle
             })
             return db_job
+        except IntegrityError as e:
+            await db.rollback()
+            error = missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Create job failed", error=e)
+                raise
+            raise error
         except Exception as e:
             await logger.error("Create job failed", error=e)
             await db.rollback()
@@ -69,12 +63,13 @@ async def get_job_by_id(db: AsyncSession, job_id: str):
 
 async def get_jobs_by_user_id(db: AsyncSession, user_id: str):
     try:
-        await _validate_user_exists(db, user_id)
         query = select(models.Job).where(models.Job.user_id == user_id)
         result = await db.execute(query)
         jobs = result.scalars().all()
 
         if not jobs:
+            # Only a miss needs to tell an unknown user from one without jobs
+            await require_users(db, user_id)
             await logger.warning("No jobs found", {"user_id": user_id})
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -89,25 +84,19 @@ async def get_jobs_by_user_id(db: AsyncSession, user_id: str):
 async def update_job(db: AsyncSession, job_id: str, job: schemas.JobUpdate):
     async with DistributedLock(f"job:{job_id}"):
         try:
-            # First check if job exists
-            existing_job = await get_job_by_id(db, job_id)
-            await _validate_user_exists(db, existing_job.user_id)
-
-            # Prepare update data
-            update_data = job.dict(exclude_unset=True)
-
-            # Execute update
-            query = (
-                update(models.Job)
-                .where(models.Job.job_id == job_id)
-                .values(**update_data)
-                .execution_options(synchronize_session="fetch")
+            # The job's user is kept valid by its foreign key
+            db_job = await update_returning(
+                db, models.Job, models.Job.job_id == job_id, job.dict(exclude_unset=True)
             )
-            await db.execute(query)
+            if db_job is None:
+                await logger.warning("Job not found", {"job_id": job_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job not found"
+                )
             await db.commit()
-
-            # Get and return updated job
-            return await get_job_by_id(db, job_id)
+            await logger.info("Updated job", {"job_id": job_id})
+            return db_job
         except HTTPException:
             raise
         except DatabaseOperationError:
@@ -126,17 +115,13 @@ async def update_job(db: AsyncSession, job_id: str, job: schemas.JobUpdate):
 async def delete_job(db: AsyncSession, job_id: str):
     async with DistributedLock(f"job:{job_id}"):
         try:
-            # First check if job exists
-            existing_job = await get_job_by_id(db, job_id)
-            await _validate_user_exists(db, existing_job.user_id)
-
-            # Execute delete
-            query = (
-                delete(models.Job)
-                .where(models.Job.job_id == job_id)
-                .execution_options(synchronize_session="fetch")
-            )
-            await db.execute(query)
+            deleted = await delete_returning(db, models.Job, models.Job.job_id == job_id, models.Job.job_id)
+            if deleted is None:
+                await logger.warning("Job not found", {"job_id": job_id})
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job not found"
+                )
             await db.commit()
 
             return {"detail": "Job deleted successfully"}
@@ -155,13 +140,21 @@ async def delete_job(db: AsyncSession, job_id: str):
                 detail="Internal server error"
             )
 
-async def get_all_jobs(db: AsyncSession, skip: int = 0, limit: int = 100):
+async def get_all_jobs(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     try:
-        query = select(models.Job).offset(skip).limit(limit)
+        query = select(models.Job)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.Job.job_id], cursor, limit)
+            await logger.info("Retrieved jobs page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
+        query = query.order_by(models.Job.job_id).offset(skip).limit(limit)
         result = await db.execute(query)
         jobs = result.scalars().all()
         await logger.info("Retrieved all jobs", {"count": len(jobs), "skip": skip, "limit": limit})
         return list(jobs)
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all jobs failed", error=e)
         raise
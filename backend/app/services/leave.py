@@ -0,0 +1,282 @@
+import os
+from collections import defaultdict
+from typing import Iterable, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import application as models_application
+from ..models import leave as models
+from ..schemas import leave as schemas
+from ..utils.logger import logger
+from .concurrency import missing_reference
+from .pagination import paginate
+from .references import any_id
+
+# Leave types whose balance may not go below zero when an application is
+# approved, e.g. "Normal,Student"; the others are tracked but uncapped
+LEAVE_CAPPED_TYPES = {name.strip() for name in os.getenv("LEAVE_CAPPED_TYPES", "").split(",") if name.strip()}
+MAX_DECISION_IDS = 1000
+
+_REFERENCE_MESSAGES = {
+    "leave_ledger_user_id_fkey": "User not found",
+    "leave_balance_user_id_fkey": "User not found",
+}
+
+Application = models_application.Application
+ApplicationStatus = models_application.StatusEnumApplication
+
+def application_days(application: models_application.Application) -> Optional[int]:
+    """Calendar days covered by an application, both ends included."""
+    if application.start_date is None or application.end_date is None:
+        return None
+    return (application.end_date - application.start_date).days + 1
+
+def application_entry(
+    application: models_application.Application,
+    kind: models.LeaveEntryEnum,
+    created_by: Optional[str] = None,
+    reason: Optional[str] = None,
+) -> Optional[dict]:
+    """The ledger entry taking or refunding an application's days, or None if it has no leave type or dates."""
+    days = application_days(application)
+    if application.leave_type is None or days is None:
+        return None
+    return {
+        "user_id": application.user_id,
+        "leave_type": application.leave_type,
+        "kind": kind,
+        "days": -days if kind is models.LeaveEntryEnum.Taken else days,
+        "application_id": application.application_id,
+        "reason": reason,
+        "created_by": created_by,
+    }
+
+async def post_entries(db: AsyncSession, entries: List[dict]) -> List[models.LeaveBalance]:
+    """Append ledger entries and fold them into leave_balance in the caller's transaction.
+
+    Two statements however many entries there are. Returns the touched balances.
+    """
+    if not entries:
+        return []
+    await db.execute(insert(models.LeaveLedger), entries)
+
+    totals = defaultdict(lambda: {"granted": 0.0, "used": 0.0})
+    for entry in entries:
+        total = totals[(entry["user_id"], entry["leave_type"])]
+        if entry["kind"] is models.LeaveEntryEnum.Adjustment:
+            total["granted"] += entry["days"]
+        else:
+            total["used"] -= entry["days"]
+    # A fixed row order keeps concurrent postings from deadlocking on the balance rows
+    rows = [
+        {"user_id": user_id, "leave_type": leave_type, **total}
+        for (user_id, leave_type), total in sorted(totals.items(), key=lambda item: (str(item[0][0]), item[0][1].name))
+    ]
+    balance = models.LeaveBalance
+    stmt = pg_insert(balance).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[balance.user_id, balance.leave_type],
+        set_={
+            "granted": balance.granted + stmt.excluded.granted,
+            "used": balance.used + stmt.excluded.used,
+            "updated_at": func.now(),
+        }
+    )
+    result = await db.execute(stmt.returning(balance).execution_options(populate_existing=True))
+    return list(result.scalars().all())
+
+def _check_capped(balances: List[models.LeaveBalance]):
+    for balance in balances:
+        if balance.leave_type.name in LEAVE_CAPPED_TYPES and balance.used > balance.granted:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Insufficient {balance.leave_type.value} leave balance for user {balance.user_id}"
+            )
+
+async def apply_decision(
+    db: AsyncSession,
+    application_ids: Iterable[str],
+    decision: ApplicationStatus,
+    decided_by: Optional[str] = None,
+    reason: Optional[str] = None,
+    user_ids: Optional[Iterable[str]] = None,
+) -> List[models_application.Application]:
+    """Approve or reject applications in the caller's transaction; returns the ones that changed.
+
+    Approval takes pending applications with a leave type and dates and
+    records their days as taken. Rejection takes pending and approved ones,
+    refunding the approved. With ``user_ids`` only those users' applications
+    are touched. Each transition is one UPDATE ... RETURNING over all ids, and
+    the ledger and balances follow in two more statements.
+    """
+    where = [any_id(Application.application_id, application_ids, "application_ids")]
+    if user_ids is not None:
+        where.append(any_id(Application.user_id, user_ids, "user_ids"))
+
+    if decision is ApplicationStatus.Approved:
+        transitions = [(ApplicationStatus.Pending, models.LeaveEntryEnum.Taken)]
+        where += [Application.leave_type.isnot(None), Application.start_date.isnot(None), Application.end_date.isnot(None)]
+    elif decision is ApplicationStatus.Rejected:
+        transitions = [(ApplicationStatus.Approved, models.LeaveEntryEnum.Refund), (ApplicationStatus.Pending, None)]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Applications can only be approved or rejected"
+        )
+
+    decided, entries = [], []
+    for previous, kind in transitions:
+        result = await db.execute(
+            update(Application)
+            .where(*where, Application.status == previous)
+            .values(status=decision)
+            .returning(Application)
+            .execution_options(populate_existing=True)
+        )
+        for application in result.scalars().all():
+            decided.append(application)
+            entry = application_entry(application, kind, decided_by, reason) if kind else None
+            if entry:
+                entries.append(entry)
+
+    balances = await post_entries(db, entries)
+    if decision is ApplicationStatus.Approved:
+        _check_capped(balances)
+    return decided
+
+async def decide_applications(
+    db: AsyncSession,
+    application_ids: List[str],
+    decision: ApplicationStatus,
+    decided_by: Optional[str] = None,
+    reason: Optional[str] = None,
+    user_ids: Optional[Iterable[str]] = None,
+):
+    """Bulk approve or reject in one transaction; all or nothing if a capped balance would go negative."""
+    if len(application_ids) > MAX_DECISION_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_DECISION_IDS} applications can be decided at once"
+        )
+    try:
+        decided = await apply_decision(db, application_ids, decision, decided_by, reason, user_ids)
+        decided_ids = {application.application_id for application in decided}
+        await db.commit()
+        await logger.info("Decided applications", {
+            "status": decision.value,
+            "decided": len(decided_ids),
+            "requested": len(application_ids),
+            "decided_by": decided_by
+        })
+        return {
+            "status": decision,
+            "decided": sorted(decided_ids, key=int),
+            "skipped": [application_id for application_id in dict.fromkeys(application_ids) if application_id not in decided_ids],
+        }
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Decide applications failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+def _balance_response(user_id: str, leave_type, granted: float = 0.0, used: float = 0.0) -> dict:
+    return {
+        "user_id": str(user_id),
+        "leave_type": leave_type,
+        "granted": granted,
+        "used": used,
+        "remaining": granted - used,
+    }
+
+async def get_balances(db: AsyncSession, user_id: str):
+    """Every leave type's balance for a user, read from the maintained totals rather than the ledger."""
+    balance = models.LeaveBalance
+    result = await db.execute(select(balance).where(balance.user_id == user_id))
+    found = {row.leave_type: row for row in result.scalars().all()}
+    await logger.info("Retrieved leave balances", {"user_id": user_id})
+    return [
+        _balance_response(user_id, leave_type, found[leave_type].granted, found[leave_type].used)
+        if leave_type in found else _balance_response(user_id, leave_type)
+        for leave_type in models_application.LeaveTypeEnum
+    ]
+
+async def adjust_balance(db: AsyncSession, adjustment: schemas.LeaveAdjustmentCreate, created_by: Optional[str] = None):
+    """Grant (positive days) or withdraw (negative) leave of one type."""
+    try:
+        balances = await post_entries(db, [{
+            **adjustment.dict(),
+            "kind": models.LeaveEntryEnum.Adjustment,
+            "application_id": None,
+            "created_by": created_by,
+        }])
+        await db.commit()
+        await logger.info("Adjusted leave balance", {
+            "user_id": adjustment.user_id,
+            "leave_type": adjustment.leave_type.value,
+            "days": adjustment.days,
+            "created_by": created_by
+        })
+        balance = balances[0]
+        return _balance_response(balance.user_id, balance.leave_type, balance.granted, balance.used)
+    except IntegrityError as e:
+        await db.rollback()
+        error = missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
+            await logger.error("Adjust leave balance failed", error=e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database operation failed"
+            )
+        raise error
+    except Exception as e:
+        await logger.error("Adjust leave balance failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+async def get_ledger(db: AsyncSession, user_id: str, limit: int = 50, cursor: Optional[str] = None):
+    """A user's ledger entries, newest first."""
+    ledger = models.LeaveLedger
+    items, next_cursor = await paginate(
+        db, select(ledger).where(ledger.user_id == user_id), [ledger.entry_id], cursor, limit, descending=True
+    )
+    await logger.info("Retrieved leave ledger", {"user_id": user_id, "count": len(items)})
+    return {"items": items, "next_cursor": next_cursor}
+
+async def rebuild_balances(db: AsyncSession):
+    """Recompute every balance from the ledger with a single GROUP BY."""
+    ledger = models.LeaveLedger
+    balance = models.LeaveBalance
+    adjustment = ledger.kind == models.LeaveEntryEnum.Adjustment
+    try:
+        await db.execute(delete(balance))
+        result = await db.execute(
+            insert(balance).from_select(
+                ["user_id", "leave_type", "granted", "used"],
+                select(
+                    ledger.user_id,
+                    ledger.leave_type,
+                    func.coalesce(func.sum(ledger.days).filter(adjustment), 0.0),
+                    func.coalesce(-func.sum(ledger.days).filter(~adjustment), 0.0),
+                ).group_by(ledger.user_id, ledger.leave_type)
+            )
+        )
+        await db.commit()
+        await logger.info("Rebuilt leave balances", {"balances": result.rowcount})
+        return {"balances": result.rowcount}
+    except Exception as e:
+        await logger.error("Rebuild leave balances failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Rebuild leave balances failed"
+        )
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _coerce(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def after_cursor(key_columns: List, cursor: str, descending: bool = False):
+    """The WHERE clause selecting the rows that follow ``cursor`` in key order.
+
+    Each cursor value is bound with its key column's type, so a NumericId key
+    compares BIGINT with BIGINT and the row-value comparison stays on the
+    key's index.
+    """
+    values = decode_cursor(cursor, key_columns)
+    key = tuple_(*key_columns)
+    boundary = tuple_(*(literal(value, type_=column.type) for column, value in zip(key_columns, values)))
+    return key < boundary if descending else key > boundary
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    key_columns: List,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """Keyset pagination over ``key_columns``, which must identify a row uniquely.
+
+    An empty cursor returns the first page. Only the rows of the requested page
+    are read, so latency does not grow with the page number.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = query.where(after_cursor(key_columns, cursor, descending))
+
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    result = await db.execute(query.order_by(*order).limit(limit + 1))
+    rows = list(result.scalars().all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key_columns])
+    return rows, next_cursor
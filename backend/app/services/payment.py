@@ -2,42 +2,35 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import payment as models
 from ..schemas import payment as schemas
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
-from typing import List
-from ..utils.redis_lock import DistributedLock
-from ..services import users as user_service
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from ..utils.logger import logger
+from .pagination import paginate
+from .repository import insert_returning, missing_or_stale, update_returning
+from .concurrency import missing_reference
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error while validating user"
-        )
+_REFERENCE_MESSAGES = {
+    "payment_user_id_fkey": "User not found",
+}
 
 async def create_payment(db: AsyncSession, payment: schemas.PaymentCreate):
     try:
-        await _validate_user_exists(db, payment.user_id)
-        db_payment = models.Payment(**payment.dict())
-        db.add(db_payment)
+        db_payment = await insert_returning(db, models.Payment, payment.dict())
         await db.commit()
-        await db.refresh(db_payment)
         await logger.info("Created payment", {
             "payment_id": db_payment.payment_id,
             "user_id": payment.user_id,
             "amount": payment.payment_amount
         })
         return db_payment
+    except IntegrityError as e:
+        await db.rollback()
+        error = missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
+            await logger.error("Create payment failed", error=e)
+            raise
+        raise error
     except Exception as e:
         await logger.error("Create payment failed", error=e)
         await db.rollback()
@@ -86,15 +79,23 @@ async def get_payments_by_user_id(db: AsyncSession, user_id: str):
         raise
 
 async def get_all_payments(
-    db: AsyncSession, skip: int = 0, limit: int = 100
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
 ) -> List[models.Payment]:
     try:
+        query = select(models.Payment)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.Payment.payment_id], cursor, limit)
+            await logger.info("Retrieved payments page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.Payment).offset(skip).limit(limit)
+            query.order_by(models.Payment.payment_id).offset(skip).limit(limit)
         )
         payments = result.scalars().all()
         await logger.info("Retrieved all payments", {"count": len(payments), "skip": skip, "limit": limit})
         return payments
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all payments failed", error=e)
         raise
@@ -102,57 +103,51 @@ async def get_all_payments(
 async def update_payment(
     db: AsyncSession, payment_id: str, payment: schemas.PaymentUpdate
 ):
-    async with DistributedLock(f"payment:{payment_id}"):
-        try:
-            query = (
-                update(models.Payment)
-                .where(models.Payment.payment_id == payment_id)
-                .values(**payment.dict(exclude_unset=True))  # Added exclude_unset=True
-            )
-
-            result = await db.execute(query)
-            await db.commit()
-
-            if result.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Payment not found"
-                )
+    try:
+        values = payment.dict(exclude_unset=True)  # Added exclude_unset=True
+        expected_version = values.pop("version", None)
+        # One conditional UPDATE: the row lock it takes is all the serialization needed
+        where = models.Payment.payment_id == payment_id
+        db_payment = await update_returning(db, models.Payment, where, values, expected_version)
+        if db_payment is None:
+            raise await missing_or_stale(db, models.Payment, where, expected_version, "Payment not found")
 
-            return await get_payment_by_id(db, payment_id)
-        except HTTPException:
-            await db.rollback()
-            raise
-        except Exception:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
-            )
+        await db.commit()
+        await logger.info("Updated payment", {"payment_id": payment_id, "version": db_payment.version})
+        return db_payment
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Update payment failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 async def delete_payment(db: AsyncSession, payment_id: str):
-    async with DistributedLock(f"payment:{payment_id}"):
-        try:
-            result = await db.execute(
-                delete(models.Payment).where(
-                    models.Payment.payment_id == payment_id
-                )
+    try:
+        result = await db.execute(
+            delete(models.Payment).where(
+                models.Payment.payment_id == payment_id
             )
-            await db.commit()
-
-            if result.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Payment not found"
-                )
+        )
 
-            return {"message": "Payment deleted successfully"}
-        except HTTPException:
-            await db.rollback()
-            raise
-        except Exception:
-            await db.rollback()
+        if result.rowcount == 0:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payment not found"
             )
+        await db.commit()
+
+        return {"message": "Payment deleted successfully"}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -0,0 +1,176 @@
+import os
+import time
+from datetime import date
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Numeric, and_, case, cast, delete, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import attendanceSummary as models_attendance
+from ..models import payment as models_payment
+from ..models import payrollRun as models
+from ..models import userFinancialInfo as models_financial
+from ..models import users as models_user
+from ..utils.logger import logger
+from .attendanceSummary import month_start
+from .pagination import paginate
+from .repository import update_returning
+
+# Fine per late arrival in the month's attendance rollup
+PAYROLL_LATE_FINE = float(os.getenv("PAYROLL_LATE_FINE", 0))
+# Overtime hours are paid at salaryBasic / PAYROLL_MONTHLY_HOURS times this rate
+PAYROLL_OVERTIME_RATE = float(os.getenv("PAYROLL_OVERTIME_RATE", 1.5))
+PAYROLL_MONTHLY_HOURS = float(os.getenv("PAYROLL_MONTHLY_HOURS", 176))
+
+PAYMENT_COLUMNS = [
+    "payroll_run_id", "user_id", "payment_month", "payment_method",
+    "payment_amount", "payment_fine", "comments",
+]
+
+def _eligible_employees():
+    """Active users with financial info; attendance is optional."""
+    financial = models_financial.UserFinancialInfo
+    users = models_user.Users
+    return (
+        select(financial.user_id)
+        .join(users, users.user_id == financial.user_id)
+        .where(users.status == models_user.StatusEnum.Active)
+    )
+
+def _payroll_rows(run_id: str, month: date):
+    """Price every eligible employee in one SELECT over financial info and the attendance rollup."""
+    financial = models_financial.UserFinancialInfo
+    rollup = models_attendance.AttendanceMonthly
+    payment = models_payment.Payment.__table__
+
+    fine = func.coalesce(rollup.late_arrivals, 0) * PAYROLL_LATE_FINE
+    overtime_pay = (
+        func.coalesce(rollup.overtime_hours, 0.0)
+        * financial.salaryBasic / PAYROLL_MONTHLY_HOURS * PAYROLL_OVERTIME_RATE
+    )
+    amount = func.greatest(financial.salaryNet + overtime_pay - fine, 0.0)
+    method = case(
+        (financial.accountNumber.isnot(None), literal(models_payment.PaymentEnum.Bank_Transfer.name)),
+        else_=literal(models_payment.PaymentEnum.Check.name),
+    )
+    return (
+        _eligible_employees()
+        .with_only_columns(
+            literal(run_id, payment.c.payroll_run_id.type),
+            financial.user_id,
+            literal(month.month),
+            cast(method, payment.c.payment_method.type),
+            func.round(cast(amount, Numeric), 2),
+            func.round(cast(fine, Numeric), 2),
+            literal(f"Payroll {month:%Y-%m}"),
+        )
+        .outerjoin(rollup, and_(rollup.user_id == financial.user_id, rollup.month == month))
+    )
+
+async def run_payroll(db: AsyncSession, month: date, started_by: Optional[str] = None):
+    """Compute (or recompute) one month's payments for every employee in a single transaction.
+
+    A rerun updates the run's existing payments in place, only touching rows
+    whose amount, fine or method changed, and removes payments of employees
+    who are no longer eligible. Running it twice gives the same payments.
+    """
+    month = month_start(month)
+    run = models.PayrollRun
+    payment = models_payment.Payment.__table__
+    started = time.monotonic()
+    try:
+        # The upsert locks the run row, so concurrent runs of a month take turns
+        run_id = await db.scalar(
+            pg_insert(run)
+            .values(month=month, started_by=started_by)
+            .on_conflict_do_update(constraint="uq_payroll_run_month", set_={"started_by": started_by})
+            .returning(run.run_id)
+        )
+
+        await db.execute(
+            delete(payment).where(
+                payment.c.payroll_run_id == run_id,
+                payment.c.user_id.not_in(_eligible_employees())
+            )
+        )
+
+        insert_payments = pg_insert(payment).from_select(PAYMENT_COLUMNS, _payroll_rows(run_id, month))
+        excluded = insert_payments.excluded
+        changed = (payment.c.payment_amount, payment.c.payment_fine, payment.c.payment_method)
+        await db.execute(
+            insert_payments.on_conflict_do_update(
+                constraint="uq_payment_payroll_run_user",
+                set_={
+                    "payment_month": excluded.payment_month,
+                    "payment_method": excluded.payment_method,
+                    "payment_amount": excluded.payment_amount,
+                    "payment_fine": excluded.payment_fine,
+                    "comments": excluded.comments,
+                    "version": payment.c.version + 1,
+                },
+                where=tuple_(*changed).is_distinct_from(
+                    tuple_(excluded.payment_amount, excluded.payment_fine, excluded.payment_method)
+                ),
+            )
+        )
+
+        employees, total_amount, total_fine = (await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(payment.c.payment_amount), 0.0),
+                func.coalesce(func.sum(payment.c.payment_fine), 0.0),
+            ).where(payment.c.payroll_run_id == run_id)
+        )).one()
+
+        db_run = await update_returning(db, run, run.run_id == run_id, {
+            "employees": employees,
+            "total_amount": round(total_amount, 2),
+            "total_fine": round(total_fine, 2),
+            "runs": run.runs + 1,
+            "duration_ms": round((time.monotonic() - started) * 1000, 2),
+            "computed_at": func.now(),
+        })
+        await db.commit()
+        await logger.info("Ran payroll", {
+            "run_id": run_id,
+            "month": str(month),
+            "employees": employees,
+            "total_amount": db_run.total_amount,
+            "duration_ms": db_run.duration_ms,
+        })
+        return db_run
+    except Exception as e:
+        await logger.error("Payroll run failed", error=e, data={"month": str(month)})
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Payroll run failed"
+        )
+
+async def get_payroll_run(db: AsyncSession, run_id: str):
+    result = await db.execute(select(models.PayrollRun).where(models.PayrollRun.run_id == run_id))
+    run = result.scalar_one_or_none()
+    if not run:
+        await logger.warning("Payroll run not found", {"run_id": run_id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Payroll run not found"
+        )
+    return run
+
+async def get_payroll_runs(db: AsyncSession, skip: int = 0, limit: int = 24):
+    result = await db.execute(
+        select(models.PayrollRun).order_by(models.PayrollRun.month.desc()).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_payroll_run_payments(
+    db: AsyncSession, run_id: str, limit: int = 200, cursor: Optional[str] = None
+):
+    await get_payroll_run(db, run_id)
+    payment = models_payment.Payment
+    items, next_cursor = await paginate(
+        db, select(payment).where(payment.payroll_run_id == run_id), [payment.payment_id], cursor, limit
+    )
+    await logger.info("Retrieved payroll run payments", {"run_id": run_id, "count": len(items)})
+    return {"items": items, "next_cursor": next_cursor}
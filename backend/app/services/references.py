@@ -0,0 +1,49 @@
+from typing import Iterable, Optional, Set
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import users as models_user
+
+# Existence checks for reads that must tell "no such user" apart from "no rows
+# for this user". Writes do not check first: their foreign keys reject a
+# missing row and concurrency.missing_reference turns that into a 404.
+
+def _as_id(value) -> Optional[int]:
+    # The integer NumericId binds ``value`` as, or None if it can never exist
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _numeric(ids: Iterable) -> Set[int]:
+    """The distinct ids as integers, so "7", "007" and " 7" count once."""
+    return {number for number in map(_as_id, ids) if number is not None}
+
+def any_id(column, ids: Iterable, name: str = "ids"):
+    """``column = ANY(:name)`` with the ids bound as a single BIGINT[] parameter.
+
+    The statement text and its prepared plan are the same however many ids
+    are passed.
+    """
+    return column == any_(bindparam(name, sorted(_numeric(ids)), type_=ARRAY(BigInteger)))
+
+async def existing_ids(db: AsyncSession, column, ids: Iterable) -> Set[str]:
+    """The given ids present in ``column``, resolved with one ``column = ANY(:ids)`` query."""
+    numeric = _numeric(ids)
+    if not numeric:
+        return set()
+    result = await db.execute(select(column).where(any_id(column, numeric)))
+    return {str(value) for value in result.scalars()}
+
+async def require_existing(db: AsyncSession, column, ids: Iterable, detail: str):
+    """404 with ``detail`` unless every id is present in ``column``."""
+    ids = list(ids)
+    if any(_as_id(value) is None for value in ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    wanted = _numeric(ids)
+    if len(await existing_ids(db, column, wanted)) < len(wanted):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+async def require_users(db: AsyncSession, *user_ids: str):
+    await require_existing(db, models_user.Users.user_id, user_ids, "User not found")
@@ -0,0 +1,52 @@
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .concurrency import conflict
+
+# Single round trip writes: each helper is one INSERT/UPDATE/DELETE ... RETURNING
+# whose result is an ORM object in the session, so services need neither
+# db.refresh() nor a second get_*_by_id() SELECT after a write. Commit and
+# error handling stay with the caller.
+
+async def insert_returning(db: AsyncSession, model, values: Dict[str, Any]):
+    """Insert one row and return it with its server-generated columns."""
+    result = await db.execute(insert(model).values(**values).returning(model))
+    return result.scalar_one()
+
+async def update_returning(
+    db: AsyncSession, model, where, values: Dict[str, Any], expected_version: Optional[int] = None
+):
+    """Update the row matching ``where`` and return it as stored, or None when nothing matched.
+
+    Models with a ``version_id_col`` get their version bumped in the same
+    statement; with ``expected_version`` only a row still at that version is
+    updated (see missing_or_stale for telling the two misses apart).
+    """
+    statement = update(model).where(where)
+    version = inspect(model).version_id_col
+    if version is not None:
+        values = {**values, version.key: version + 1}
+        if expected_version is not None:
+            statement = statement.where(version == expected_version)
+    result = await db.execute(
+        statement.values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+async def delete_returning(db: AsyncSession, model, where, *columns):
+    """Delete the row matching ``where``; returns the first of ``columns`` (default the row) or None."""
+    result = await db.execute(delete(model).where(where).returning(*(columns or (model,))))
+    return result.scalar_one_or_none()
+
+async def missing_or_stale(
+    db: AsyncSession, model, where, expected_version: Optional[int], detail: str
+) -> HTTPException:
+    """The error for an update_returning that matched nothing: 409 if the row still exists, else 404."""
+    if expected_version is not None:
+        key = inspect(model).primary_key[0]
+        if await db.scalar(select(key).where(where)) is not None:
+            return conflict()
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
@@ -1,115 +1,94 @@
 # services/userFinancialInfo.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update, Integer
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from ..models import userFinancialInfo as models
 from ..schemas import userFinancialInfo as schemas
-from typing import List
-from ..utils.redis_lock import DistributedLock
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .concurrency import missing_reference, unique_conflict
+from .references import require_users
+from .repository import delete_returning, insert_returning, missing_or_stale, update_returning
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
+_UNIQUE_MESSAGES = {
+    "uq_users_financial_info_user_id": "Financial info already exists for this user",
+}
+
+_REFERENCE_MESSAGES = {
+    "users_financial_info_user_id_fkey": "User not found",
+}
 
 async def create_financial_info(
     financial: schemas.UserFinancialInfoCreate, db: AsyncSession
 ):
-    async with DistributedLock(f"financial_info:user:{financial.user_id}"):
-        try:
-            await _validate_user_exists(db, financial.user_id)
-            # Check if user already has financial info
-            existing = await db.execute(
-                select(models.UserFinancialInfo).filter(
-                    models.UserFinancialInfo.user_id == financial.user_id
-                )
-            )
-            if existing.scalar_one_or_none():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Financial info already exists for this user",
-                )
-
-            db_financial = models.UserFinancialInfo(**financial.dict())
-            db.add(db_financial)
-            await db.commit()
-            await db.refresh(db_financial)
-            await logger.info("Created financial info", {
-                "financial_info_id": db_financial.financial_info_id,
-                "user_id": financial.user_id
-            })
-            return db_financial
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
+    try:
+        # One row per user is enforced by uq_users_financial_info_user_id
+        db_financial = await insert_returning(db, models.UserFinancialInfo, financial.dict())
+        await db.commit()
+        await logger.info("Created financial info", {
+            "financial_info_id": db_financial.financial_info_id,
+            "user_id": financial.user_id
+        })
+        return db_financial
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
             await logger.error("Create financial info failed", error=e)
-            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                detail="Database operation failed"
             )
+        raise error
+    except Exception as e:
+        await logger.error("Create financial info failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def update_financial_info(
     db: AsyncSession, financial_info_id: str, financial: schemas.UserFinancialInfoUpdate
 ):
-    async with DistributedLock(f"financial_info:{financial_info_id}"):
-        try:
-            db_financial = await get_financial_info_by_id(db, financial_info_id)
-
-            # Changed to use exclude_unset=True
-            update_data = financial.dict(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_financial, key, value)
-
-            await db.commit()
-            await db.refresh(db_financial)
-            await logger.info("Updated financial info", {
-                "financial_info_id": financial_info_id,
-                "user_id": db_financial.user_id
-            })
-            return db_financial
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Update financial info failed", error=e)
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+    try:
+        # Changed to use exclude_unset=True
+        update_data = financial.dict(exclude_unset=True)
+        expected_version = update_data.pop("version", None)
+
+        where = models.UserFinancialInfo.financial_info_id == financial_info_id
+        db_financial = await update_returning(db, models.UserFinancialInfo, where, update_data, expected_version)
+        if db_financial is None:
+            raise await missing_or_stale(
+                db, models.UserFinancialInfo, where, expected_version, "Financial info not found"
             )
 
+        await db.commit()
+        await logger.info("Updated financial info", {
+            "financial_info_id": financial_info_id,
+            "user_id": db_financial.user_id
+        })
+        return db_financial
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Update financial info failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 
 async def get_financial_info_by_id(db: AsyncSession, financial_info_id: str):
     try:
@@ -139,18 +118,27 @@ async def get_financial_info_by_id(db: AsyncSession, financial_info_id: str):
 
 
 async def get_all_financial_info(
-    db: AsyncSession, skip: int = 0, limit: int = 200
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
 ) -> List[models.UserFinancialInfo]:
     try:
+        if cursor is not None:
+            items, next_cursor = await paginate(
+                db, select(models.UserFinancialInfo), [models.UserFinancialInfo.financial_info_id], cursor, limit
+            )
+            await logger.info("Retrieved financial info page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
             select(models.UserFinancialInfo)
-            .order_by(models.UserFinancialInfo.user_id.cast(Integer))
+            .order_by(models.UserFinancialInfo.user_id)
             .offset(skip)
             .limit(limit)
         )
         financial_infos = result.scalars().all()
         await logger.info("Retrieved all financial info", {"count": len(financial_infos)})
         return financial_infos if financial_infos else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all financial info failed", error=e)
         raise HTTPException(
@@ -160,39 +148,36 @@ async def get_all_financial_info(
 
 
 async def delete_financial_info(db: AsyncSession, financial_info_id: str):
-    async with DistributedLock(f"financial_info:{financial_info_id}"):
-        try:
-            await get_financial_info_by_id(db, financial_info_id)
-
-            stmt = delete(models.UserFinancialInfo).where(
-                models.UserFinancialInfo.financial_info_id == financial_info_id
-            )
-
-            await db.execute(stmt)
-            await db.commit()
-            await logger.info("Deleted financial info", {"financial_info_id": financial_info_id})
-            return {"detail": "Financial info deleted successfully"}
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Delete financial info failed", error=e)
-            await db.rollback()
+    try:
+        deleted = await delete_returning(
+            db,
+            models.UserFinancialInfo,
+            models.UserFinancialInfo.financial_info_id == financial_info_id,
+            models.UserFinancialInfo.financial_info_id,
+        )
+        if deleted is None:
+            await logger.warning("Financial info not found", {"financial_info_id": financial_info_id})
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Financial info not found"
             )
+        await db.commit()
+        await logger.info("Deleted financial info", {"financial_info_id": financial_info_id})
+        return {"detail": "Financial info deleted successfully"}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Delete financial info failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def get_user_financial_info_by_user_id(db: AsyncSession, user_id: str):
     try:
-        await _validate_user_exists(db, user_id)
         result = await db.execute(
             select(models.UserFinancialInfo).filter(
                 models.UserFinancialInfo.user_id == user_id
@@ -201,6 +186,8 @@ async def get_user_financial_info_by_user_id(db: AsyncSession, user_id: str):
         user_financial_info = result.scalar_one_or_none()
 
         if not user_financial_info:
+            # Only a miss needs to tell an unknown user from one without financial info
+            await require_users(db, user_id)
             await logger.warning("Financial info not found for user", {"user_id": user_id})
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,43 +1,96 @@
+import os
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import userMessage as models
+from ..models import conversationSummary as models_summary
 from ..schemas import userMessage as schemas
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
-from typing import List
-from ..utils.redis_lock import DistributedLock
-from ..services import users as user_service
+from sqlalchemy import select, delete, update, or_, func, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from ..utils.logger import logger
+from .concurrency import missing_reference
+from .pagination import paginate, MAX_PAGE_SIZE
+from .repository import insert_returning, update_returning
+from ..utils.websocket_manager import manager as websocket_manager
 
-async def _validate_users_exist(db: AsyncSession, sender_id: str, receiver_id: str):
-    """Validate if both sender and receiver exist in the database"""
+PREVIEW_LENGTH = 200
+# Message ids are drawn when the row is inserted, not when it commits, so a
+# lower id can become visible after a client has synced past it. Sync resends
+# the user's messages at or below after_id that are this recent.
+MESSAGE_SYNC_RESCAN_SECONDS = float(os.getenv("MESSAGE_SYNC_RESCAN_SECONDS", 30))
+
+_REFERENCE_MESSAGES = {
+    "user_message_sender_id_fkey": "Sender or receiver not found",
+    "user_message_receiver_id_fkey": "Sender or receiver not found",
+}
+
+def _message_payload(message: models.UserMessage) -> dict:
+    return {
+        "message_id": message.message_id,
+        "sender_id": message.sender_id,
+        "receiver_id": message.receiver_id,
+        "text": message.text,
+        "created_at": message.created_at,
+        "is_read": message.is_read,
+    }
+
+def _thread_pair(user_id: str, peer_id: str):
     try:
-        sender = await user_service.get_user_by_id(db, sender_id)
-        receiver = await user_service.get_user_by_id(db, receiver_id)
-        if not sender or not receiver:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sender or receiver not found"
-            )
-        return True
-    except Exception as e:
+        return tuple(sorted((user_id, peer_id), key=int))
+    except (TypeError, ValueError):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error validating users"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user id"
         )
 
+async def _record_in_conversations(db: AsyncSession, message: models.UserMessage):
+    """Upsert both participants' conversation rows in the message's transaction."""
+    summary = models_summary.ConversationSummary
+    last = {
+        "last_message_id": message.message_id,
+        "last_message_at": message.created_at,
+        "last_sender_id": message.sender_id,
+        "last_text": message.text[:PREVIEW_LENGTH],
+    }
+    rows = [{"user_id": message.sender_id, "peer_id": message.receiver_id, "unread_count": 0, **last}]
+    if message.receiver_id != message.sender_id:
+        rows.append({"user_id": message.receiver_id, "peer_id": message.sender_id, "unread_count": 1, **last})
+
+    stmt = pg_insert(summary).values(rows)
+    # Concurrent writers may commit out of order; only a newer message replaces the preview
+    newer = stmt.excluded.last_message_id > summary.last_message_id
+    set_ = {
+        column: case((newer, getattr(stmt.excluded, column)), else_=getattr(summary, column))
+        for column in last
+    }
+    set_["unread_count"] = summary.unread_count + stmt.excluded.unread_count
+    await db.execute(stmt.on_conflict_do_update(index_elements=[summary.user_id, summary.peer_id], set_=set_))
+
 async def create_message(db: AsyncSession, message: schemas.MessageCreate):
     try:
-        await _validate_users_exist(db, message.sender_id, message.receiver_id)
-        db_message = models.UserMessage(**message.dict())
-        db.add(db_message)
+        db_message = await insert_returning(db, models.UserMessage, message.dict())
+        await _record_in_conversations(db, db_message)
         await db.commit()
-        await db.refresh(db_message)
         await logger.info("Created message", {
             "message_id": db_message.message_id,
             "sender_id": message.sender_id,
             "receiver_id": message.receiver_id
         })
+        # Push to the receiver's open sockets on every worker; offline users catch up via /me/messages/sync
+        await websocket_manager.send_to_user(db_message.receiver_id, {
+            "type": "message.created",
+            "message": _message_payload(db_message)
+        })
         return db_message
+    except IntegrityError as e:
+        await db.rollback()
+        error = missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
+            await logger.error("Create message failed", error=e)
+            raise
+        raise error
     except Exception as e:
         await logger.error("Create message failed", error=e)
         await db.rollback()
@@ -64,16 +117,27 @@ async def get_message_by_id(db: AsyncSession, message_id: str):
         await logger.error("Get message by id failed", error=e)
         raise
 
-async def get_sent_messages(db: AsyncSession, user_id: str):
+async def get_sent_messages(
+    db: AsyncSession, user_id: str, cursor: Optional[str] = None, limit: int = 100
+):
     try:
-        result = await db.execute(
-            select(models.UserMessage).filter(
-                models.UserMessage.sender_id == user_id
+        query = select(models.UserMessage).filter(models.UserMessage.sender_id == user_id)
+        if cursor is not None:
+            # Newest first
+            items, next_cursor = await paginate(
+                db, query, [models.UserMessage.message_id], cursor, limit, descending=True
             )
+            return {"items": items, "next_cursor": next_cursor}
+
+        # Without a cursor: the newest page only, never the whole mailbox
+        result = await db.execute(
+            query.order_by(models.UserMessage.message_id.desc()).limit(max(1, min(limit, MAX_PAGE_SIZE)))
         )
         messages = result.scalars().all()
         await logger.info("Retrieved sent messages", {"user_id": user_id, "count": len(messages)})
         return messages
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get sent messages failed", error=e)
         raise HTTPException(
@@ -81,16 +145,27 @@ async def get_sent_messages(db: AsyncSession, user_id: str):
             detail="Internal server error"
         )
 
-async def get_received_messages(db: AsyncSession, user_id: str):
+async def get_received_messages(
+    db: AsyncSession, user_id: str, cursor: Optional[str] = None, limit: int = 100
+):
     try:
-        result = await db.execute(
-            select(models.UserMessage).filter(
-                models.UserMessage.receiver_id == user_id
+        query = select(models.UserMessage).filter(models.UserMessage.receiver_id == user_id)
+        if cursor is not None:
+            # Newest first
+            items, next_cursor = await paginate(
+                db, query, [models.UserMessage.message_id], cursor, limit, descending=True
             )
+            return {"items": items, "next_cursor": next_cursor}
+
+        # Without a cursor: the newest page only, never the whole mailbox
+        result = await db.execute(
+            query.order_by(models.UserMessage.message_id.desc()).limit(max(1, min(limit, MAX_PAGE_SIZE)))
         )
         messages = result.scalars().all()
         await logger.info("Retrieved received messages", {"user_id": user_id, "count": len(messages)})
         return messages
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get received messages failed", error=e)
         raise HTTPException(
@@ -98,74 +173,219 @@ async def get_received_messages(db: AsyncSession, user_id: str):
             detail="Internal server error"
         )
 
-async def update_message(
-    db: AsyncSession, message_id: str, message: schemas.MessageUpdate
+async def get_messages_since(db: AsyncSession, user_id: str, after_id: str, limit: int = 100):
+    """Messages sent or received by ``user_id`` with an id above ``after_id``, oldest first.
+
+    Messages at or below ``after_id`` created in the last
+    MESSAGE_SYNC_RESCAN_SECONDS are returned too, ahead of the rest, so one
+    that committed after a lower id was synced is not lost; clients dedupe on
+    message_id. They do not count towards ``limit``, so sync always moves on.
+    """
+    message = models.UserMessage
+    mine = or_(message.sender_id == user_id, message.receiver_id == user_id)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=MESSAGE_SYNC_RESCAN_SECONDS)
+    try:
+        late = await db.execute(
+            select(message)
+            .filter(mine, message.message_id <= after_id, message.created_at >= cutoff)
+            .order_by(message.message_id)
+            .limit(MAX_PAGE_SIZE)
+        )
+        result = await db.execute(
+            select(message)
+            .filter(mine, message.message_id > after_id)
+            .order_by(message.message_id)
+            .limit(max(1, min(limit, MAX_PAGE_SIZE)))
+        )
+        messages = late.scalars().all() + result.scalars().all()
+        await logger.info("Synced messages", {"user_id": user_id, "after_id": after_id, "count": len(messages)}, hot_path=True)
+        return messages
+    except Exception as e:
+        await logger.error("Sync messages failed", error=e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+async def get_thread(
+    db: AsyncSession, user_id: str, peer_id: str, cursor: Optional[str] = None, limit: int = 50
 ):
-    async with DistributedLock(f"message:{message_id}"):
-        try:
-            query = (
-                update(models.UserMessage)
-                .where(models.UserMessage.message_id == message_id)
-                .values(message.dict(exclude_unset=True))
-            )
+    """One page of the conversation between two users, newest first."""
+    low, high = _thread_pair(user_id, peer_id)
+    try:
+        # Same expressions as ix_user_message_thread, typed so the ids bind as BIGINT
+        id_type = models.UserMessage.sender_id.type
+        query = select(models.UserMessage).filter(
+            func.least(models.UserMessage.sender_id, models.UserMessage.receiver_id, type_=id_type) == low,
+            func.greatest(models.UserMessage.sender_id, models.UserMessage.receiver_id, type_=id_type) == high
+        )
+        items, next_cursor = await paginate(
+            db,
+            query,
+            [models.UserMessage.created_at, models.UserMessage.message_id],
+            cursor,
+            limit,
+            descending=True,
+        )
+        await logger.info("Retrieved message thread", {"user_id": user_id, "peer_id": peer_id, "count": len(items)}, hot_path=True)
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        await logger.error("Get message thread failed", error=e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
-            result = await db.execute(query)
-            await db.commit()
+async def get_conversations(db: AsyncSession, user_id: str, cursor: Optional[str] = None, limit: int = 50):
+    """The user's conversations, most recently active first, with unread counts."""
+    summary = models_summary.ConversationSummary
+    try:
+        items, next_cursor = await paginate(
+            db,
+            select(summary).filter(summary.user_id == user_id),
+            [summary.last_message_at, summary.peer_id],
+            cursor,
+            limit,
+            descending=True,
+        )
+        await logger.info("Retrieved conversations", {"user_id": user_id, "count": len(items)}, hot_path=True)
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except Exception as e:
+        await logger.error("Get conversations failed", error=e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
-            if result.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Message not found"
-                )
+async def mark_thread_read(db: AsyncSession, user_id: str, peer_id: str, up_to_id: str):
+    """Mark every message from ``peer_id`` to ``user_id`` up to ``up_to_id`` as read."""
+    _thread_pair(user_id, peer_id)
+    summary = models_summary.ConversationSummary
+    try:
+        result = await db.execute(
+            update(models.UserMessage)
+            .where(
+                models.UserMessage.receiver_id == user_id,
+                models.UserMessage.sender_id == peer_id,
+                models.UserMessage.message_id <= up_to_id,
+                models.UserMessage.is_read.is_(False)
+            )
+            .values(is_read=True)
+        )
+        marked = result.rowcount
+        unread = await db.execute(
+            update(summary)
+            .where(summary.user_id == user_id, summary.peer_id == peer_id)
+            .values(unread_count=func.greatest(summary.unread_count - marked, 0))
+            .returning(summary.unread_count)
+        )
+        unread_count = unread.scalar_one_or_none() or 0
+        await db.commit()
+        await logger.info("Marked messages read", {"user_id": user_id, "peer_id": peer_id, "marked": marked})
+        if marked:
+            await websocket_manager.send_to_user(peer_id, {
+                "type": "message.read",
+                "reader_id": user_id,
+                "up_to_id": up_to_id
+            })
+        return {"marked": marked, "unread_count": unread_count}
+    except Exception as e:
+        await logger.error("Mark messages read failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
-            return await get_message_by_id(db, message_id)
-        except HTTPException:
-            await db.rollback()
-            raise
-        except Exception:
-            await db.rollback()
+async def update_message(
+    db: AsyncSession, message_id: str, message: schemas.MessageUpdate
+):
+    try:
+        db_message = await update_returning(
+            db,
+            models.UserMessage,
+            models.UserMessage.message_id == message_id,
+            message.dict(exclude_unset=True),
+        )
+        if db_message is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Message not found"
             )
+        await db.commit()
+
+        return db_message
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 async def delete_message(db: AsyncSession, message_id: str):
-    async with DistributedLock(f"message:{message_id}"):
-        try:
-            result = await db.execute(
-                delete(models.UserMessage).where(
-                    models.UserMessage.message_id == message_id
-                )
+    try:
+        result = await db.execute(
+            delete(models.UserMessage)
+            .where(models.UserMessage.message_id == message_id)
+            .returning(
+                models.UserMessage.sender_id,
+                models.UserMessage.receiver_id,
+                models.UserMessage.is_read
             )
-            await db.commit()
-
-            if result.rowcount == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Message not found"
-                )
+        )
+        deleted = result.one_or_none()
 
-            return {"message": "Message deleted successfully"}
-        except HTTPException:
-            await db.rollback()
-            raise
-        except Exception:
-            await db.rollback()
+        if deleted is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Message not found"
             )
 
+        if not deleted.is_read:
+            summary = models_summary.ConversationSummary
+            await db.execute(
+                update(summary)
+                .where(summary.user_id == deleted.receiver_id, summary.peer_id == deleted.sender_id)
+                .values(unread_count=func.greatest(summary.unread_count - 1, 0))
+            )
+        await db.commit()
+
+        return {"message": "Message deleted successfully"}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 async def get_all_messages(
-    db: AsyncSession, skip: int = 0, limit: int = 100
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
 ) -> List[models.UserMessage]:
     try:
+        query = select(models.UserMessage)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.UserMessage.message_id], cursor, limit)
+            await logger.info("Retrieved messages page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.UserMessage).offset(skip).limit(limit)
+            query.order_by(models.UserMessage.message_id).offset(skip).limit(limit)
         )
         messages = result.scalars().all()
         await logger.info("Retrieved all messages", {"count": len(messages), "skip": skip, "limit": limit})
         return messages if messages else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all messages failed", error=e)
         raise HTTPException(
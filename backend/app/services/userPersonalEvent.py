@@ -2,51 +2,45 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..models import userPersonalEvent as models
 from ..schemas import userPersonalEvent as schemas
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete, update
-from typing import List
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from ..utils.redis_lock import DistributedLock
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .repository import insert_returning, update_returning
+from .concurrency import missing_reference
+
+_REFERENCE_MESSAGES = {
+    "user_personal_event_user_id_fkey": "User not found",
+}
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
-
 async def create_user_event(db: AsyncSession, event: schemas.UserPersonalEventCreate):
     async with DistributedLock(f"event:user:{event.user_id}"):
         try:
-            await _validate_user_exists(db, event.user_id)
-            db_event = models.UserPersonalEvent(
-                user_id=event.user_id,
-                event_title=event.event_title,
-                event_description=event.event_description,
-                event_start_date=event.event_start_date,
-                event_end_date=event.event_end_date,
-            )
-            db.add(db_event)
+            db_event = await insert_returning(db, models.UserPersonalEvent, {
+                "user_id": event.user_id,
+                "event_title": event.event_title,
+                "event_description": event.event_description,
+                "event_start_date": event.event_start_date,
+                "event_end_date": event.event_end_date,
+            })
             await db.commit()
-            await db.refresh(db_event)
             await logger.info("Created user event", {
                 "event_id": db_event.event_id,
                 "user_id": event.user_id
             })
             return db_event
+        except IntegrityError as e:
+            await db.rollback()
+            error = missing_reference(e, _REFERENCE_MESSAGES)
+            if error is None:
+                await logger.error("Create user event failed", error=e)
+                raise
+            raise error
         except Exception as e:
             await logger.error("Create user event failed", error=e)
             await db.rollback()
@@ -95,15 +89,23 @@ async def get_user_event_by_user_id(db: AsyncSession, user_id: str):
         raise
 
 async def get_all_events(
-    db: AsyncSession, skip: int = 0, limit: int = 200
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
 ) -> List[models.UserPersonalEvent]:
     try:
+        query = select(models.UserPersonalEvent)
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.UserPersonalEvent.event_id], cursor, limit)
+            await logger.info("Retrieved events page", {"count": len(items), "limit": limit})
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
-            select(models.UserPersonalEvent).offset(skip).limit(limit)
+            query.order_by(models.UserPersonalEvent.event_id).offset(skip).limit(limit)
         )
         events = result.scalars().all()
         await logger.info("Retrieved all events", {"count": len(events), "skip": skip, "limit": limit})
         return events
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all events failed", error=e)
         raise
@@ -113,23 +115,21 @@ async def update_user_event(
 ):
     async with DistributedLock(f"event:{event_id}"):
         try:
-            query = (
-                update(models.UserPersonalEvent)
-                .where(models.UserPersonalEvent.event_id == event_id)
-                .values(**event.dict(exclude_unset=True))  # Added exclude_unset=True
+            db_event = await update_returning(
+                db,
+                models.UserPersonalEvent,
+                models.UserPersonalEvent.event_id == event_id,
+                event.dict(exclude_unset=True),  # Added exclude_unset=True
             )
-
-            result = await db.execute(query)
-            await db.commit()
-
-            if result.rowcount == 0:
+            if db_event is None:
                 await logger.warning("Event not found for update", {"event_id": event_id})
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Event not found"
                 )
+            await db.commit()
 
             await logger.info("Updated user event", {"event_id": event_id})
-            return await get_user_event_by_id(db, event_id)
+            return db_event
         except Exception as e:
             await logger.error("Update user event failed", error=e)
             await db.rollback()
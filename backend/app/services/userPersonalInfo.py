@@ -1,152 +1,65 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update, cast, Integer
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from ..models import userPersonalInfo as models
 from ..models import department as models_department
 from ..schemas import userPersonalInfo as schemas
-from typing import List
-from ..utils.redis_lock import DistributedLock
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from ..utils.logger import logger
-from ..services import users as user_service
+from .pagination import paginate
+from .concurrency import missing_reference, unique_conflict
+from .repository import delete_returning, insert_returning, missing_or_stale, update_returning
+from ..utils.manager_scope import invalidate_manager_scope
 
 class DatabaseOperationError(Exception):
     pass
 
-async def _validate_user_exists(db: AsyncSession, user_id: str):
-    try:
-        user = await user_service.get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        return user
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating user"
-        )
+_UNIQUE_MESSAGES = {
+    "uq_users_personal_info_user_id": "Personal info already exists for this user",
+    "uq_users_personal_info_email": "Email already exists",
+    "uq_users_personal_info_phone": "Phone number already exists",
+}
 
-async def _validate_department_exists(db: AsyncSession, department_id: str):
-    try:
-        if department_id:  # Only check if department_id is provided
-            result = await db.execute(
-                select(models_department.Department).filter(
-                    models_department.Department.department_id == department_id
-                )
-            )
-            department = result.scalar_one_or_none()
-            if not department:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Department not found"
-                )
-            return department
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating department"
-        )
-
-async def _validate_email_unique(db: AsyncSession, email: str, exclude_user_id: str = None):
-    try:
-        query = select(models.UserPersonalInfo).filter(models.UserPersonalInfo.email == email)
-        if exclude_user_id:
-            query = query.filter(models.UserPersonalInfo.user_id != exclude_user_id)
-        
-        result = await db.execute(query)
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists"
-            )
-    except HTTPException as http_exc:
-        raise http_exc
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating email"
-        )
+_REFERENCE_MESSAGES = {
+    "users_personal_info_user_id_fkey": "User not found",
+    "users_personal_info_department_id_fkey": "Department not found",
+}
 
-async def _validate_phone_unique(db: AsyncSession, phone: str, exclude_user_id: str = None):
+async def create_user_info(user: schemas.UserInfoCreate, db: AsyncSession):
     try:
-        query = select(models.UserPersonalInfo).filter(models.UserPersonalInfo.phone == phone)
-        if exclude_user_id:
-            query = query.filter(models.UserPersonalInfo.user_id != exclude_user_id)
-        
-        result = await db.execute(query)
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
+        # Uniqueness of user_id, email and phone and the user and department
+        # references are left to the constraints
+        db_user = await insert_returning(db, models.UserPersonalInfo, user.dict())
+        await db.commit()
+        if db_user.department_id:
+            await invalidate_manager_scope(department_id=db_user.department_id)
+        await logger.info("Created user personal info", {
+            "personal_info_id": db_user.personal_info_id,
+            "user_id": user.user_id
+        })
+        return db_user
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
+            await logger.error("Create user personal info failed", error=e)
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Phone number already exists"
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database operation failed"
             )
-    except HTTPException as http_exc:
-        raise http_exc
+        raise error
     except Exception as e:
+        await logger.error("Create user personal info failed", error=e)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error while validating phone number"
+            detail="Internal server error"
         )
 
-async def create_user_info(user: schemas.UserInfoCreate, db: AsyncSession):
-    async with DistributedLock(f"personal_info:user:{user.user_id}"):
-        try:
-            await _validate_user_exists(db, user.user_id)
-            if user.department_id:
-                await _validate_department_exists(db, user.department_id)
-            
-            # Validate email and phone uniqueness
-            if user.email:
-                await _validate_email_unique(db, user.email)
-            if user.phone:
-                await _validate_phone_unique(db, user.phone)
-            
-            # Check if user already has personal info
-            existing = await db.execute(
-                select(models.UserPersonalInfo).filter(
-                    models.UserPersonalInfo.user_id == user.user_id
-                )
-            )
-            if existing.scalar_one_or_none():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Personal info already exists for this user",
-                )
-
-            db_user = models.UserPersonalInfo(**user.dict())
-            db.add(db_user)
-            await db.commit()
-            await db.refresh(db_user)
-            await logger.info("Created user personal info", {
-                "personal_info_id": db_user.personal_info_id,
-                "user_id": user.user_id
-            })
-            return db_user
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Create user personal info failed", error=e)
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
-            )
-
 
 async def get_user_personal_info_by_id(db: AsyncSession, personal_info_id: str):
     try:
@@ -190,7 +103,7 @@ async def get_user_personal_info_by_user_id(db: AsyncSession, user_id: str):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Personal information not found for this user",
             )
-        await logger.info("Retrieved personal info for user", {"user_id": user_id})
+        await logger.info("Retrieved personal info for user", {"user_id": user_id}, hot_path=True)
         return personal_info
     except HTTPException:
         raise
@@ -205,163 +118,179 @@ async def get_user_personal_info_by_user_id(db: AsyncSession, user_id: str):
 async def update_user_personal_info(
     db: AsyncSession, personal_info_id: str, user: schemas.UserInfoUpdate
 ):
-    async with DistributedLock(f"personal_info:{personal_info_id}"):
-        try:
-            db_user = await get_user_personal_info_by_id(db, personal_info_id)
-            
-            # Validate department if it's being updated
-            if user.department_id:
-                await _validate_department_exists(db, user.department_id)
-
-            # Validate email and phone uniqueness if they're being updated
-            if user.email is not None:
-                await _validate_email_unique(db, user.email, db_user.user_id)
-            if user.phone is not None:
-                await _validate_phone_unique(db, user.phone, db_user.user_id)
-
-            for key, value in user.dict(exclude_unset=True).items():
-                setattr(db_user, key, value)
-
-            await db.commit()
-            await db.refresh(db_user)
-            await logger.info("Updated user personal info", {
-                "personal_info_id": personal_info_id
-            })
-
-            #thêm việc kiểm tra email đã tồn tại chưa
-            return db_user
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
+    try:
+        changes = user.dict(exclude_unset=True)
+        expected_version = changes.pop("version", None)
+
+        where = models.UserPersonalInfo.personal_info_id == personal_info_id
+        db_user = await update_returning(db, models.UserPersonalInfo, where, changes, expected_version)
+        if db_user is None:
+            raise await missing_or_stale(
+                db, models.UserPersonalInfo, where, expected_version, "Personal information not found"
             )
-        except Exception as e:
+
+        await db.commit()
+        if "department_id" in changes:
+            # Leaves the old department's scope (found by member) and joins the new one
+            await invalidate_manager_scope(department_id=db_user.department_id, user_id=db_user.user_id)
+        await logger.info("Updated user personal info", {
+            "personal_info_id": personal_info_id
+        })
+        return db_user
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES) or missing_reference(e, _REFERENCE_MESSAGES)
+        if error is None:
             await logger.error("Update user personal info failed", error=e)
-            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                detail="Database operation failed"
             )
+        raise error
+    except Exception as e:
+        await logger.error("Update user personal info failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def update_user_personal_info_no_department(
     db: AsyncSession, personal_info_id: str, user: schemas.UserInfoUpdateNoDepartment
 ):
-    async with DistributedLock(f"personal_info:{personal_info_id}"):
-        try:
-            db_user = await get_user_personal_info_by_id(db, personal_info_id)
-
-            # Validate email and phone uniqueness if they're being updated
-            if user.email is not None:
-                await _validate_email_unique(db, user.email, db_user.user_id)
-            if user.phone is not None:
-                await _validate_phone_unique(db, user.phone, db_user.user_id)
-
-            for key, value in user.dict(exclude_unset=True).items():
-                if value is not None:  # Only update non-None values
-                    setattr(db_user, key, value)
-
-            await db.commit()
-            await db.refresh(db_user)
-            await logger.info("Updated user personal info without department", {
-                "personal_info_id": personal_info_id
-            })
-            return db_user
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
+    try:
+        changes = user.dict(exclude_unset=True)
+        expected_version = changes.pop("version", None)
+        # Only update non-None values
+        changes = {key: value for key, value in changes.items() if value is not None}
+
+        where = models.UserPersonalInfo.personal_info_id == personal_info_id
+        db_user = await update_returning(db, models.UserPersonalInfo, where, changes, expected_version)
+        if db_user is None:
+            raise await missing_or_stale(
+                db, models.UserPersonalInfo, where, expected_version, "Personal information not found"
             )
-        except Exception as e:
+
+        await db.commit()
+        await logger.info("Updated user personal info without department", {
+            "personal_info_id": personal_info_id
+        })
+        return db_user
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error = unique_conflict(e, _UNIQUE_MESSAGES)
+        if error is None:
             await logger.error("Update user personal info without department failed", error=e)
-            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                detail="Database operation failed"
             )
+        raise error
+    except Exception as e:
+        await logger.error("Update user personal info without department failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
 async def update_user_personal_info_photo(
     db: AsyncSession, personal_info_id: str, photo_data: schemas.UserInfoPhotoUpdate
 ):
-    async with DistributedLock(f"personal_info:{personal_info_id}"):
-        try:
-            db_user = await get_user_personal_info_by_id(db, personal_info_id)
-            db_user.photo_url = photo_data.photo_url
-
-            await db.commit()
-            await db.refresh(db_user)
-            await logger.info("Updated user profile photo", {
-                "personal_info_id": personal_info_id
-            })
-            return db_user
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Update user profile photo failed", error=e)
-            await db.rollback()
+    try:
+        db_user = await update_returning(
+            db,
+            models.UserPersonalInfo,
+            models.UserPersonalInfo.personal_info_id == personal_info_id,
+            {"photo_url": photo_data.photo_url},
+        )
+        if db_user is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Personal information not found",
             )
 
+        await db.commit()
+        await logger.info("Updated user profile photo", {
+            "personal_info_id": personal_info_id
+        })
+        return db_user
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Update user profile photo failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
 
 async def delete_user_personal_info(db: AsyncSession, personal_info_id: str):
-    async with DistributedLock(f"personal_info:{personal_info_id}"):
-        try:
-            db_user = await get_user_personal_info_by_id(db, personal_info_id)
-            await db.delete(db_user)
-            await db.commit()
-            await logger.info("Deleted user personal info", {
-                "personal_info_id": personal_info_id
-            })
-            return {"message": "Personal info deleted successfully"}
-        except HTTPException:
-            await db.rollback()
-            raise
-        except DatabaseOperationError:
-            await db.rollback()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Database operation failed"
-            )
-        except Exception as e:
-            await logger.error("Delete user personal info failed", error=e)
-            await db.rollback()
+    try:
+        deleted_user_id = await delete_returning(
+            db,
+            models.UserPersonalInfo,
+            models.UserPersonalInfo.personal_info_id == personal_info_id,
+            models.UserPersonalInfo.user_id,
+        )
+        if deleted_user_id is None:
+            await logger.warning("Personal info not found", {"personal_info_id": personal_info_id})
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Personal information not found",
             )
+        await db.commit()
+        await invalidate_manager_scope(user_id=deleted_user_id)
+        await logger.info("Deleted user personal info", {
+            "personal_info_id": personal_info_id
+        })
+        return {"message": "Personal info deleted successfully"}
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await logger.error("Delete user personal info failed", error=e)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
 
 
-async def get_all_user_personal_info(db: AsyncSession, skip: int = 0, limit: int = 200):
+async def get_all_user_personal_info(
+    db: AsyncSession, skip: int = 0, limit: int = 200, cursor: Optional[str] = None
+):
     try:
+        if cursor is not None:
+            items, next_cursor = await paginate(
+                db, select(models.UserPersonalInfo), [models.UserPersonalInfo.personal_info_id], cursor, limit
+            )
+            await logger.info("Retrieved user personal info page", {"count": len(items), "limit": limit}, hot_path=True)
+            return {"items": items, "next_cursor": next_cursor}
+
         result = await db.execute(
             select(models.UserPersonalInfo)
-            .order_by(cast(models.UserPersonalInfo.user_id, Integer))
+            .order_by(models.UserPersonalInfo.user_id)
             .offset(skip)
             .limit(limit)
         )
         personal_infos = result.scalars().all()
         await logger.info("Retrieved all user personal info", {
             "count": len(personal_infos)
-        })
+        }, hot_path=True)
         return personal_infos if personal_infos else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all user personal info failed", error=e)
         raise HTTPException(
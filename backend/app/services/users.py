@@ -3,21 +3,23 @@ from ..configs.database import get_db
 from ..models import users as models
 from ..schemas import users as schemas
 from fastapi import HTTPException, status, Depends
-from sqlalchemy import select, and_, func, text, delete, update
+from sqlalchemy import select, and_, func
 from ..utils import crypto, jwt
 from ..services import authentication
 from typing import Optional, List
 from ..utils.logger import logger
+from .pagination import paginate
+from .repository import delete_returning, insert_returning, update_returning
+from ..utils.principal_cache import invalidate_principal
+from ..utils.manager_scope import invalidate_manager_scope
 
 class DatabaseOperationError(Exception):
     pass
 
 async def create_user(db: AsyncSession, user: schemas.UserCreate):
     try:
-        db_user = models.Users(**user.dict())
-        db.add(db_user)
+        db_user = await insert_returning(db, models.Users, user.dict())
         await db.commit()
-        await db.refresh(db_user)
         await logger.info("Created user", {
             "user_id": db_user.user_id,
             "username": user.username,
@@ -34,7 +36,7 @@ async def get_user_by_id(db: AsyncSession, user_id: str):
         result = await db.execute(select(models.Users).filter_by(user_id=user_id))
         user = result.scalar_one_or_none()
         if user:
-            await logger.info("Retrieved user by id", {"user_id": user_id})
+            await logger.info("Retrieved user by id", {"user_id": user_id}, hot_path=True)
         else:
             await logger.warning("User not found", {"user_id": user_id})
         return user
@@ -47,14 +49,6 @@ async def get_user_by_id(db: AsyncSession, user_id: str):
 
 async def update_user(db: AsyncSession, user_id: str, user_update: schemas.UserUpdate):
     try:
-        # Check if user exists
-        existing_user = await get_user_by_id(db, user_id)
-        if not existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-
         # Initialize update data dictionary
         update_data = {}
 
@@ -86,7 +80,7 @@ async def update_user(db: AsyncSession, user_id: str, user_update: schemas.UserU
             #         status_code=status.HTTP_400_BAD_REQUEST,
             #         detail="Password must be at least 6 characters long"
             #     )
-            update_data["password"] = crypto.hash_password(user_update.password)
+            update_data["password"] = await crypto.hash_password_async(user_update.password)
 
         # Role and status update
         if user_update.role is not None:
@@ -94,19 +88,23 @@ async def update_user(db: AsyncSession, user_id: str, user_update: schemas.UserU
         if user_update.status is not None:
             update_data["status"] = user_update.status
 
-        # Only update if there are changes
+        # Only update if there are changes; otherwise just confirm the user exists
         if update_data:
-            stmt = (
-                update(models.Users)
-                .where(models.Users.user_id == user_id)
-                .values(**update_data)
+            existing_user = await update_returning(
+                db, models.Users, models.Users.user_id == user_id, update_data
+            )
+        else:
+            existing_user = await get_user_by_id(db, user_id)
+        if not existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
             )
-            await db.execute(stmt)
+
+        if update_data:
             await db.commit()
-            
-            # Refresh user data
-            await db.refresh(existing_user)
-            
+            await invalidate_principal(user_id)
+
             # Log the update, excluding password from logs
             log_data = {k: v for k, v in update_data.items() if k != "password"}
             await logger.info("Updated user", {
@@ -139,30 +137,44 @@ async def change_own_password(
     current_password: str, 
     new_password: str
 ):
+    user_id = user.user_id
     try:
+        # The authenticated principal may be a cached snapshot without the password hash
+        user = await get_user_by_id(db, user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
         # Verify current password
-        if not crypto.verify_password(current_password, user.password):
-            await logger.warning("Invalid current password", {"user_id": user.user_id})
+        if not await crypto.verify_password_async(current_password, user.password):
+            await logger.warning("Invalid current password", {"user_id": user_id})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Current password is incorrect"
             )
         
         # Hash and update new password
-        hashed_password = crypto.hash_password(new_password)
-        stmt = (
-            update(models.Users)
-            .where(models.Users.user_id == user.user_id)
-            .values(password=hashed_password)
+        hashed_password = await crypto.hash_password_async(new_password)
+        user = await update_returning(
+            db, models.Users, models.Users.user_id == user_id, {"password": hashed_password}
         )
-        await db.execute(stmt)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
         await db.commit()
-        await db.refresh(user)
-        await logger.info("Changed own password", {"user_id": user.user_id})
+        await invalidate_principal(user_id)
+        await logger.info("Changed own password", {"user_id": user_id})
         
         return user
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        await logger.error("Change password failed", {"user_id": user.user_id, "error": str(e)})
+        await logger.error("Change password failed", {"user_id": user_id, "error": str(e)})
         await db.rollback()
         raise
 
@@ -172,18 +184,18 @@ async def admin_change_password(
     new_password: str
 ):
     try:
-        user = await get_user_by_id(db, user_id)
-        
         # Hash and update password
-        hashed_password = crypto.hash_password(new_password)
-        stmt = (
-            update(models.Users)
-            .where(models.Users.user_id == user_id)
-            .values(password=hashed_password)
+        hashed_password = await crypto.hash_password_async(new_password)
+        user = await update_returning(
+            db, models.Users, models.Users.user_id == user_id, {"password": hashed_password}
         )
-        await db.execute(stmt)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
         await db.commit()
-        await db.refresh(user)
+        await invalidate_principal(user_id)
         await logger.info("Admin changed user password", {"user_id": user_id})
         
         return user
@@ -194,12 +206,15 @@ async def admin_change_password(
 
 async def delete_user(db: AsyncSession, user_id: str):
     try:
-        await get_user_by_id(db, user_id)
-        
-        
-        stmt = delete(models.Users).where(models.Users.user_id == user_id)
-        result = await db.execute(stmt)
+        deleted = await delete_returning(db, models.Users, models.Users.user_id == user_id, models.Users.user_id)
+        if deleted is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
         await db.commit()
+        await invalidate_principal(user_id)
+        await invalidate_manager_scope(user_id=user_id)
         await logger.info("Deleted user", {"user_id": user_id})
         
         return {"detail": "User deleted successfully"}
@@ -214,7 +229,8 @@ async def get_all_users(
     skip: int = 0, 
     limit: int = 10, 
     role: Optional[models.RoleEnum] = None, 
-    status: Optional[models.StatusEnum] = None
+    status: Optional[models.StatusEnum] = None,
+    cursor: Optional[str] = None
 ) -> List[models.Users]:
     try:
         # Create base query
@@ -225,9 +241,14 @@ async def get_all_users(
         
         if status is not None:
             query = query.filter(models.Users.status == status)
+
+        if cursor is not None:
+            items, next_cursor = await paginate(db, query, [models.Users.user_id], cursor, limit)
+            await logger.info("Retrieved users page", {"count": len(items), "limit": limit}, hot_path=True)
+            return {"items": items, "next_cursor": next_cursor}
         
         # Add ordering by user_id as integer
-        query = query.order_by(text("CAST(user_id AS INTEGER)"))
+        query = query.order_by(models.Users.user_id)
         
         query = query.offset(skip).limit(limit)
         
@@ -240,9 +261,11 @@ async def get_all_users(
             "limit": limit,
             "role": str(role) if role else None,
             "status": str(status) if status else None
-        })
+        }, hot_path=True)
         
         return users if users else []
+    except HTTPException:
+        raise
     except Exception as e:
         await logger.error("Get all users failed", error=e)
         raise HTTPException(
@@ -1,43 +1,111 @@
-import cloudinary.uploader
-from fastapi import UploadFile, HTTPException, status
+import asyncio
+import io
+import os
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import UploadFile, HTTPException, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+from .storage import storage
+
+PHOTO_MAX_BYTES = int(os.getenv("PHOTO_MAX_BYTES", 5 * 1024 * 1024))
+# Longest side after downscaling; smaller images are only re-encoded
+PHOTO_MAX_DIMENSION = int(os.getenv("PHOTO_MAX_DIMENSION", 1024))
+PHOTO_JPEG_QUALITY = int(os.getenv("PHOTO_JPEG_QUALITY", 85))
+# Pillow releases the GIL while decoding and resampling, like bcrypt in crypto.py
+PHOTO_POOL_WORKERS = int(os.getenv("PHOTO_POOL_WORKERS", 2))
+PHOTO_FOLDER = "hrms/profile_photos"
+
+CHUNK_SIZE = 64 * 1024
+# Uploads above this size spill from memory to a temporary file on disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# Leading bytes of each accepted format -> (Pillow format, stored extension)
+_SIGNATURES = {
+    b"\xff\xd8\xff": ("JPEG", "jpg"),
+    b"\x89PNG\r\n\x1a\n": ("PNG", "png"),
+}
+
+_executor = ThreadPoolExecutor(max_workers=PHOTO_POOL_WORKERS, thread_name_prefix="photo")
+_processed = 0
+_rejected = 0
+
+def _bad_request(detail: str) -> HTTPException:
+    global _rejected
+    _rejected += 1
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+def _sniff(head: bytes):
+    for signature, kind in _SIGNATURES.items():
+        if head.startswith(signature):
+            return kind
+    return None
+
+async def _spool(file: UploadFile):
+    """Copy the upload in chunks, checking its type on the first chunk and its size on every one."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    kind = None
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            if kind is None:
+                kind = _sniff(chunk)
+                if kind is None:
+                    raise _bad_request("File type not allowed. Please upload JPEG or PNG images only.")
+            size += len(chunk)
+            if size > PHOTO_MAX_BYTES:
+                raise _bad_request(f"File size too large. Maximum size is {PHOTO_MAX_BYTES // (1024 * 1024)}MB.")
+            # Past SPOOL_MEMORY_BYTES this write rolls the spool over or appends to disk
+            if size > SPOOL_MEMORY_BYTES:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                spool.write(chunk)
+        if kind is None:
+            raise _bad_request("Empty file")
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, kind
+
+def _downscale(source, image_format: str) -> bytes:
+    with Image.open(source, formats=[image_format]) as image:
+        if image_format == "JPEG":
+            # Let the decoder skip detail it would throw away (DCT scaling)
+            image.draft("RGB", (PHOTO_MAX_DIMENSION, PHOTO_MAX_DIMENSION))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((PHOTO_MAX_DIMENSION, PHOTO_MAX_DIMENSION))
+        output = io.BytesIO()
+        if image_format == "JPEG":
+            image.convert("RGB").save(output, "JPEG", quality=PHOTO_JPEG_QUALITY, optimize=True)
+        else:
+            image.save(output, "PNG", optimize=True)
+        return output.getvalue()
 
 async def upload_photo(file: UploadFile) -> str:
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/jpg"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File type not allowed. Please upload JPEG or PNG images only."
-        )
-    
+    global _processed
+    spool, (image_format, extension) = await _spool(file)
     try:
-        # Read file content
-        file_content = await file.read()
-        if len(file_content) > 5 * 1024 * 1024:  # 5MB limit
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File size too large. Maximum size is 5MB."
-            )
-
-        # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            file_content,
-            folder="hrms/profile_photos",
-            allowed_formats=["jpg", "png", "jpeg"],
-            resource_type="image"
-        )
-        
-        return upload_result["secure_url"]
-    except cloudinary.exceptions.Error as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Cloudinary upload failed: {str(e)}"
-        )
+        data = await asyncio.get_running_loop().run_in_executor(_executor, _downscale, spool, image_format)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        raise _bad_request("The file is not a valid JPEG or PNG image.")
+    finally:
+        spool.close()
+    _processed += 1
+
+    try:
+        return await storage.save(data, PHOTO_FOLDER, uuid.uuid4().hex, extension)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Upload failed: {str(e)}"
         )
-    finally:
-        await file.seek(0)  # Reset file pointer
+
+def get_photo_pipeline_status() -> dict:
+    return {
+        "workers": PHOTO_POOL_WORKERS,
+        "max_dimension": PHOTO_MAX_DIMENSION,
+        "processed": _processed,
+        "rejected": _rejected,
+        "storage": storage.get_stats(),
+    }
@@ -1,9 +1,76 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"])
 
+# bcrypt releases the GIL, so a thread pool gives real parallelism off the event loop
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 2))
+# Maximum hashes running or waiting before new requests are rejected
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", HASH_POOL_WORKERS * 8))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+_in_flight = 0
+_completed = 0
+_rejected = 0
+
+class HashPoolSaturatedError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
 def hash_password(password: str):
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+async def _run_in_pool(func, *args):
+    global _in_flight, _completed, _rejected
+    if _in_flight >= HASH_QUEUE_LIMIT:
+        _rejected += 1
+        raise HashPoolSaturatedError()
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _in_flight -= 1
+        _completed += 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """Hash a batch (bulk import) one pool-width at a time.
+
+    Waits instead of counting against HASH_QUEUE_LIMIT, and since the pool
+    queue is FIFO an interactive login waits for at most one slice.
+    """
+    global _completed
+    loop = asyncio.get_running_loop()
+    hashed = []
+    for start in range(0, len(passwords), HASH_POOL_WORKERS):
+        batch = passwords[start:start + HASH_POOL_WORKERS]
+        hashed.extend(await asyncio.gather(
+            *(loop.run_in_executor(_executor, hash_password, password) for password in batch)
+        ))
+        _completed += len(batch)
+    return hashed
+
+def get_hash_pool_status() -> dict:
+    return {
+        "workers": HASH_POOL_WORKERS,
+        "queue_limit": HASH_QUEUE_LIMIT,
+        "in_flight": _in_flight,
+        "completed": _completed,
+        "rejected": _rejected,
+    }
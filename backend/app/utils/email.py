@@ -1,15 +1,245 @@
+import asyncio
+import json
 import os
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from dotenv import load_dotenv
-from typing import List
+import random
+import time
+import uuid
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional
+import aiosmtplib
 from ..configs.email import config
+from ..configs.redis import redis_client
+from ..utils.logger import logger
+
+# outbox: send_mail queues the message in Redis and returns | direct: send inline
+EMAIL_DELIVERY_MODE = os.getenv("EMAIL_DELIVERY_MODE", "outbox")
+EMAIL_SMTP_CONNECTIONS = int(os.getenv("EMAIL_SMTP_CONNECTIONS", 2))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", 2))
+# Servers drop idle sessions; close ours first instead of failing the next send
+EMAIL_SMTP_IDLE_TIMEOUT = float(os.getenv("EMAIL_SMTP_IDLE_TIMEOUT", 60))
+# Dead letters hold whole messages, OTP codes included: keep only the newest
+# EMAIL_DEAD_LETTER_MAX, and drop the list once none was added for the TTL
+EMAIL_DEAD_LETTER_MAX = int(os.getenv("EMAIL_DEAD_LETTER_MAX", 1000))
+EMAIL_DEAD_LETTER_TTL = int(os.getenv("EMAIL_DEAD_LETTER_TTL", 24 * 3600))
+
+OUTBOX_KEY = "email:outbox"            # LIST of queued messages (JSON)
+RETRY_KEY = "email:outbox:retry"       # ZSET message -> due time (epoch seconds)
+DEAD_KEY = "email:outbox:dead"         # LIST of messages that ran out of attempts
+
+# Move retries that are due back onto the outbox
+_PROMOTE_DUE = """
+local due = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+for _, item in ipairs(due) do
+    redis.call("ZREM", KEYS[1], item)
+    redis.call("RPUSH", KEYS[2], item)
+end
+return #due
+"""
+
+def _build_message(item: dict) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = item["subject"]
+    message["From"] = formataddr((config.MAIL_FROM_NAME, config.MAIL_FROM)) if config.MAIL_FROM_NAME else config.MAIL_FROM
+    message["To"] = ", ".join(item["recipients"])
+    message.set_content(item["body"], subtype="html")
+    return message
+
+class SMTPConnection:
+    """One persistent SMTP session, opened on first use and reopened when dropped."""
+
+    def __init__(self):
+        self.client: Optional[aiosmtplib.SMTP] = None
+        self.last_used = 0.0
+        self.opened = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    async def _open(self):
+        client = aiosmtplib.SMTP(
+            hostname=config.MAIL_SERVER,
+            port=config.MAIL_PORT,
+            use_tls=config.MAIL_SSL_TLS,
+            start_tls=config.MAIL_STARTTLS,
+            validate_certs=config.VALIDATE_CERTS,
+            timeout=config.TIMEOUT,
+        )
+        await client.connect()
+        if config.USE_CREDENTIALS:
+            await client.login(config.MAIL_USERNAME, config.MAIL_PASSWORD.get_secret_value())
+        self.client = client
+        self.opened += 1
+
+    async def send(self, message: EmailMessage):
+        async with self._lock:
+            if self.is_open and time.monotonic() - self.last_used > EMAIL_SMTP_IDLE_TIMEOUT:
+                await self._close()
+            if not self.is_open:
+                await self._open()
+            try:
+                await self.client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server closed the session between messages; one fresh attempt
+                await self._close()
+                await self._open()
+                await self.client.send_message(message)
+            self.last_used = time.monotonic()
+
+    async def close(self):
+        async with self._lock:
+            await self._close()
+
+    async def _close(self):
+        client, self.client = self.client, None
+        if client is None or not client.is_connected:
+            return
+        try:
+            await client.quit()
+        except Exception:
+            client.close()
+
+class EmailOutbox:
+    """Redis-backed mail queue drained by workers that each hold one SMTP connection.
+
+    Failed messages are retried with exponential backoff through RETRY_KEY and
+    parked on DEAD_KEY after EMAIL_MAX_ATTEMPTS, which is capped and expires.
+    """
+
+    def __init__(self, connections: int, batch_size: int, max_attempts: int, retry_base: float):
+        self.connections = [SMTPConnection() for _ in range(max(1, connections))]
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def enqueue(self, subject: str, recipients: List[str], body: str):
+        item = {
+            "id": uuid.uuid4().hex,
+            "subject": subject,
+            "recipients": list(recipients),
+            "body": body,
+            "attempts": 0,
+        }
+        await redis_client.rpush(OUTBOX_KEY, json.dumps(item))
+        self.enqueued += 1
+
+    async def _take(self) -> list:
+        popped = await redis_client.blpop(OUTBOX_KEY, timeout=1)
+        if popped is None:
+            return []
+        batch = [popped[1]]
+        if self.batch_size > 1:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.lrange(OUTBOX_KEY, 0, self.batch_size - 2)
+                pipe.ltrim(OUTBOX_KEY, self.batch_size - 1, -1)
+                rest, _ = await pipe.execute()
+            batch.extend(rest)
+        return batch
+
+    async def _deliver(self, connection: SMTPConnection, raw: str):
+        item = json.loads(raw)
+        try:
+            await connection.send(_build_message(item))
+            self.sent += 1
+            return
+        except Exception as e:
+            error = e
+            await connection.close()
+
+        item["attempts"] += 1
+        # Recipients are addresses; the id is enough to find the message
+        data = {"id": item["id"], "attempts": item["attempts"]}
+        if item["attempts"] >= self.max_attempts:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.rpush(DEAD_KEY, json.dumps(item))
+                pipe.ltrim(DEAD_KEY, -EMAIL_DEAD_LETTER_MAX, -1)
+                pipe.expire(DEAD_KEY, EMAIL_DEAD_LETTER_TTL)
+                await pipe.execute()
+            self.dead += 1
+            await logger.error("Email dropped after retries", error=error, data=data)
+            return
+        delay = self.retry_base * 2 ** (item["attempts"] - 1) * random.uniform(0.8, 1.2)
+        await redis_client.zadd(RETRY_KEY, {json.dumps(item): time.time() + delay})
+        self.retried += 1
+        await logger.warning("Email send failed, retrying", {**data, "delay": round(delay, 1), "error": str(error)})
+
+    async def _worker(self, connection: SMTPConnection):
+        batch = []
+        try:
+            while True:
+                try:
+                    if not batch:
+                        batch = await self._take()
+                    if not batch:
+                        if connection.is_open and time.monotonic() - connection.last_used > EMAIL_SMTP_IDLE_TIMEOUT:
+                            await connection.close()
+                        continue
+                    while batch:
+                        await self._deliver(connection, batch[0])
+                        batch.pop(0)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    await logger.error("Email outbox worker failed", error=e)
+                    await asyncio.sleep(1)
+        finally:
+            # Hand unsent messages back so the next worker picks them up
+            if batch:
+                try:
+                    await redis_client.lpush(OUTBOX_KEY, *reversed(batch))
+                except Exception as e:
+                    await logger.error("Requeue unsent email failed", error=e, data={"messages": len(batch)})
+            await connection.close()
+
+    async def run(self):
+        workers = [asyncio.create_task(self._worker(c)) for c in self.connections]
+        try:
+            while True:
+                await asyncio.sleep(1)
+                try:
+                    await redis_client.eval(_PROMOTE_DUE, 2, RETRY_KEY, OUTBOX_KEY, time.time(), 100)
+                except Exception as e:
+                    await logger.error("Promote email retries failed", error=e)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def get_stats(self) -> dict:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.llen(OUTBOX_KEY)
+            pipe.zcard(RETRY_KEY)
+            pipe.llen(DEAD_KEY)
+            queued, retrying, dead_letters = await pipe.execute()
+        return {
+            "mode": EMAIL_DELIVERY_MODE,
+            "connections": len(self.connections),
+            "open_connections": sum(c.is_open for c in self.connections),
+            "connects": sum(c.opened for c in self.connections),
+            "queued": queued,
+            "retrying": retrying,
+            "dead_letters": dead_letters,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+email_outbox = EmailOutbox(
+    EMAIL_SMTP_CONNECTIONS, EMAIL_BATCH_SIZE, EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_BASE_SECONDS
+)
 
 async def send_mail(subject: str, recipient: List[str], message: str):
-    message = MessageSchema(
-        subject = subject,
-        recipients = recipient,
-        body = message,
-        subtype = "html"
-    )
-    fm = FastMail(config)
-    await fm.send_message(message)
\ No newline at end of file
+    if EMAIL_DELIVERY_MODE == "outbox":
+        await email_outbox.enqueue(subject, recipient, message)
+        return
+    item = {"subject": subject, "recipients": list(recipient), "body": message}
+    await email_outbox.connections[0].send(_build_message(item))
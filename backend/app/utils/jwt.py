@@ -7,6 +7,8 @@ from ..models import users as models_user
 from ..configs.database import get_db, AsyncSession
 import os
 from..configs.redis import redis_client
+from .principal_cache import principal_cache
+from .rate_limit import limiter
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -149,12 +151,63 @@ async def get_token(authorization: str = Header(None)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(token: str = Depends(get_token), db: AsyncSession = Depends(get_db)):
+async def get_current_user(request: Request, authorization: str = Header(None), db: AsyncSession = Depends(get_db)):
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No authorization header",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     try:
-        # Decode the token to get the username
-        user_id = await decode_access_token(token)
-        # username = payload.get("sub")
-        
+        scheme, token = authorization.split()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization header format",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if scheme.lower() != "bearer":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication scheme",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Cached principal: no JWT decode, Redis or database round trip
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        request.state.rate_limit_user = cached_user.user_id
+        return cached_user
+
+    try:
+        # Decode the token once; the claims are kept with the cached principal
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        # Token must still be stored in Redis (removed on logout); the
+        # endpoint's rate limit is checked in the same round trip
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(user_id)
+            limit = limiter.check_in_pipeline(pipe, request, user_id)
+            redis_token, *limit_result = await pipe.execute(raise_on_error=False)
+        if isinstance(redis_token, Exception):
+            raise redis_token
+        if not redis_token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token not found or expired",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        limiter.finish(request, limit, limit_result[0] if limit_result else None)
+
         # Find user in database
         stmt = select(models_user.Users).where(models_user.Users.user_id == user_id)
         result = await db.execute(stmt)
@@ -166,11 +219,18 @@ async def get_current_user(token: str = Depends(get_token), db: AsyncSession = D
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
+
+        principal_cache.set(token, payload, user)
         return user
     
     except HTTPException as e:
         raise e
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
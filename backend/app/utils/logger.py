@@ -1,55 +1,202 @@
 import os
-import asyncio
-from datetime import datetime
+import json
+import random
+import time
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+# Set per request by the request-id middleware in main.py
+request_id_var: ContextVar[str] = ContextVar("request_id", default=None)
+
+# Keys whose values never reach the log file, at any depth of ``data``;
+# LOG_REDACTED_FIELDS replaces the list, e.g. "username,email,phone"
+DEFAULT_REDACTED_FIELDS = (
+    "username,email,contact_email,phone,fullname,role,password,citizen_card,address,"
+    "accountName,accountNumber,iban,access_token,refresh_token,token"
+)
+REDACTED_FIELDS = frozenset(
+    name.strip() for name in (os.getenv("LOG_REDACTED_FIELDS") or DEFAULT_REDACTED_FIELDS).split(",") if name.strip()
+)
+REDACTED = "[redacted]"
+
+def redact(data):
+    """A copy of ``data`` with the values of REDACTED_FIELDS keys replaced."""
+    if isinstance(data, dict):
+        return {key: REDACTED if key in REDACTED_FIELDS else redact(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [redact(value) for value in data]
+    return data
+
+class RingBufferQueue(queue.Queue):
+    """Unbounded-put queue backed by a fixed-size ring buffer.
+
+    put() never blocks: when the buffer is full the oldest record is dropped
+    and counted, so logging can never stall the event loop.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.overflow = 0
+        super().__init__()
+
+    def _init(self, maxsize):
+        self.queue = deque(maxlen=self.capacity)
+
+    def _put(self, item):
+        if len(self.queue) == self.capacity:
+            self.overflow += 1
+        self.queue.append(item)
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        data = getattr(record, "data", None)
+        if data is not None:
+            # Redacted here, on the listener thread, rather than in the request
+            entry["data"] = redact(data)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that writes a batch of records with a single flush."""
+
+    def emit_batch(self, records):
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            for record in records:
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    self.stream.write(self.format(record) + self.terminator)
+                except Exception:
+                    self.handleError(record)
+            self.stream.flush()
+        finally:
+            self.release()
+
+class BatchQueueListener(QueueListener):
+    """Queue listener that drains up to ``batch_size`` records per write."""
+
+    def __init__(self, queue, handler: BatchRotatingFileHandler, batch_size: int = 100):
+        super().__init__(queue, handler, respect_handler_level=False)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        handler = self.handlers[0]
+        while True:
+            try:
+                record = q.get(block=True)
+            except queue.Empty:
+                continue
+            batch = []
+            stop = record is self._sentinel
+            if not stop:
+                batch.append(record)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    batch.append(record)
+            if batch:
+                handler.emit_batch(batch)
+            if stop:
+                break
 
 class AsyncLogger:
-    def __init__(self, 
+    def __init__(self,
                  log_file: str = "logs/app.log",
                  max_file_size: int = 5 * 1024 * 1024,
-                 backup_count: int = 3):
+                 backup_count: int = 3,
+                 buffer_size: int = int(os.getenv("LOG_BUFFER_SIZE", 10000)),
+                 batch_size: int = int(os.getenv("LOG_BATCH_SIZE", 100)),
+                 info_sample_rate: float = float(os.getenv("LOG_INFO_SAMPLE_RATE", 1.0)),
+                 info_rate_limit: int = int(os.getenv("LOG_INFO_RATE_LIMIT_PER_SECOND", 0)),
+                 hot_path_sample_rate: float = float(os.getenv("LOG_HOT_PATH_SAMPLE_RATE", 1.0))):
         self.logger = logging.getLogger('AsyncLogger')
         self.logger.setLevel(logging.INFO)
-        
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
+
         # Ensure log directory exists
         log_dir = os.path.dirname(log_file)
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
-            
-        # Setup RotatingFileHandler
-        handler = RotatingFileHandler(
+
+        # Setup RotatingFileHandler, drained by a background listener thread
+        handler = BatchRotatingFileHandler(
             log_file,
             maxBytes=max_file_size,
             backupCount=backup_count,
             encoding='utf-8'
         )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        handler.setFormatter(JsonFormatter())
+
+        self.buffer = RingBufferQueue(buffer_size)
+        self.logger.addHandler(QueueHandler(self.buffer))
+        self.listener = BatchQueueListener(self.buffer, handler, batch_size=batch_size)
+        self.listener.start()
+        atexit.register(self.close)
+
+        # INFO sampling (0..1) and per-message rate limiting (0 = unlimited)
+        self.info_sample_rate = info_sample_rate
+        self.hot_path_sample_rate = hot_path_sample_rate
+        self.info_rate_limit = info_rate_limit
+        self._rate_window = {}
+        self._rate_second = None
+        self.emitted = 0
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def _allow_info(self, message: str, hot_path: bool = False) -> bool:
+        rate = self.hot_path_sample_rate if hot_path else self.info_sample_rate
+        if rate < 1.0 and random.random() >= rate:
+            self.sampled_out += 1
+            return False
+        if self.info_rate_limit > 0:
+            second = int(time.monotonic())
+            if second != self._rate_second:
+                # Counts only cover the current second; dropping the expired
+                # ones keeps the map as small as one second's messages
+                self._rate_second = second
+                self._rate_window.clear()
+            count = self._rate_window.get(message, 0)
+            if count >= self.info_rate_limit:
+                self.rate_limited += 1
+                return False
+            self._rate_window[message] = count + 1
+        return True
 
     async def log(self, level: str, message: str, data: any = None):
-        log_message = message
-        if data:
-            if isinstance(data, dict):
-                essential_data = {k: v for k, v in data.items() if k in ['holiday_id', 'status_code', 'error']}
-                if essential_data:
-                    log_message = f"{message} - Data: {essential_data}"
-            else:
-                log_message = f"{message} - Data: {str(data)}"
+        extra = {"request_id": request_id_var.get()}
+        if data is not None:
+            extra["data"] = data if isinstance(data, dict) else str(data)
 
         if level == "INFO":
-            self.logger.info(log_message)
+            self.logger.info(message, extra=extra)
         elif level == "ERROR":
-            self.logger.error(log_message)
+            self.logger.error(message, extra=extra)
         elif level == "WARNING":
-            self.logger.warning(log_message)
+            self.logger.warning(message, extra=extra)
+        self.emitted += 1
 
-    async def info(self, message: str, data: any = None):
+    async def info(self, message: str, data: any = None, hot_path: bool = False):
+        # hot_path=True applies LOG_HOT_PATH_SAMPLE_RATE to frequent read logs
+        if not self._allow_info(message, hot_path):
+            return
         await self.log("INFO", message, data)
 
     async def error(self, message: str, error: Exception = None, data: any = None):
@@ -59,5 +206,20 @@ class AsyncLogger:
     async def warning(self, message: str, data: any = None):
         await self.log("WARNING", message, data)
 
+    def close(self):
+        # Flush whatever is still buffered; safe to call more than once
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def get_stats(self) -> dict:
+        return {
+            "buffer_capacity": self.buffer.capacity,
+            "buffered": self.buffer.qsize(),
+            "overflow_dropped": self.buffer.overflow,
+            "emitted": self.emitted,
+            "sampled_out": self.sampled_out,
+            "rate_limited": self.rate_limited,
+        }
+
 # Create singleton instance
 logger = AsyncLogger()
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Optional
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..configs.database import get_db
+from ..configs.redis import redis_client
+from ..models import department as models_department
+from ..models import userPersonalInfo as models_user_info
+from ..models import users as models_user
+from ..utils import jwt
+from ..utils.logger import logger
+
+MANAGER_SCOPE_CACHE_TTL_SECONDS = float(os.getenv("MANAGER_SCOPE_CACHE_TTL_SECONDS", 60))
+MANAGER_SCOPE_CACHE_MAX_ENTRIES = int(os.getenv("MANAGER_SCOPE_CACHE_MAX_ENTRIES", 1000))
+INVALIDATION_CHANNEL = "auth:manager_scope:invalidate"
+
+class ManagerScope:
+    """The department a manager runs and the ids of its members.
+
+    Department-bound manager routes authorize against this in memory instead
+    of loading the manager's department and the target's personal info.
+    """
+
+    def __init__(self, manager_id: str, department_id: str, member_ids: FrozenSet[str]):
+        self.manager_id = manager_id
+        self.department_id = department_id
+        self.member_ids = member_ids
+
+    def require_member(self, user_id: str):
+        if str(user_id) not in self.member_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: User not in manager's department"
+            )
+
+    def require_department(self, department_id: str):
+        if str(department_id) != self.department_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: Not authorized for this department"
+            )
+
+class ManagerScopeCache:
+    """Per-process cache of manager scopes keyed by manager id.
+
+    Entries are dropped by department or by user when either side of the
+    membership changes, locally and in the other workers via Redis pub/sub.
+    """
+
+    def __init__(self, ttl: float = MANAGER_SCOPE_CACHE_TTL_SECONDS, max_entries: int = MANAGER_SCOPE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped by every invalidation; a scope loaded across one is not stored
+        self.generation = 0
+        # Only cache while the invalidation listener is subscribed
+        self.enabled = False
+
+    def get(self, manager_id: str) -> Optional[ManagerScope]:
+        entry = self._entries.get(manager_id)
+        if entry is None:
+            return None
+        expires_at, scope = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(manager_id, None)
+            return None
+        return scope
+
+    def set(self, scope: ManagerScope, generation: int):
+        if not self.enabled or self.ttl <= 0 or generation != self.generation:
+            return
+        self._entries[scope.manager_id] = (time.monotonic() + self.ttl, scope)
+        self._entries.move_to_end(scope.manager_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_department(self, department_id: str):
+        self.generation += 1
+        department_id = str(department_id)
+        for manager_id, (_, scope) in list(self._entries.items()):
+            if scope.department_id == department_id:
+                self._entries.pop(manager_id, None)
+
+    def invalidate_user(self, user_id: str):
+        self.generation += 1
+        user_id = str(user_id)
+        for manager_id, (_, scope) in list(self._entries.items()):
+            if manager_id == user_id or user_id in scope.member_ids:
+                self._entries.pop(manager_id, None)
+
+    def apply(self, message: str):
+        kind, _, value = message.partition(":")
+        if kind == "department":
+            self.invalidate_department(value)
+        elif kind == "user":
+            self.invalidate_user(value)
+
+    def disable(self):
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+manager_scope_cache = ManagerScopeCache()
+
+async def invalidate_manager_scope(department_id: Optional[str] = None, user_id: Optional[str] = None):
+    """Drop cached scopes of a department and/or containing a user, here and in the other workers."""
+    messages = []
+    if department_id is not None:
+        messages.append(f"department:{department_id}")
+    if user_id is not None:
+        messages.append(f"user:{user_id}")
+    for message in messages:
+        manager_scope_cache.apply(message)
+        try:
+            await redis_client.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            # Other workers fall back to the cache TTL
+            await logger.error("Publish manager scope invalidation failed", {"message": message, "error": str(e)})
+
+async def load_manager_scope(db: AsyncSession, manager_id: str) -> Optional[ManagerScope]:
+    """The manager's department and member ids in one query, or None without a department."""
+    department = models_department.Department
+    info = models_user_info.UserPersonalInfo
+    result = await db.execute(
+        select(department.department_id, info.user_id)
+        .outerjoin(info, info.department_id == department.department_id)
+        .where(department.manager_id == manager_id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    return ManagerScope(
+        manager_id=str(manager_id),
+        department_id=rows[0].department_id,
+        member_ids=frozenset(row.user_id for row in rows if row.user_id is not None),
+    )
+
+async def get_manager_scope(
+    db: AsyncSession = Depends(get_db),
+    current_user: models_user.Users = Depends(jwt.get_current_manager),
+) -> ManagerScope:
+    """Dependency resolving the current manager's scope, from the cache when possible."""
+    scope = manager_scope_cache.get(current_user.user_id)
+    if scope is not None:
+        return scope
+
+    generation = manager_scope_cache.generation
+    scope = await load_manager_scope(db, current_user.user_id)
+    if scope is None:
+        await logger.warning("Department not found for manager", {"manager_id": current_user.user_id})
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Manager has no associated department"
+        )
+    manager_scope_cache.set(scope, generation)
+    return scope
+
+async def listen_manager_scope_invalidations():
+    """Background task applying invalidations published by other workers."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            manager_scope_cache.enabled = True
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    manager_scope_cache.apply(message["data"])
+        except asyncio.CancelledError:
+            manager_scope_cache.disable()
+            raise
+        except Exception as e:
+            # Entries cached now could miss an invalidation, so stop caching until resubscribed
+            manager_scope_cache.disable()
+            await logger.error("Manager scope invalidation listener failed", error=e)
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
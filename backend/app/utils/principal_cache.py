@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+from ..configs.redis import redis_client
+from ..models import users as models_user
+from ..utils.logger import logger
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+INVALIDATION_CHANNEL = "auth:principal:invalidate"
+
+class PrincipalCache:
+    """Short-lived per-process cache of authenticated principals keyed by token hash.
+
+    Entries hold the decoded claims and a detached ``Users`` snapshot (no password),
+    so a hit resolves the auth dependency chain without Redis or database round trips.
+    """
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: dict = {}
+        # Only cache while the invalidation listener is subscribed
+        self.enabled = False
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[models_user.Users]:
+        key = self.token_key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims, user = entry
+        if expires_at <= time.monotonic():
+            self._discard(key, user.user_id)
+            return None
+        return user
+
+    def set(self, token: str, claims: dict, user: models_user.Users):
+        if not self.enabled or self.ttl <= 0:
+            return
+        key = self.token_key(token)
+        expires_at = time.monotonic() + self.ttl
+        # Never keep a principal past the expiry of its token
+        exp = claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, time.monotonic() + (exp - time.time()))
+
+        snapshot = models_user.Users(
+            user_id=user.user_id,
+            username=user.username,
+            role=user.role,
+            status=user.status,
+        )
+        self._entries[key] = (expires_at, claims, snapshot)
+        self._entries.move_to_end(key)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key, (_, _, oldest_user) = self._entries.popitem(last=False)
+            self._forget_user_key(oldest_key, oldest_user.user_id)
+
+    def invalidate_user(self, user_id: str):
+        for key in self._tokens_by_user.pop(str(user_id), set()):
+            self._entries.pop(key, None)
+
+    def disable(self):
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _discard(self, key: str, user_id: str):
+        self._entries.pop(key, None)
+        self._forget_user_key(key, user_id)
+
+    def _forget_user_key(self, key: str, user_id: str):
+        keys = self._tokens_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._tokens_by_user.pop(user_id, None)
+
+principal_cache = PrincipalCache()
+
+async def invalidate_principal(user_id: str):
+    """Drop cached principals for a user in this worker and broadcast to the others."""
+    principal_cache.invalidate_user(user_id)
+    try:
+        await redis_client.publish(INVALIDATION_CHANNEL, str(user_id))
+    except Exception as e:
+        # Other workers fall back to the cache TTL
+        await logger.error("Publish principal invalidation failed", {"user_id": user_id, "error": str(e)})
+
+async def listen_principal_invalidations():
+    """Background task applying invalidations published by other workers."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            principal_cache.enabled = True
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    principal_cache.invalidate_user(message["data"])
+        except asyncio.CancelledError:
+            principal_cache.disable()
+            raise
+        except Exception as e:
+            # Entries cached now could miss an invalidation, so stop caching until resubscribed
+            principal_cache.disable()
+            await logger.error("Principal invalidation listener failed", error=e)
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
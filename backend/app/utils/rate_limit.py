@@ -0,0 +1,162 @@
+import functools
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from ..configs.redis import redis_client
+from ..utils.logger import logger
+
+# Turn limits off entirely, e.g. for load tests against a single user
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+RATE_LIMIT_KEY_PREFIX = "rl"
+
+# GCRA: the key stores the theoretical arrival time (TAT) of the next request.
+# A request is allowed while TAT - now stays within the period, i.e. at most
+# `limit` requests back to back, then one per `period / limit`. The Redis clock
+# is used so every worker agrees on "now".
+# KEYS[1] = bucket, ARGV[1] = emission interval (ms), ARGV[2] = period (ms)
+# Returns {allowed, retry_after_ms}
+_GCRA = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = tonumber(redis.call("GET", KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, new_tat - now - period}
+end
+redis.call("SET", KEYS[1], new_tat, "PX", new_tat - now)
+return {1, 0}
+"""
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+@dataclass(frozen=True)
+class Limit:
+    name: str
+    limit: int
+    period: int
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, self.period * 1000 // self.limit)
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "Limit":
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*", spec)
+        if not match:
+            raise ValueError(f"Invalid rate limit '{spec}'. Expected e.g. '20/minute'")
+        count, multiplier, unit = match.groups()
+        return cls(name, int(count), int(multiplier or 1) * _PERIODS[unit])
+
+class RateLimitExceededError(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+class RateLimiter:
+    """One limiter for every worker, with its state in Redis.
+
+    ``@limiter.limit("20/minute")`` marks an endpoint, which must take a
+    ``request: Request`` parameter. Authenticated requests are counted per
+    user, the rest per client address. When get_current_user has to ask
+    Redis for the session token anyway it queues the limit check in the same
+    pipeline (see check_in_pipeline); only cached principals and anonymous
+    requests pay a separate round trip.
+    """
+
+    def __init__(self, enabled: bool = RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+        self.allowed = 0
+        self.denied = 0
+        self.errors = 0
+        self.denied_by_endpoint = {}
+
+    def limit(self, spec: str):
+        def decorator(func):
+            limit = Limit.parse(f"{func.__module__}.{func.__name__}", spec)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs.get("request")
+                if request is None:
+                    raise RuntimeError(f"{limit.name} needs a 'request: Request' parameter to be rate limited")
+                if not getattr(request.state, "rate_limit_checked", False):
+                    await self.check(request, limit)
+                return await func(*args, **kwargs)
+
+            wrapper.rate_limit = limit
+            return wrapper
+        return decorator
+
+    def limit_for(self, request: Request) -> Optional[Limit]:
+        if not self.enabled:
+            return None
+        return getattr(request.scope.get("endpoint"), "rate_limit", None)
+
+    def _key(self, request: Request, limit: Limit) -> str:
+        user_id = getattr(request.state, "rate_limit_user", None)
+        if user_id is not None:
+            subject = f"u:{user_id}"
+        else:
+            subject = f"ip:{request.client.host if request.client else 'unknown'}"
+        return f"{RATE_LIMIT_KEY_PREFIX}:{limit.name}:{subject}"
+
+    def _queue(self, target, request: Request, limit: Limit):
+        return target.eval(_GCRA, 1, self._key(request, limit), limit.interval_ms, limit.period * 1000)
+
+    def _apply(self, request: Request, limit: Limit, result):
+        request.state.rate_limit_checked = True
+        if isinstance(result, Exception):
+            # Fail open: a Redis problem must not take every endpoint down
+            self.errors += 1
+            return
+        allowed, retry_after_ms = result
+        if allowed:
+            self.allowed += 1
+            return
+        self.denied += 1
+        self.denied_by_endpoint[limit.name] = self.denied_by_endpoint.get(limit.name, 0) + 1
+        raise RateLimitExceededError(int(retry_after_ms) / 1000)
+
+    def check_in_pipeline(self, pipe, request: Request, user_id: str) -> Optional[Limit]:
+        """Queue this request's limit check on ``pipe``; pass the result to finish()."""
+        request.state.rate_limit_user = user_id
+        limit = self.limit_for(request)
+        if limit is not None:
+            self._queue(pipe, request, limit)
+        return limit
+
+    def finish(self, request: Request, limit: Optional[Limit], result):
+        if limit is not None:
+            self._apply(request, limit, result)
+
+    async def check(self, request: Request, limit: Limit):
+        if not self.enabled:
+            return
+        try:
+            result = await self._queue(redis_client, request, limit)
+        except Exception as e:
+            await logger.error("Rate limit check failed", error=e, data={"limit": limit.name})
+            result = e
+        self._apply(request, limit, result)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "errors": self.errors,
+            "denied_by_endpoint": dict(sorted(self.denied_by_endpoint.items(), key=lambda item: -item[1])[:20]),
+        }
+
+limiter = RateLimiter()
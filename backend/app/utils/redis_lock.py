@@ -1,47 +1,214 @@
-from redis.asyncio import Redis
 import asyncio
+import os
+import time
 import uuid
+from typing import Dict, Optional
 from fastapi import HTTPException, status
 from ..configs.redis import redis_client
+from ..utils.logger import logger
 
+# How long __aenter__ waits for a held lock before answering 409
+LOCK_WAIT_TIMEOUT = float(os.getenv("LOCK_WAIT_TIMEOUT", 3))
+
+RELEASE_CHANNEL = "lock:released"   # message = released lock key
+
+# KEYS[1] = lock; ARGV[1] = owner, ARGV[2] = ttl (ms)
+# Returns {1, 0} or {0, ms until the current lease expires}
+_ACQUIRE = """
+if redis.call("SET", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return {1, 0}
+end
+return {0, redis.call("PTTL", KEYS[1])}
+"""
+
+# KEYS[1] = lock; ARGV[1] = owner, ARGV[2] = ttl (ms)
+_RENEW = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] = lock, KEYS[2] = release channel; ARGV[1] = owner
+_RELEASE = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("PUBLISH", KEYS[2], KEYS[1])
+    return 1
+end
+return 0
+"""
+
+class LockStats:
+    def __init__(self):
+        self.acquired = 0
+        self.contended = 0
+        self.timeouts = 0
+        self.lost = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "contended": self.contended,
+            "timeouts": self.timeouts,
+            "lost": self.lost,
+            "avg_wait_ms": round(self.wait_seconds / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+class _LocalQueue:
+    """Waiters for one lock key on this worker.
+
+    Only the head of the asyncio.Lock queue talks to Redis; the others wait
+    in FIFO order, so contention costs one Redis call per release instead
+    of one per waiter.
+    """
+
+    def __init__(self):
+        self.mutex = asyncio.Lock()
+        self.released = asyncio.Event()
+        self.users = 0
+
+_queues: Dict[str, _LocalQueue] = {}
+_stats: Dict[str, LockStats] = {}
+
+def _namespace(lock_key: str) -> str:
+    # "personal_info:12" -> "personal_info", "expense:user:7" -> "expense"
+    return lock_key.split(":", 1)[0]
 
 class DistributedLock:
-    def __init__(self, lock_key: str, expire_time: int = 10):
+    """Redis lease lock with notification-based waiting.
+
+    The lease is renewed every ``expire_time / 2`` seconds while the owner
+    still holds it. A holder that stalls past its lease can overlap with the
+    next one, so the lock only keeps concurrent writers from piling up; the
+    database constraints are what keep the data correct.
+    """
+
+    def __init__(self, lock_key: str, expire_time: int = 10, wait_timeout: float = LOCK_WAIT_TIMEOUT):
         self.lock_key = f"lock:{lock_key}"
         self.expire_time = expire_time
+        self.wait_timeout = wait_timeout
         self.lock_value = str(uuid.uuid4())
+        self.stats = _stats.setdefault(_namespace(lock_key), LockStats())
+        self.lost = False
         self.renew_task = None
-        self.redis_client = None
+        self._queue: Optional[_LocalQueue] = None
+
+    @property
+    def _ttl_ms(self) -> int:
+        return int(self.expire_time * 1000)
 
     async def renew_lock(self):
         while True:
             await asyncio.sleep(self.expire_time * 0.5)
-            await self.redis_client.expire(self.lock_key, self.expire_time)
+            try:
+                renewed = await redis_client.eval(_RENEW, 1, self.lock_key, self.lock_value, self._ttl_ms)
+            except Exception as e:
+                await logger.error("Lock renewal failed", error=e, data={"lock": self.lock_key})
+                continue
+            if not renewed:
+                # The lease expired and someone else may hold the lock now
+                self.lost = True
+                self.stats.lost += 1
+                await logger.warning("Lock lost before release", {"lock": self.lock_key})
+                return
+
+    async def _acquire(self, queue: _LocalQueue):
+        contended = queue.mutex.locked()
+        await queue.mutex.acquire()
+        try:
+            while True:
+                queue.released.clear()
+                acquired, value = await redis_client.eval(
+                    _ACQUIRE, 1, self.lock_key, self.lock_value, self._ttl_ms
+                )
+                if acquired:
+                    break
+                contended = True
+                # Woken by the holder's release, or when its lease would run out
+                lease_ms = int(value)
+                try:
+                    await asyncio.wait_for(queue.released.wait(), lease_ms / 1000 if lease_ms > 0 else 0.05)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            queue.mutex.release()
+            raise
+        if contended:
+            self.stats.contended += 1
 
     async def __aenter__(self):
-        self.redis_client = await redis_client
-        attempts = 3
-        while attempts > 0:
-            if await self.redis_client.set(self.lock_key, self.lock_value, ex=self.expire_time, nx=True):
-                self.renew_task = asyncio.create_task(self.renew_lock())
-                return self
-            attempts -= 1
-            await asyncio.sleep(1)
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Resource is locked. Please try again later."
-        )
+        queue = self._queue = _queues.setdefault(self.lock_key, _LocalQueue())
+        queue.users += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._acquire(queue), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self._leave_queue()
+            self.stats.timeouts += 1
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Resource is locked. Please try again later."
+            )
+        except BaseException:
+            self._leave_queue()
+            raise
+        waited = time.monotonic() - started
+        self.stats.acquired += 1
+        self.stats.wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        self.renew_task = asyncio.create_task(self.renew_lock())
+        return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.renew_task:
             self.renew_task.cancel()
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-        await self.redis_client.eval(lua_script, 1, self.lock_key, self.lock_value)
-        await self.redis_client.close()
+        try:
+            await redis_client.eval(_RELEASE, 2, self.lock_key, RELEASE_CHANNEL, self.lock_value)
+        except Exception as e:
+            # The lease still expires after expire_time
+            await logger.error("Lock release failed", error=e, data={"lock": self.lock_key})
+        finally:
+            self._queue.mutex.release()
+            self._leave_queue()
+
+    def _leave_queue(self):
+        queue = self._queue
+        queue.users -= 1
+        if queue.users == 0 and _queues.get(self.lock_key) is queue:
+            del _queues[self.lock_key]
+
+def _notify_released(lock_key: str):
+    queue = _queues.get(lock_key)
+    if queue is not None:
+        queue.released.set()
+
+async def listen_lock_releases():
+    """Background task waking local waiters when any worker releases a lock."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(RELEASE_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _notify_released(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Waiters still retry when the holder's lease runs out
+            await logger.error("Lock release listener failed", error=e)
+            await asyncio.sleep(1)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
 
+def get_lock_stats() -> dict:
+    return {
+        "waiting_keys": len(_queues),
+        "namespaces": {namespace: stats.as_dict() for namespace, stats in sorted(_stats.items())},
+    }
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from pathlib import Path
+import cloudinary.uploader
+
+# cloudinary | local (files under PHOTO_LOCAL_DIR, for development and tests)
+PHOTO_STORAGE_BACKEND = os.getenv("PHOTO_STORAGE_BACKEND", "cloudinary").strip().lower()
+PHOTO_LOCAL_DIR = os.getenv("PHOTO_LOCAL_DIR", "uploads")
+PHOTO_LOCAL_BASE_URL = os.getenv("PHOTO_LOCAL_BASE_URL", "/uploads")
+# Uploads in flight at once; the rest wait instead of piling threads onto the pool
+PHOTO_UPLOAD_CONCURRENCY = int(os.getenv("PHOTO_UPLOAD_CONCURRENCY", 4))
+
+class StorageBackend:
+    """Stores an object and returns the URL it is served from.
+
+    save() runs the blocking client in a thread, at most ``concurrency`` at a
+    time, so an upload never holds the event loop.
+    """
+
+    name = "base"
+
+    def __init__(self, concurrency: int = PHOTO_UPLOAD_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.stored = 0
+
+    def _save(self, data: bytes, folder: str, name: str, extension: str) -> str:
+        raise NotImplementedError
+
+    async def save(self, data: bytes, folder: str, name: str, extension: str) -> str:
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                url = await asyncio.to_thread(self._save, data, folder, name, extension)
+            finally:
+                self.in_flight -= 1
+        self.stored += 1
+        return url
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "stored": self.stored,
+        }
+
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+
+    def _save(self, data: bytes, folder: str, name: str, extension: str) -> str:
+        result = cloudinary.uploader.upload(
+            data,
+            folder=folder,
+            public_id=name,
+            format=extension,
+            resource_type="image",
+        )
+        return result["secure_url"]
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, directory: str = PHOTO_LOCAL_DIR, base_url: str = PHOTO_LOCAL_BASE_URL, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = Path(directory)
+        self.base_url = base_url.rstrip("/")
+
+    def _save(self, data: bytes, folder: str, name: str, extension: str) -> str:
+        target = self.directory / folder / f"{name}.{extension}"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        return f"{self.base_url}/{folder}/{target.name}"
+
+_BACKENDS = {"cloudinary": CloudinaryStorage, "local": LocalStorage}
+
+if PHOTO_STORAGE_BACKEND not in _BACKENDS:
+    raise ValueError(f"Unknown PHOTO_STORAGE_BACKEND '{PHOTO_STORAGE_BACKEND}'. Expected one of: {', '.join(_BACKENDS)}")
+
+storage = _BACKENDS[PHOTO_STORAGE_BACKEND]()
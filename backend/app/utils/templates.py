@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+# Development only: re-read a template when its file changes on disk
+EMAIL_TEMPLATE_AUTO_RELOAD = os.getenv("EMAIL_TEMPLATE_AUTO_RELOAD", "false").strip().lower() in ("1", "true", "yes", "on")
+
+class TemplateRegistry:
+    """Compiles every template in ``directory`` once and renders them from memory.
+
+    Without auto_reload the compiled templates are never checked against the
+    files again, so rendering does no disk I/O.
+    """
+
+    def __init__(self, directory: Path, auto_reload: bool = False):
+        self.auto_reload = auto_reload
+        self.environment = Environment(
+            loader=FileSystemLoader(str(directory), encoding="utf-8"),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            auto_reload=auto_reload,
+            cache_size=-1,
+        )
+        self.templates = {}
+        self.renders = 0
+        self.load()
+
+    def load(self):
+        self.templates = {name: self.environment.get_template(name) for name in self.environment.list_templates()}
+
+    def get(self, name: str) -> Template:
+        if self.auto_reload or name not in self.templates:
+            # get_template only re-reads the file when its mtime changed
+            self.templates[name] = self.environment.get_template(name)
+        return self.templates[name]
+
+    def render(self, name: str, **context) -> str:
+        self.renders += 1
+        return self.get(name).render(**context)
+
+    def get_stats(self) -> dict:
+        return {
+            "templates": sorted(self.templates),
+            "auto_reload": self.auto_reload,
+            "renders": self.renders,
+        }
+
+email_templates = TemplateRegistry(TEMPLATE_DIR, auto_reload=EMAIL_TEMPLATE_AUTO_RELOAD)
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Dict, Optional, Set
+from fastapi import WebSocket
+from ..configs.redis import redis_client
+from ..utils.logger import logger
+
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 100))
+WS_HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", 25))
+WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", 75))
+# A user stays present this long after the last heartbeat of any worker
+WS_PRESENCE_TTL = float(os.getenv("WS_PRESENCE_TTL", WS_HEARTBEAT_INTERVAL * 3))
+
+FANOUT_CHANNEL = "ws:fanout"
+PRESENCE_KEY = "ws:presence"            # ZSET user_id -> last seen (epoch seconds)
+PRESENCE_CONNECTIONS_KEY = "ws:presence:connections"  # HASH user_id -> open sockets
+
+# Drop the user from the presence set once their last socket on any worker closes
+_RELEASE_PRESENCE = """
+local remaining = redis.call("HINCRBY", KEYS[1], ARGV[1], -1)
+if remaining <= 0 then
+    redis.call("HDEL", KEYS[1], ARGV[1])
+    redis.call("ZREM", KEYS[2], ARGV[1])
+end
+return remaining
+"""
+
+class Connection:
+    """One socket with its own bounded send queue, drained by a writer task."""
+
+    def __init__(self, websocket: WebSocket, user_id: str, queue_size: int = WS_SEND_QUEUE_SIZE):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.last_seen = time.monotonic()
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
+    def enqueue(self, message: str):
+        # A slow client loses its oldest pending messages instead of stalling the sender
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def write_loop(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.websocket.send_text(message)
+                # A delivered frame is liveness too, so listen-only clients need not reply
+                self.last_seen = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone; the receive loop notices and unregisters it
+            pass
+
+class ConnectionManager:
+    """Per-worker registry of sockets with Redis fan-out and presence.
+
+    Messages for a user are delivered to sockets on this worker immediately and
+    published once on FANOUT_CHANNEL for the other workers.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.connections: Dict[str, Set[Connection]] = {}
+        self.sent = 0
+        self.published = 0
+        self.evicted = 0
+
+    async def connect(self, websocket: WebSocket, user_id: str) -> Connection:
+        await websocket.accept()
+        connection = Connection(websocket, user_id)
+        connection.writer = asyncio.create_task(connection.write_loop())
+        self.connections.setdefault(user_id, set()).add(connection)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hincrby(PRESENCE_CONNECTIONS_KEY, user_id, 1)
+                pipe.zadd(PRESENCE_KEY, {user_id: time.time()})
+                await pipe.execute()
+        except Exception as e:
+            await logger.error("Register websocket presence failed", {"user_id": user_id, "error": str(e)})
+        return connection
+
+    async def disconnect(self, connection: Connection):
+        if connection.writer:
+            connection.writer.cancel()
+        user_connections = self.connections.get(connection.user_id)
+        if user_connections is None or connection not in user_connections:
+            return
+        user_connections.discard(connection)
+        if not user_connections:
+            self.connections.pop(connection.user_id, None)
+        try:
+            await redis_client.eval(
+                _RELEASE_PRESENCE, 2, PRESENCE_CONNECTIONS_KEY, PRESENCE_KEY, connection.user_id
+            )
+        except Exception as e:
+            # The presence entry still expires after WS_PRESENCE_TTL
+            await logger.error("Release websocket presence failed", {"user_id": connection.user_id, "error": str(e)})
+
+    def touch(self, connection: Connection):
+        connection.last_seen = time.monotonic()
+
+    def _deliver_local(self, user_id: Optional[str], message: str) -> int:
+        if user_id is None:
+            targets = [c for connections in self.connections.values() for c in connections]
+        else:
+            targets = list(self.connections.get(user_id, ()))
+        for connection in targets:
+            connection.enqueue(message)
+        self.sent += len(targets)
+        return len(targets)
+
+    async def send_to_user(self, user_id: str, payload: dict) -> int:
+        """Push ``payload`` to every socket of ``user_id`` on every worker."""
+        return await self._send(str(user_id), payload)
+
+    async def broadcast(self, payload: dict) -> int:
+        return await self._send(None, payload)
+
+    async def _send(self, user_id: Optional[str], payload: dict) -> int:
+        message = json.dumps(payload, default=str)
+        delivered = self._deliver_local(user_id, message)
+        envelope = json.dumps({"origin": self.worker_id, "user_id": user_id, "message": message})
+        try:
+            await redis_client.publish(FANOUT_CHANNEL, envelope)
+            self.published += 1
+        except Exception as e:
+            await logger.error("Publish websocket message failed", {"user_id": user_id, "error": str(e)})
+        return delivered
+
+    async def listen(self):
+        """Background task delivering messages published by the other workers."""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(FANOUT_CHANNEL)
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    envelope = json.loads(item["data"])
+                    if envelope["origin"] != self.worker_id:
+                        self._deliver_local(envelope["user_id"], envelope["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await logger.error("Websocket fan-out listener failed", error=e)
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def heartbeat(self):
+        """Ping sockets, evict idle ones and refresh this worker's presence entries.
+
+        A socket is idle when nothing was received from it and nothing could be
+        sent to it for WS_IDLE_TIMEOUT, i.e. its pings stopped going out. Dead
+        peers behind a healthy-looking TCP connection are closed by the server's
+        protocol-level ping/pong (uvicorn --ws-ping-interval/--ws-ping-timeout).
+        """
+        ping = json.dumps({"type": "ping"})
+        while True:
+            await asyncio.sleep(WS_HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+            for connections in list(self.connections.values()):
+                for connection in list(connections):
+                    if now - connection.last_seen > WS_IDLE_TIMEOUT:
+                        self.evicted += 1
+                        await self.disconnect(connection)
+                        try:
+                            await connection.websocket.close(code=1001)
+                        except Exception:
+                            pass
+                    else:
+                        connection.enqueue(ping)
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    if self.connections:
+                        pipe.zadd(PRESENCE_KEY, {user_id: time.time() for user_id in self.connections})
+                    pipe.zremrangebyscore(PRESENCE_KEY, "-inf", time.time() - WS_PRESENCE_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                await logger.error("Refresh websocket presence failed", error=e)
+
+    async def active_users(self) -> list:
+        return await redis_client.zrangebyscore(PRESENCE_KEY, time.time() - WS_PRESENCE_TTL, "+inf")
+
+    async def is_online(self, user_id: str) -> bool:
+        score = await redis_client.zscore(PRESENCE_KEY, str(user_id))
+        return score is not None and score >= time.time() - WS_PRESENCE_TTL
+
+    def get_stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "users": len(self.connections),
+            "connections": sum(len(c) for c in self.connections.values()),
+            "queued": sum(c.queue.qsize() for cs in self.connections.values() for c in cs),
+            "dropped": sum(c.dropped for cs in self.connections.values() for c in cs),
+            "sent": self.sent,
+            "published": self.published,
+            "evicted": self.evicted,
+        }
+
+manager = ConnectionManager()
@@ -0,0 +1,97 @@
+"""Morning-peak clock-in latency: Redis-locked insert vs. upsert vs. buffered upsert.
+
+Seeds BENCH_USERS users, then has them all clock in at once (BENCH_CONCURRENCY
+at a time) and reports p50/p99 of the attendance step of login. "locked"
+replays the previous write path (Redis lock, SELECT, INSERT, COMMIT, REFRESH)
+for comparison. Needs the PostgreSQL DB_URL and Redis the app uses; the
+seeded users and their attendance rows are deleted afterwards.
+
+    cd backend && python -m benchmarks.attendance_peak
+"""
+import asyncio
+import os
+import statistics
+import time
+from datetime import date
+from sqlalchemy import delete, select, text
+from app.configs.database import AsyncSessionLocal, engine
+from app.models import daysWorking as models
+from app.services import daysWorking as services
+from app.utils.redis_lock import DistributedLock
+
+USERS = int(os.getenv("BENCH_USERS", 2000))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 200))
+PREFIX = "bench_attendance_"
+
+async def clock_in_locked(user_id: str, db):
+    async with DistributedLock(f"working:{user_id}:{date.today()}"):
+        await db.execute(
+            select(models.DaysWorking).filter(
+                models.DaysWorking.user_id == user_id,
+                models.DaysWorking.day == date.today()
+            )
+        )
+        record = models.DaysWorking(**services._clock_in_row(user_id))
+        db.add(record)
+        await db.commit()
+        await db.refresh(record)
+
+async def clock_in(user_id: str, db):
+    await services.create_attendance_record(user_id, db)
+
+async def seed() -> list:
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO users (user_id, username, password, role, status) "
+            f"SELECT nextval('user_id_seq'), '{PREFIX}' || g, md5('{PREFIX}' || g), 'User', 'Active' "
+            f"FROM generate_series(1, {USERS}) AS g"
+        ))
+        result = await conn.execute(text(f"SELECT user_id FROM users WHERE username LIKE '{PREFIX}%'"))
+        return [str(row[0]) for row in result]
+
+async def reset(user_ids: list):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(models.DaysWorking).where(models.DaysWorking.user_id.in_(user_ids)))
+        await db.commit()
+
+async def cleanup():
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM users WHERE username LIKE '{PREFIX}%'"))
+
+async def run(clock, user_ids: list):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one(user_id: str):
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                start = time.perf_counter()
+                await clock(user_id, db)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(user_id) for user_id in user_ids), return_exceptions=True)
+    if services.ATTENDANCE_INGEST_MODE == "buffered":
+        await services.attendance_buffer.flush()
+    elapsed = time.perf_counter() - start
+    errors = sum(isinstance(r, Exception) for r in results)
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+    return statistics.median(latencies) if latencies else 0.0, p99, len(user_ids) / elapsed, errors
+
+async def main():
+    user_ids = await seed()
+    print(f"users={len(user_ids)} concurrency={CONCURRENCY}")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'logins/s':>12}{'errors':>8}")
+    try:
+        for mode, clock in (("locked", clock_in_locked), ("direct", clock_in), ("buffered", clock_in)):
+            services.ATTENDANCE_INGEST_MODE = mode
+            await reset(user_ids)
+            p50, p99, throughput, errors = await run(clock, user_ids)
+            print(f"{mode:<10}{p50 * 1000:>10.1f}{p99 * 1000:>10.1f}{throughput:>12.1f}{errors:>8}")
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
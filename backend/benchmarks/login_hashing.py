@@ -0,0 +1,57 @@
+"""Login throughput vs. concurrency with inline bcrypt vs. the bounded hash pool.
+
+Each simulated login verifies one bcrypt hash. A heartbeat task measures how
+long the event loop stalls, which is what every other request on the worker feels.
+
+    cd backend && python -m benchmarks.login_hashing
+"""
+import asyncio
+import time
+from passlib.context import CryptContext
+from app.utils import crypto
+
+PASSWORD = "Benchmark@123"
+HASHED = CryptContext(schemes=["bcrypt"]).hash(PASSWORD)
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+LOGINS_PER_LEVEL = 64
+
+async def login_inline():
+    crypto.verify_password(PASSWORD, HASHED)
+
+async def login_pooled():
+    await crypto.verify_password_async(PASSWORD, HASHED)
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+async def run(login, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lags = []
+
+    async def one():
+        async with semaphore:
+            await login()
+
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(LOGINS_PER_LEVEL)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    rejected = sum(isinstance(r, crypto.HashPoolSaturatedError) for r in results)
+    return (LOGINS_PER_LEVEL - rejected) / elapsed, max(lags) if lags else elapsed, rejected
+
+async def main():
+    print(f"hash pool workers={crypto.HASH_POOL_WORKERS} queue_limit={crypto.HASH_QUEUE_LIMIT}")
+    print(f"{'mode':<8}{'concurrency':>12}{'logins/s':>12}{'max loop stall ms':>20}{'rejected (503)':>16}")
+    for name, login in (("inline", login_inline), ("pooled", login_pooled)):
+        for concurrency in CONCURRENCY_LEVELS:
+            throughput, stall, rejected = await run(login, concurrency)
+            print(f"{name:<8}{concurrency:>12}{throughput:>12.1f}{stall * 1000:>20.1f}{rejected:>16}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""Payroll run and payments listing at BENCH_USERS employees (100k by default).
+
+Seeds the employees with financial info and a monthly attendance rollup, then
+times run_payroll's insert-from-select for the first run, an unchanged rerun
+(no row is rewritten) and a rerun after BENCH_CHANGED of the salaries moved.
+It then walks the run's payments with get_payroll_run_payments, BENCH_PAGE at
+a time, and reports the page latencies; the last page should cost what the
+first does. Needs a PostgreSQL DB_URL. The run prices every active employee
+with financial info, so point it at a scratch database; the seeded users and
+the BENCH_MONTH run are deleted afterwards.
+
+    cd backend && BENCH_USERS=100000 python -m benchmarks.payroll_run
+"""
+import asyncio
+import os
+import statistics
+import time
+from datetime import date
+from sqlalchemy import text
+from app.configs.database import AsyncSessionLocal, engine
+from app.models import (  # noqa: F401 - map every model the Users relationships name
+    application, attendanceSummary, conversationSummary, daysHoliday, daysWorking, department,
+    deptAnnouncement, expense, job, leave, payment, payrollRun, userFinancialInfo, userMessage,
+    userPersonalEvent, userPersonalInfo, users,
+)
+from app.services import payrollRun as services
+
+USERS = int(os.getenv("BENCH_USERS", 100_000))
+CHANGED = float(os.getenv("BENCH_CHANGED", 0.1))
+PAGE = int(os.getenv("BENCH_PAGE", 200))
+MONTH = date.fromisoformat(os.getenv("BENCH_MONTH", "1999-01-01"))
+PREFIX = "bench_payroll_"
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "INSERT INTO users (user_id, username, password, role, status) "
+            f"SELECT nextval('user_id_seq'), '{PREFIX}' || g, md5('{PREFIX}' || g), 'User', 'Active' "
+            f"FROM generate_series(1, {USERS}) AS g"
+        ))
+        # Every other employee is paid by bank transfer; salaries spread over 3000-7999
+        await conn.execute(text(
+            'INSERT INTO users_financial_info (financial_info_id, user_id, "salaryBasic", "salaryGross", '
+            '"salaryNet", "accountNumber") '
+            "SELECT nextval('financial_id_seq'), user_id, 3000 + user_id % 5000, 3500 + user_id % 5000, "
+            "3000 + user_id % 5000, CASE WHEN user_id % 2 = 0 THEN 'ACC' || user_id END "
+            f"FROM users WHERE username LIKE '{PREFIX}%'"
+        ))
+        await conn.execute(text(
+            "INSERT INTO attendance_monthly (user_id, month, total_hours, days_present, late_arrivals, overtime_hours) "
+            f"SELECT user_id, DATE '{MONTH}', 168, 21, user_id % 4, (user_id % 10)::float "
+            f"FROM users WHERE username LIKE '{PREFIX}%'"
+        ))
+        await conn.execute(text("ANALYZE users, users_financial_info, attendance_monthly, payment"))
+
+async def change_salaries():
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            'UPDATE users_financial_info SET "salaryNet" = "salaryNet" + 100 '
+            f"WHERE user_id IN (SELECT user_id FROM users WHERE username LIKE '{PREFIX}%' "
+            f"AND user_id % {max(1, round(1 / CHANGED))} = 0)"
+        ))
+
+async def cleanup():
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM payroll_run WHERE month = :month"), {"month": MONTH})
+        await conn.execute(text(f"DELETE FROM users WHERE username LIKE '{PREFIX}%'"))
+
+async def timed_run():
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        run = await services.run_payroll(db, MONTH)
+        return run, time.perf_counter() - start
+
+async def walk_payments(run_id: str):
+    latencies, rows, cursor = [], 0, None
+    async with AsyncSessionLocal() as db:
+        while True:
+            start = time.perf_counter()
+            page = await services.get_payroll_run_payments(db, run_id, limit=PAGE, cursor=cursor)
+            latencies.append(time.perf_counter() - start)
+            rows += len(page["items"])
+            db.expunge_all()
+            cursor = page["next_cursor"]
+            if not cursor:
+                return rows, latencies
+
+async def main():
+    await cleanup()
+    print(f"seeding {USERS} employees...")
+    await seed()
+    try:
+        print(f"{'run':<12}{'wall ms':>10}{'db ms':>10}{'payments':>10}")
+        for name in ("first", "unchanged", "changed"):
+            if name == "changed":
+                await change_salaries()
+            run, elapsed = await timed_run()
+            print(f"{name:<12}{elapsed * 1000:>10.1f}{run.duration_ms:>10.1f}{run.employees:>10}")
+
+        rows, latencies = await walk_payments(run.run_id)
+        ordered = sorted(latencies)
+        p99 = ordered[int(len(ordered) * 0.99) - 1]
+        print(f"\npayments listing: {rows} rows in {len(latencies)} pages of {PAGE}, {sum(latencies):.2f} s total")
+        print(f"{'first ms':>10}{'last ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        print(
+            f"{latencies[0] * 1000:>10.1f}{latencies[-1] * 1000:>10.1f}"
+            f"{statistics.median(latencies) * 1000:>10.1f}{p99 * 1000:>10.1f}"
+        )
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""get_all_users listing: VARCHAR ids ordered by CAST vs. BIGINT ids ordered by the key.
+
+Builds two scratch tables shaped like ``users`` (1M rows by default), runs the
+query get_all_users issued before and after the key migration at several
+depths, prints the median latency and whether PostgreSQL had to sort, then
+drops the tables. Needs a PostgreSQL DB_URL.
+
+    cd backend && BENCH_ROWS=1000000 python -m benchmarks.users_listing
+"""
+import asyncio
+import os
+import statistics
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+ROWS = int(os.getenv("BENCH_ROWS", 1_000_000))
+PAGE = 200
+OFFSETS = [0, 10_000, 100_000, 500_000]
+REPEAT = 5
+
+TABLES = {
+    "before": ("bench_users_varchar", "VARCHAR", "CAST(user_id AS INTEGER)"),
+    "after": ("bench_users_bigint", "BIGINT", "user_id"),
+}
+
+async def setup(conn):
+    for table, key_type, _ in TABLES.values():
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(text(
+            f"CREATE TABLE {table} (user_id {key_type} PRIMARY KEY, username VARCHAR NOT NULL, "
+            f"password VARCHAR NOT NULL, role VARCHAR NOT NULL, status VARCHAR NOT NULL)"
+        ))
+        await conn.execute(text(
+            f"INSERT INTO {table} SELECT g::{key_type}, 'user' || g, md5(g::text), 'User', 'Active' "
+            f"FROM generate_series(1, {ROWS}) AS g"
+        ))
+        await conn.execute(text(f"ANALYZE {table}"))
+
+async def teardown(conn):
+    for table, _, _ in TABLES.values():
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+async def measure(conn, table: str, order_by: str, offset: int):
+    query = f"SELECT * FROM {table} ORDER BY {order_by} OFFSET {offset} LIMIT {PAGE}"
+    plan = "\n".join(row[0] for row in await conn.execute(text(f"EXPLAIN {query}")))
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        (await conn.execute(text(query))).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), "Sort" in plan
+
+async def main():
+    engine = create_async_engine(os.environ["DB_URL"])
+    async with engine.begin() as conn:
+        print(f"seeding {ROWS} rows per table...")
+        await setup(conn)
+    try:
+        async with engine.connect() as conn:
+            print(f"{'keys':<8}{'offset':>10}{'median ms':>12}{'sort node':>12}")
+            for name, (table, _, order_by) in TABLES.items():
+                for offset in OFFSETS:
+                    latency, sorted_ = await measure(conn, table, order_by, offset)
+                    print(f"{name:<8}{offset:>10}{latency * 1000:>12.1f}{'yes' if sorted_ else 'no':>12}")
+    finally:
+        async with engine.begin() as conn:
+            await teardown(conn)
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Concurrent WebSocket load against a running server.
+
+Opens BENCH_SOCKETS sockets (10k by default) to BENCH_WS_URL, then publishes
+BENCH_BROADCASTS messages on the Redis fan-out channel and reports connect
+latency, delivery latency percentiles and how many sockets received each
+message. Tokens are minted with SECRET_KEY and stored in Redis, like a login
+does, for synthetic user ids that are removed afterwards. Raise the open-file
+limit (ulimit -n) above the socket count on both ends.
+
+    cd backend && BENCH_WS_URL=ws://localhost:8000/api/ws python -m benchmarks.websocket_load
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+import websockets
+from app.configs.redis import redis_client
+from app.utils import jwt
+from app.utils.websocket_manager import FANOUT_CHANNEL
+
+URL = os.getenv("BENCH_WS_URL", "ws://localhost:8000/api/ws")
+SOCKETS = int(os.getenv("BENCH_SOCKETS", 10000))
+CONNECT_CONCURRENCY = int(os.getenv("BENCH_CONNECT_CONCURRENCY", 500))
+BROADCASTS = int(os.getenv("BENCH_BROADCASTS", 5))
+FIRST_USER_ID = 10 ** 12
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+async def client(user_id: str, token: str, semaphore, connect_times, failures, deliveries, ready, done):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            socket = await websockets.connect(f"{URL}/{user_id}?token={token}", open_timeout=30)
+            connect_times.append(time.perf_counter() - start)
+        except Exception:
+            failures.append(user_id)
+            socket = None
+    if len(connect_times) + len(failures) == SOCKETS:
+        ready.set()
+    if socket is None:
+        return
+    try:
+        while not done.is_set():
+            try:
+                raw = await asyncio.wait_for(socket.recv(), timeout=1)
+            except asyncio.TimeoutError:
+                continue
+            payload = json.loads(raw)
+            if payload.get("type") == "ping":
+                await socket.send(json.dumps({"type": "pong"}))
+            elif payload.get("type") == "benchmark":
+                deliveries.setdefault(payload["seq"], []).append(time.time() - payload["sent_at"])
+    finally:
+        await socket.close()
+
+async def main():
+    user_ids = [str(FIRST_USER_ID + i) for i in range(SOCKETS)]
+    tokens = {}
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for user_id in user_ids:
+            tokens[user_id] = await jwt.create_access_token({"sub": user_id})
+            pipe.setex(user_id, 3600, tokens[user_id])
+        await pipe.execute()
+
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    connect_times, failures, deliveries = [], [], {}
+    ready, done = asyncio.Event(), asyncio.Event()
+    tasks = [
+        asyncio.create_task(client(u, tokens[u], semaphore, connect_times, failures, deliveries, ready, done))
+        for u in user_ids
+    ]
+    try:
+        await asyncio.wait_for(ready.wait(), timeout=600)
+        print(f"sockets={len(connect_times)} failed={len(failures)} connect p50={percentile(connect_times, 0.5) * 1000:.1f}ms "
+              f"p99={percentile(connect_times, 0.99) * 1000:.1f}ms")
+
+        for seq in range(BROADCASTS):
+            message = json.dumps({"type": "benchmark", "seq": seq, "sent_at": time.time()})
+            envelope = json.dumps({"origin": "benchmark", "user_id": None, "message": message})
+            await redis_client.publish(FANOUT_CHANNEL, envelope)
+            await asyncio.sleep(5)
+
+        print(f"{'broadcast':>10}{'delivered':>12}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for seq in range(BROADCASTS):
+            latencies = deliveries.get(seq, [])
+            print(f"{seq:>10}{len(latencies):>12}{statistics.median(latencies) * 1000 if latencies else 0:>10.1f}"
+                  f"{percentile(latencies, 0.99) * 1000:>10.1f}{max(latencies, default=0) * 1000:>10.1f}")
+    finally:
+        done.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await redis_client.delete(*user_ids)
+
+if __name__ == "__main__":
+    asyncio.run(main())